@@ -0,0 +1,149 @@
+# INDEMNITY: By using this software you agree not to sue me for any reason related to the use of this software.
+#
+# Copyright (c) 2022 Kurt Funderburg, all rights not explicitly relinquished in LGPL reserved.
+#
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU Lesser General Public License (LGPL)
+#   as published by the Free Software Foundation; either version 2 of
+#   the License, or (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Library General Public License for more details.
+#
+#   You should have received a copy of the GNU Library General Public
+#   License along with this program; if not, write to the Free Software
+#   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307
+#   USA
+#
+#	Background thread builds in the GUI.  execute() hands a full kernel build (TMThreadBody.offload) to a TMWorker process
+#	(submitBuild), shows the plain shaft meanwhile and returns at once.  A Qt timer in the GUI thread collects finished
+#	builds, gives each body to its object as TMThreadBody.prebuilt (or a failure as TMThreadBody.failed) and recomputes
+#	the document, which swaps the body in.  Editing the thread's geometry props again before that kills the running build
+#	(cancelBuild).  Qt is only imported when the first build is submitted, so FreeCADCmd never loads it.
+
+import FreeCAD, Part, os, tempfile, threading, contextlib
+import ThreadMaker.TMCache as TMCache
+from ThreadMaker.TMWorker import TMWorker, freecadCmdPath, isolationBudgets
+
+__title__ = "ThreadMaker: Non-blocking thread builds in worker processes while the GUI stays responsive."
+__author__ = "Kurt Funderburg"
+
+BACKGROUNDPATH = "User parameter:BaseApp/Macro/ThreadMaker/Background"	# getParam(BACKGROUNDPATH): Enabled(bool)
+POLLMS = 250			# Milliseconds between checks for finished background builds
+MAXIDLE = 2				# Idle worker processes kept running for the next build
+
+class TMBackgroundJob:		#######################################################
+	""" One background build: a pool thread blocked in TMWorker.call() until the worker answers or is cancelled """
+	def __init__(self, worker, docname, objname, params, job):
+		self.worker = worker
+		self.docname = docname
+		self.objname = objname
+		self.params = params		# threadCacheParams() the body is built for
+		self.job = job
+		self.result = None
+		self.cancelled = False
+		self.thread = threading.Thread(target=self.run, daemon=True)
+
+	def run(self):
+		self.result = self.worker.call(self.job)
+# end class TMBackgroundJob
+
+_jobs = []		# TMBackgroundJobs in flight, cancelled ones included until their worker has stopped
+_current = {}	# { (document name, object name) : TMBackgroundJob } latest build of each object
+_idle = []		# TMWorkers waiting for the next build
+_timer = None	# QTimer running _poll() while _jobs is not empty
+_paused = 0		# foreground() nesting depth: execute() builds in process while > 0
+
+def backgroundEnabled():
+	""" True in the GUI if the user switched background builds on in BACKGROUNDPATH """
+	return FreeCAD.GuiUp and not _paused and FreeCAD.ParamGet(BACKGROUNDPATH).GetBool("Enabled", False)
+
+@contextlib.contextmanager
+def foreground():
+	""" with foreground(): recomputes inside build in process, for callers that schedule builds themselves """
+	global _paused
+	_paused += 1
+	try:
+		yield
+	finally:
+		_paused -= 1
+
+def submitBuild(fp, kind, spec, params):
+	""" Start building the thread body of spec (threadSpec() dict of fp) in a worker process, replacing any build still
+	running for fp.  Returns False if no worker can be started: the caller builds in process. """
+	global _timer
+	try:
+		cmd = freecadCmdPath()
+	except RuntimeError as err:
+		FreeCAD.Console.PrintWarning(str(err))
+		return False
+	cancelBuild(fp)
+	timeout, memorymb = isolationBudgets()
+	worker = None
+	while _idle and worker is None:
+		w = _idle.pop()
+		if (w.cmd, w.timeout, w.memorymb) == (cmd, timeout, memorymb):	worker = w
+		else:	w.stop()
+	if worker is None:	worker = TMWorker(cmd, timeout, memorymb)
+	worker.start()		# here, not in the job thread, so cancelBuild() always has a process to kill
+	fd, out = tempfile.mkstemp(prefix="TMBackground", suffix=TMCache.CACHEEXT)
+	os.close(fd)
+	job = TMBackgroundJob(worker, fp.Document.Name, fp.Name, params, {"id": fp.Name, "kind": kind, "spec": spec, "out": out})
+	_jobs.append(job)
+	_current[(job.docname, job.objname)] = job
+	job.thread.start()
+	if _timer is None:
+		from PySide import QtCore
+		_timer = QtCore.QTimer()
+		_timer.timeout.connect(_poll)
+	if not _timer.isActive():	_timer.start(POLLMS)
+	FreeCAD.Console.PrintMessage("TM: Building " + fp.Name + " in the background\n")
+	return True
+
+def buildPending(fp):
+	""" True while a background build for fp is running """
+	return (fp.Document.Name, fp.Name) in _current
+
+def cancelBuild(fp):
+	""" Abandon the background build running for fp, if any, and kill its worker.  Doesn't wait: _poll() cleans up. """
+	job = _current.pop((fp.Document.Name, fp.Name), None)
+	if job is None: return
+	job.cancelled = True
+	job.worker.cancel()
+
+def _poll():
+	""" Qt timer slot (GUI thread): deliver finished builds, stop the timer when none are left """
+	for job in list(_jobs):
+		if job.thread.is_alive(): continue
+		_jobs.remove(job)
+		if not job.cancelled:	_current.pop((job.docname, job.objname), None)
+		if len(_idle) < MAXIDLE and job.result["ok"]:	_idle.append(job.worker)
+		else:											job.worker.stop()
+		try:
+			if not job.cancelled:	_deliver(job)
+		except Exception as err:		# document closed mid-delivery, bad BREP...: never let the timer slot raise
+			FreeCAD.Console.PrintError("TM: Background build of " + job.objname + " not delivered: " + str(err) + "\n")
+		finally:
+			if os.path.isfile(job.job["out"]):	os.remove(job.job["out"])
+	if not _jobs:	_timer.stop()
+
+def _deliver(job):
+	""" Hand a finished build to its object, if the object still wants this body, and recompute its document """
+	from ThreadMaker.TMClasses import TMThreadBody, threadSpec, threadCacheParams
+	doc = FreeCAD.listDocuments().get(job.docname)
+	obj = doc.getObject(job.objname) if doc else None
+	if obj is None or not isinstance(obj.Proxy, TMThreadBody): return		# deleted, or document closed
+	if threadCacheParams(threadSpec(obj)) != job.params: return		# edited since: that edit's own build replaces this one
+	result = job.result
+	if result["ok"]:
+		shape = Part.Shape()
+		shape.importBrep(job.job["out"])
+		obj.Proxy.prebuilt = (job.params, shape)
+	else:
+		obj.Proxy.failed = (job.params, result["error"], result.get("retries", []))
+	FreeCAD.Console.PrintMessage("TM: %s finished in the background in %.1fs%s\n" % (job.objname, result["seconds"],
+			"" if result["ok"] else ": " + result["error"]))
+	obj.touch()
+	doc.recompute()
@@ -0,0 +1,138 @@
+# INDEMNITY: By using this software you agree not to sue me for any reason related to the use of this software.
+#
+# Copyright (c) 2022 Kurt Funderburg, all rights not explicitly relinquished in LGPL reserved.
+#
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU Lesser General Public License (LGPL)
+#   as published by the Free Software Foundation; either version 2 of
+#   the License, or (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Library General Public License for more details.
+#
+#   You should have received a copy of the GNU Library General Public
+#   License along with this program; if not, write to the Free Software
+#   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307
+#   USA
+#
+#	Headless batch thread generator.  No GUI needed:
+#		FreeCADCmd <MacroDir>/ThreadMaker/TMBatch.py --pass specs.json outdir [--workers 8] [--format step|stl] [--no-cache]
+#			[--timeout 300] [--memory-mb 4096]
+#	specs.json is a list of {"kind": "ThreadExt"|"ThreadInt", "props": [initprops], "name": optional, "engine": optional}.
+#	specs.csv has a header row with the columns of CSVCOLUMNS (name and engine columns optional).
+#	initprops = [standard, size, diameter, pitch, length, taper, clearance, chamfer(bool), left-handed(bool), thrddisable(bool),
+#		roundroot(bool), pitchtol, cresttol]; diameter may be 0 for standard sizes (computed from size and crest tolerance).
+#	Writes one BREP/STEP per spec plus manifest.json with timings and IsPotato failures.  --format stl writes analytic
+#	meshes (TMMesh.py) instead, skipping the OCC kernel: much faster for 3D printing.  A job over the --timeout or
+#	--memory-mb budget of its worker is recorded as a potato and the worker is restarted for the next job.
+
+import FreeCAD, os, sys, re, csv, json, time, argparse
+
+if __name__ == "__main__":		# FreeCADCmd runs this file as a script: make ThreadMaker importable
+	sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ThreadMaker.TMWorker import TMWorkerPool
+from ThreadMaker.TMClasses import EXTOBJECTNAME, INTOBJECTNAME
+
+__title__ = "ThreadMaker Batch: Headless generation of thread solids from a JSON/CSV spec list."
+__author__ = "Kurt Funderburg"
+
+CSVCOLUMNS = ("kind", "standard", "size", "diameter", "pitch", "length", "taper", "clearance", "chamfer", "lefty",
+		"thrddisable", "roundroot", "pitchtol", "cresttol")
+
+def _bool(text):
+	return str(text).strip().lower() in ("1", "true", "yes", "y", "t")
+
+def loadSpecs(path):
+	""" Read spec list from .json or .csv; returns list of {"kind", "props", "name", "engine"} """
+	if path.lower().endswith(".csv"):
+		specs = []
+		with open(path, newline="") as f:
+			reader = csv.DictReader(f)
+			missing = [c for c in CSVCOLUMNS if c not in (reader.fieldnames or ())]
+			if missing: raise ValueError("TMBatch: CSV header is missing columns: " + ", ".join(missing))
+			for row in reader:
+				props = [row["standard"], row["size"], float(row["diameter"] or 0), float(row["pitch"]), float(row["length"]),
+						float(row["taper"] or 0), float(row["clearance"] or 0), _bool(row["chamfer"]), _bool(row["lefty"]),
+						_bool(row["thrddisable"]), _bool(row["roundroot"]), row["pitchtol"], row["cresttol"]]
+				specs.append({"kind": row["kind"], "props": props, "name": row.get("name") or None,
+						"engine": row.get("engine") or "Sweep"})
+		return specs
+	with open(path) as f:
+		specs = json.load(f)
+	for spec in specs:
+		if spec.get("kind") not in (EXTOBJECTNAME, INTOBJECTNAME) or len(spec.get("props", [])) != 13:
+			raise ValueError("TMBatch: each spec needs kind ThreadExt/ThreadInt and 13 initprops: " + json.dumps(spec))
+	return specs
+
+def specName(index, spec):
+	""" Output file stem: spec name, else kind_size-or-diameter x pitch x length, made filesystem safe """
+	if spec.get("name"): name = spec["name"]
+	else:
+		p = spec["props"]
+		size = ("%g" % float(p[2])) if p[0] == "Custom" else p[1]
+		name = "%04d_%s_%sx%gx%g" % (index, spec["kind"], size, float(p[3]), float(p[4]))
+		if p[8]: name += "_L"
+	return re.sub(r"[^A-Za-z0-9_.-]+", "_", name)
+
+def runBatch(specs, outdir, workers=os.cpu_count(), fmt="brep", cache=True, cmd=None, timeout=None, memorymb=0):
+	""" Build specs across a worker pool, write shapes to outdir and outdir/manifest.json.  Returns the manifest dict.
+	timeout (seconds) and memorymb are per job budgets; None/0 = unlimited. """
+	if not os.path.isdir(outdir): os.makedirs(outdir)
+	ext = {"step": ".step", "stl": ".stl"}.get(fmt, ".brp")
+	jobs = []
+	for i, spec in enumerate(specs):
+		jobs.append({"id": i, "kind": spec["kind"], "props": spec["props"], "engine": spec.get("engine") or "Sweep",
+				"out": os.path.abspath(os.path.join(outdir, specName(i, spec) + ext)), "format": fmt, "cache": cache})
+
+	def progress(result, done, total):
+		status = "ok" if result["ok"] else "POTATO: " + result["error"]
+		print("TMBatch: [%d/%d] %s %.2fs %s" % (done, total, os.path.basename(result["out"] or ""), result["seconds"], status))
+
+	pool = TMWorkerPool(workers, cmd, timeout, memorymb)
+	t0 = time.perf_counter()
+	try:
+		results = pool.run(jobs, progress)
+	finally:
+		pool.close()
+	manifest = {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "freecad": ".".join(FreeCAD.Version()[0:3]),
+			"workers": workers, "format": fmt, "timeout": timeout, "memorymb": memorymb, "seconds": time.perf_counter() - t0,
+			"count": len(results), "potatoes": sum(1 for r in results if r["potato"]), "jobs": []}
+	for job, spec, result in zip(jobs, specs, results):
+		entry = dict(result)
+		entry["kind"] = spec["kind"]
+		entry["props"] = spec["props"]
+		entry["engine"] = job["engine"]
+		manifest["jobs"].append(entry)
+	with open(os.path.join(outdir, "manifest.json"), "w") as f:
+		json.dump(manifest, f, indent=1)
+	print("TMBatch: %d threads, %d potatoes, %.1fs" % (manifest["count"], manifest["potatoes"], manifest["seconds"]))
+	return manifest
+
+def scriptArgs():
+	""" Our args from sys.argv: after FreeCADCmd's --pass, else after this script's path """
+	argv = sys.argv
+	if "--pass" in argv: return argv[argv.index("--pass")+1:]
+	for i, a in enumerate(argv):
+		if os.path.basename(a) == "TMBatch.py": return argv[i+1:]
+	return argv[1:]
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(prog="TMBatch", description="Generate ThreadMaker thread solids without the GUI.")
+	parser.add_argument("specs", help="JSON or CSV thread spec list")
+	parser.add_argument("outdir", help="Folder for shape files and manifest.json")
+	parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes (0 = build in this process)")
+	parser.add_argument("--format", choices=("brep", "step", "stl"), default="brep")
+	parser.add_argument("--no-cache", dest="cache", action="store_false", help="Ignore the ThreadMaker shape cache")
+	parser.add_argument("--freecadcmd", default=None, help="FreeCADCmd executable for workers")
+	parser.add_argument("--timeout", type=float, default=None, help="Seconds one thread may take before its worker is killed")
+	parser.add_argument("--memory-mb", dest="memorymb", type=int, default=0, help="Memory limit of each worker process (POSIX)")
+	args = parser.parse_args(scriptArgs() if argv is None else argv)
+	manifest = runBatch(loadSpecs(args.specs), args.outdir, args.workers, args.format, args.cache, args.freecadcmd,
+			args.timeout, args.memorymb)
+	return 1 if manifest["potatoes"] else 0
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,413 @@
+# INDEMNITY: By using this software you agree not to sue me for any reason related to the use of this software.
+#
+# Copyright (c) 2022 Kurt Funderburg, all rights not explicitly relinquished in LGPL reserved.
+#
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU Lesser General Public License (LGPL)
+#   as published by the Free Software Foundation; either version 2 of
+#   the License, or (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Library General Public License for more details.
+#
+#   You should have received a copy of the GNU Library General Public
+#   License along with this program; if not, write to the Free Software
+#   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307
+#   USA
+#
+#	Headless benchmarks for the thread kernel.  Run from the FreeCAD Python console, or without GUI:
+#		FreeCADCmd <MacroDir>/ThreadMaker/TMBench.py --pass run --grid small large --out bench.json
+#		FreeCADCmd <MacroDir>/ThreadMaker/TMBench.py --pass run --compare baseline.json --threshold 0.25
+#		FreeCADCmd <MacroDir>/ThreadMaker/TMBench.py --pass compare baseline.json bench.json
+#		FreeCADCmd <MacroDir>/ThreadMaker/TMBench.py --pass engines
+#		FreeCADCmd <MacroDir>/ThreadMaker/TMBench.py --pass imports --budget 0.5
+#		FreeCADCmd <MacroDir>/ThreadMaker/TMBench.py --pass map --grid map --out <MacroDir>/ThreadMaker/feasibility.json
+#	run times every kernel stage for each case of the chosen BENCHGRIDS (both shaft and insert) and records IsPotato, face
+#	count and volume.  compare flags cases that got slower than threshold, new potatoes, and changed geometry; exit code 1
+#	if any, so a FreeCAD/OCC upgrade can be checked before roll out.  imports times each headless module import in fresh
+#	FreeCADCmd processes (as batch workers start) and exits 1 if one takes longer than budget or pulls in Qt/FreeCADGui.
+#	map builds every valid case, retrying a failed base with each TMFeasibility.BASEVARIANTS, and writes the feasibility map.
+
+import FreeCAD, Part, os, sys, time, json, platform, itertools, argparse, tempfile, subprocess
+
+if __name__ == "__main__":		# FreeCADCmd runs this file as a script: make ThreadMaker importable
+	sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ThreadMaker.TMCache as TMCache
+import ThreadMaker.TMFeasibility as TMFeasibility
+from ThreadMaker.TMSpec import specFromInitProps, threadDims
+from ThreadMaker.TMKernel import THREADENGINES, THREADSTAGES, sweepMemoClear, stageShaft, stageSweep, stageCut, stageTrim, stageBase, \
+		retryStage, attemptText, TUNEDEFAULT
+from ThreadMaker.TMClasses import TMThreadShaft, TMThreadInsert, EXTOBJECTNAME, INTOBJECTNAME
+from ThreadMaker.TMWorker import freecadCmdPath
+from ThreadMaker.TMValidate import checkSpec
+
+__title__ = "ThreadMaker: Thread kernel benchmarks."
+__author__ = "Kurt Funderburg"
+
+def buildTimed(doc, objtype, props, engine):
+	""" Create one thread object from initprops, recompute it, return dict of wall time and result checks. """
+	obj = doc.addObject("Part::FeaturePython", objtype)
+	if objtype == EXTOBJECTNAME:	TMThreadShaft(obj, props)
+	else:							TMThreadInsert(obj, props)
+	obj.Engine = engine
+	sweepMemoClear()		# cold build every time
+	t0 = time.perf_counter()
+	obj.recompute()
+	seconds = time.perf_counter() - t0
+	result = {"engine": engine, "length": props[4], "seconds": seconds, "potato": obj.IsPotato,
+			"faces": len(obj.Shape.Faces), "volume": obj.Shape.Volume if not obj.Shape.isNull() else 0.0}
+	doc.removeObject(obj.Name)
+	return result
+
+def compareEngines(objtype=EXTOBJECTNAME, diameter=6.0, pitch=0.5, lengths=(5, 10, 20, 50, 100), engines=THREADENGINES):
+	""" Time every engine over a range of thread lengths with the shape cache and sweep memo off.  Prints a table and returns the rows. """
+	tol = "6g" if objtype == EXTOBJECTNAME else "6H"
+	param = FreeCAD.ParamGet(TMCache.CACHEPATH)
+	cacheon = param.GetBool("Enabled", True)
+	param.SetBool("Enabled", False)		# measure the kernel, not the cache
+	doc = FreeCAD.newDocument("TMBench")
+	rows = []
+	try:
+		for length in lengths:
+			for engine in engines:
+				# [Standard, StdSz, diameter, pitch, length, taper, clearance, chamfer(bool), left-handed(bool), thrddisable(bool),
+				#	roundroot(bool), pitchtol, cresttol]
+				props = ["Custom", "M10", diameter, pitch, length, 0, 0, True, False, False, True, tol, tol]
+				rows.append(buildTimed(doc, objtype, props, engine))
+	finally:
+		FreeCAD.closeDocument(doc.Name)
+		param.SetBool("Enabled", cacheon)
+
+	print("%s D=%g P=%g" % (objtype, diameter, pitch))
+	print("%8s %8s %10s %7s %12s %s" % ("Length", "Engine", "Seconds", "Faces", "Volume", "Potato"))
+	for r in rows:
+		print("%8g %8s %10.3f %7d %12.3f %s" % (r["length"], r["engine"], r["seconds"], r["faces"], r["volume"], r["potato"]))
+	return rows
+
+# BENCHMARK SUITE ######################################################################
+BENCHGRIDS = { 		# Dictionary constant of { Grid name : { spec axis : values } }.  Cases are the product of all axes.
+	"small" : {"diameter" : (1, 2, 4, 6, 8, 12), "pitch" : (.25, .5, .75, 1, 1.5), "length" : (6,), "taper" : (0, 2),
+			"chamfer" : (True, False), "roundroot" : (True,), "lefty" : (False,)},
+	"large" : {"diameter" : (10, 15, 20, 50, 100), "pitch" : (1, 1.5, 2, 4, 6, 8), "length" : (16,), "taper" : (0, 2),
+			"chamfer" : (True, False), "roundroot" : (True,), "lefty" : (False,)},
+	"options" : {"diameter" : (6,), "pitch" : (1,), "length" : (10,), "taper" : (0, 2), "chamfer" : (True, False),
+			"roundroot" : (True, False), "lefty" : (True, False)},
+	"long" : {"diameter" : (6, 20), "pitch" : (.5, 1.5), "length" : (50, 100), "taper" : (0,), "chamfer" : (True,),
+			"roundroot" : (True,), "lefty" : (False,)},
+	"map" : {"diameter" : (1, 1.5, 2, 3, 4, 5, 6, 8, 10, 12, 16, 20, 24, 30, 36, 48, 64, 100),
+			"pitch" : (.2, .25, .35, .5, .75, 1, 1.25, 1.5, 2, 2.5, 3, 4, 6, 8), "length" : (10,), "taper" : (0, 2, 5),
+			"chamfer" : (True, False), "roundroot" : (True, False), "lefty" : (True, False)} }
+BENCHAXES = ("diameter", "pitch", "length", "taper", "chamfer", "roundroot", "lefty")
+REGRESSTHRESHOLD = 0.25		# compare: a case is slower when its time grows by more than this fraction...
+REGRESSMINSECONDS = 0.05	# ...and by more than this many seconds (ignores timer noise on tiny threads)
+VOLUMETOL = 1e-4			# compare: relative volume change reported as changed geometry
+
+def gridCases(gridname, objtypes=(EXTOBJECTNAME, INTOBJECTNAME), engine="Sweep"):
+	""" Yield (caseid, objtype, spec) for every combination of the BENCHGRIDS axes, for each objtype """
+	grid = BENCHGRIDS[gridname]
+	for objtype in objtypes:
+		for values in itertools.product(*[grid[a] for a in BENCHAXES]):
+			v = dict(zip(BENCHAXES, values))
+			props = ["Custom", "M10", v["diameter"], v["pitch"], v["length"], v["taper"], 0, v["chamfer"], v["lefty"], False,
+					v["roundroot"], "", ""]
+			caseid = "%s D%g P%g L%g T%g%s%s%s %s" % (objtype, v["diameter"], v["pitch"], v["length"], v["taper"],
+					" C" if v["chamfer"] else " B", " R" if v["roundroot"] else "", " LH" if v["lefty"] else "", engine)
+			yield caseid, objtype, specFromInitProps(objtype == INTOBJECTNAME, props, engine)
+
+def benchCase(spec, retry=True):
+	""" Build spec by calling the kernel stages directly, through the retry ladder unless retry is False.  Returns dict of
+	per-stage seconds (retries included), total, potato, failed stage, error, faces, volume, valid and retries
+	(attemptText() lines). """
+	times = {}
+	result = {"stages": times, "seconds": 0.0, "potato": False, "failed": "", "error": "", "faces": 0, "volume": 0.0,
+			"valid": False, "retries": []}
+	sweepMemoClear()		# cold sweep every case
+	name = "shaft"
+	try:
+		t = time.perf_counter()
+		dims = threadDims(spec)
+		body, fallback = stageShaft(spec, dims)
+		times["shaft"] = time.perf_counter() - t
+		threadbody = None
+		for name, run in (("sweep", lambda tune, prior: stageSweep(spec, dims, body, tune)),
+				("cut", lambda tune, prior: stageCut(spec, dims, body, prior, tune)),
+				("trim", lambda tune, prior: stageTrim(spec, dims, prior, tune)),
+				("base", lambda tune, prior: stageBase(spec, dims, prior, tune=tune))):
+			t = time.perf_counter()
+			if retry:
+				threadbody, attempts = retryStage(name, lambda tune: run(tune, threadbody))
+				result["retries"].extend(attemptText(name, attempts))
+			else:
+				threadbody = run(TUNEDEFAULT, threadbody)
+			times[name] = time.perf_counter() - t
+		result["faces"] = len(threadbody.Faces)
+		result["volume"] = threadbody.Volume
+		result["valid"] = threadbody.isValid()
+	except Exception as err:		# RuntimeError from stages, OCC errors from booleans: both are potatoes
+		result["potato"] = True
+		result["failed"] = name
+		result["error"] = str(err).strip()
+		result["retries"].extend(attemptText(name, getattr(err, "attempts", [])))
+	result["seconds"] = sum(times.values())
+	return result
+
+def runSuite(gridnames=("small",), objtypes=(EXTOBJECTNAME, INTOBJECTNAME), engine="Sweep", repeat=1, verbose=True, retry=True):
+	""" Benchmark every case of gridnames, with the retry ladder unless retry is False.  With repeat > 1 each stage keeps
+	its fastest time.  Returns results dict
+	{"meta": {...}, "cases": {caseid: benchCase result}} ready for json.dump. """
+	meta = {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "freecad": ".".join(FreeCAD.Version()[0:4]),
+			"occ": getattr(Part, "OCC_VERSION", ""), "python": platform.python_version(),
+			"platform": platform.platform(), "grids": list(gridnames), "engine": engine, "repeat": repeat, "retry": retry}
+	cases = {}
+	t0 = time.perf_counter()
+	for gridname in gridnames:
+		for caseid, objtype, spec in gridCases(gridname, objtypes, engine):
+			best = None
+			for i in range(max(1, repeat)):
+				r = benchCase(spec, retry)
+				if best is None:	best = r
+				else:
+					for stage, seconds in r["stages"].items():
+						best["stages"][stage] = min(seconds, best["stages"].get(stage, seconds))
+					best["seconds"] = sum(best["stages"].values())
+			cases[caseid] = best
+			if verbose:
+				print("%-44s %8.3fs %s" % (caseid, best["seconds"], "POTATO at " + best["failed"] if best["potato"]
+						else "retried" if best["retries"] else ""))
+	meta["seconds"] = time.perf_counter() - t0
+	meta["potatoes"] = sum(1 for r in cases.values() if r["potato"])
+	meta["retried"] = sum(1 for r in cases.values() if r["retries"] and not r["potato"])
+	if verbose: print("%d cases, %d potatoes, %d saved by retries, %.1fs" % (len(cases), meta["potatoes"], meta["retried"],
+			meta["seconds"]))
+	return {"meta": meta, "cases": cases}
+
+def compareResults(baseline, current, threshold=REGRESSTHRESHOLD, minseconds=REGRESSMINSECONDS):
+	""" Regressions of current against baseline results (runSuite dicts).  Returns list of (caseid, kind, detail) with
+	kind one of "slower", "potato", "geometry"; a case only in one run is ignored. """
+	regressions = []
+	for caseid, cur in current["cases"].items():
+		base = baseline["cases"].get(caseid)
+		if base is None: continue
+		if cur["potato"] and not base["potato"]:
+			regressions.append((caseid, "potato", "fails at %s: %s" % (cur["failed"], cur["error"])))
+			continue
+		if cur["potato"] or base["potato"]: continue
+		if cur["faces"] != base["faces"] or abs(cur["volume"] - base["volume"]) > VOLUMETOL * max(abs(base["volume"]), 1e-9):
+			regressions.append((caseid, "geometry", "faces %d -> %d, volume %.6g -> %.6g"
+					% (base["faces"], cur["faces"], base["volume"], cur["volume"])))
+		slow = [s for s in THREADSTAGES if s in cur["stages"] and s in base["stages"]
+				and cur["stages"][s] - base["stages"][s] > max(minseconds, threshold * base["stages"][s])]
+		if cur["seconds"] - base["seconds"] > max(minseconds, threshold * base["seconds"]) or slow:
+			regressions.append((caseid, "slower", "%.3fs -> %.3fs (%+.0f%%) %s" % (base["seconds"], cur["seconds"],
+					100 * (cur["seconds"] / base["seconds"] - 1) if base["seconds"] else 0, " ".join(slow))))
+	return regressions
+
+def printComparison(baseline, current, regressions):
+	""" Print summary of compareResults() """
+	bsum = sum(r["seconds"] for k, r in baseline["cases"].items() if k in current["cases"])
+	csum = sum(r["seconds"] for k, r in current["cases"].items() if k in baseline["cases"])
+	print("Baseline: FreeCAD %s OCC %s  (%s)" % (baseline["meta"]["freecad"], baseline["meta"]["occ"], baseline["meta"]["created"]))
+	print("Current:  FreeCAD %s OCC %s  (%s)" % (current["meta"]["freecad"], current["meta"]["occ"], current["meta"]["created"]))
+	if bsum: print("Common cases total: %.2fs -> %.2fs (%+.1f%%)" % (bsum, csum, 100 * (csum / bsum - 1)))
+	for caseid, kind, detail in regressions:
+		print("%-9s %-44s %s" % (kind.upper(), caseid, detail))
+	print("%d regressions" % len(regressions))
+
+# FEASIBILITY MAP ######################################################################
+def mapCase(spec, variants=TMFeasibility.BASEVARIANTS):
+	""" Build spec with the kernel stages; if the base fails, retry it from the trimmed body with each variant in turn.
+	Returns dict of variant (index of the first that built, -1 if none), seconds (whole build with that variant, or up to
+	the failure), failed (stage of the last failure, "" on success) and error. """
+	result = {"variant": -1, "seconds": 0.0, "failed": "", "error": ""}
+	sweepMemoClear()
+	name = "shaft"
+	try:
+		t = time.perf_counter()
+		dims = threadDims(spec)
+		body, fallback = stageShaft(spec, dims)
+		name = "sweep"
+		sthread = stageSweep(spec, dims, body)
+		name = "cut"
+		threadbody = stageCut(spec, dims, body, sthread)
+		name = "trim"
+		threadbody = stageTrim(spec, dims, threadbody)
+		name = "base"
+		upstream = time.perf_counter() - t
+	except Exception as err:		# no variant changes the stages before base
+		result.update(seconds=time.perf_counter() - t, failed=name, error=str(err).strip())
+		return result
+	for i, variant in enumerate(variants):
+		t = time.perf_counter()
+		try:
+			finished = stageBase(spec, dims, threadbody, variant)
+			if not finished.isValid(): raise RuntimeError("Invalid shape after base.")
+		except Exception as err:
+			result.update(seconds=upstream + time.perf_counter() - t, failed="base", error=str(err).strip())
+			continue
+		result.update(variant=i, seconds=upstream + time.perf_counter() - t, failed="", error="")
+		break
+	return result
+
+def recordMap(gridnames=("map",), objtypes=(EXTOBJECTNAME, INTOBJECTNAME), engine="Sweep", verbose=True):
+	""" mapCase() every case of gridnames that breaks no TMValidate error rule.  Returns (rows, meta) for
+	TMFeasibility.writeMap() """
+	meta = {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "freecad": ".".join(FreeCAD.Version()[0:4]),
+			"occ": getattr(Part, "OCC_VERSION", ""), "grids": list(gridnames), "engine": engine}
+	cases = []
+	t0 = time.perf_counter()
+	for gridname in gridnames:
+		for caseid, objtype, spec in gridCases(gridname, objtypes, engine):
+			if any(severity == "error" for rule, severity, parameter, message in checkSpec(spec)): continue	# dialog won't allow
+			r = mapCase(spec)
+			cases.append((spec, r))
+			if verbose and r["variant"] != 0:
+				print("%-44s %8.3fs %s" % (caseid, r["seconds"], "variant %d" % r["variant"] if r["variant"] > 0
+						else "POTATO at " + r["failed"]))
+	meta["seconds"] = time.perf_counter() - t0
+	meta["potatoes"] = sum(1 for spec, r in cases if r["variant"] < 0)
+	meta["rescued"] = sum(1 for spec, r in cases if r["variant"] > 0)
+	if verbose: print("%d cases, %d rescued by a base variant, %d potatoes, %.1fs" % (len(cases), meta["rescued"],
+			meta["potatoes"], meta["seconds"]))
+	return TMFeasibility.mapRows(cases), meta
+
+# IMPORT TIME ######################################################################
+IMPORTMODULES = ("ThreadMaker.TMStandards", "ThreadMaker.TMTolerance", "ThreadMaker.TMSpec", "ThreadMaker.TMValidate",
+		"ThreadMaker.TMFeasibility", "ThreadMaker.TMKernel", "ThreadMaker.TMWorker", "ThreadMaker.TMBackground",
+		"ThreadMaker.TMPersist", "ThreadMaker.TMClasses",
+		"ThreadMaker.TMFamily")		# headless modules, each timed alone
+GUIMODULES = ("FreeCADGui", "PySide", "PySide2", "PySide6", "shiboken2", "shiboken6")	# IMPORTMODULES may import none of these
+IMPORTBUDGET = 0.5		# imports: seconds one IMPORTMODULES import may take in a fresh FreeCADCmd
+IMPORTTAG = "TMI "
+IMPORTPROBE = """import os, sys, time, json
+sys.path.insert(0, %r)
+before = set(sys.modules)
+t = time.perf_counter()
+import %s
+seconds = time.perf_counter() - t
+gui = [m for m in %r if m in sys.modules and m not in before]
+os.write(1, (%r + json.dumps({"seconds": seconds, "modules": len(sys.modules) - len(before), "gui": gui}) + "\\n").encode("utf-8"))
+"""		# FreeCADCmd script: time one import, report it on a tagged stdout line (raw fd: FreeCAD may redirect sys.stdout)
+
+def importTimes(modules=IMPORTMODULES, repeat=3, cmd=None):
+	""" Import each module in fresh FreeCADCmd processes, repeat times.  Returns { module : {"seconds": fastest import,
+	"process": fastest process wall time, "modules": number of modules the import loaded, "gui": GUIMODULES it loaded},
+	plus "error" (last stderr line) for a module whose import failed } """
+	cmd = cmd or freecadCmdPath()
+	root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+	fd, probe = tempfile.mkstemp(prefix="TMImport", suffix=".py")
+	os.close(fd)
+	results = {}
+	try:
+		for module in modules:
+			with open(probe, "w") as f:	f.write(IMPORTPROBE % (root, module, GUIMODULES, IMPORTTAG))
+			best = None
+			for i in range(max(1, repeat)):
+				t = time.perf_counter()
+				proc = subprocess.run([cmd, probe], stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+				wall = time.perf_counter() - t
+				lines = [l for l in proc.stdout.decode("utf-8", "replace").splitlines() if l.startswith(IMPORTTAG)]
+				if not lines:		# reported by checkImports(), so a broken module fails the run like a slow one
+					err = proc.stderr.decode("utf-8", "replace").strip().splitlines()
+					best = {"seconds": 0.0, "process": wall, "modules": 0, "gui": [], "error": err[-1] if err else "no result"}
+					break
+				r = json.loads(lines[-1][len(IMPORTTAG):])
+				r["process"] = wall
+				if best is None:	best = r
+				else:
+					best["seconds"] = min(best["seconds"], r["seconds"])
+					best["process"] = min(best["process"], r["process"])
+			results[module] = best
+	finally:
+		os.remove(probe)
+	return results
+
+def checkImports(results, budget=IMPORTBUDGET):
+	""" Problems in importTimes() results: list of (module, detail) for failed imports, imports over budget or loading
+	GUI modules """
+	problems = []
+	for module, r in results.items():
+		if r.get("error"):
+			problems.append((module, "import failed: " + r["error"]))
+			continue
+		if r["gui"]:	problems.append((module, "imports " + ", ".join(r["gui"])))
+		if r["seconds"] > budget:	problems.append((module, "import %.3fs > budget %.3fs" % (r["seconds"], budget)))
+	return problems
+
+def printImports(results, problems):
+	""" Print table of importTimes() results and checkImports() problems """
+	print("%-26s %10s %10s %8s %s" % ("Module", "Import", "Process", "Modules", "GUI"))
+	for module, r in results.items():
+		print("%-26s %9.3fs %9.3fs %8d %s" % (module, r["seconds"], r["process"], r["modules"], " ".join(r["gui"])))
+	for module, detail in problems:
+		print("%-9s %-26s %s" % ("IMPORT", module, detail))
+	print("%d import problems" % len(problems))
+
+def scriptArgs():
+	""" Our args from sys.argv: after FreeCADCmd's --pass, else after this script's path """
+	argv = sys.argv
+	if "--pass" in argv: return argv[argv.index("--pass")+1:]
+	for i, a in enumerate(argv):
+		if os.path.basename(a) == "TMBench.py": return argv[i+1:]
+	return argv[1:]
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(prog="TMBench", description="ThreadMaker thread kernel benchmarks.")
+	sub = parser.add_subparsers(dest="command")
+	run = sub.add_parser("run", help="Benchmark kernel stages over spec grids")
+	run.add_argument("--grid", nargs="+", default=["small"], choices=sorted(BENCHGRIDS))
+	run.add_argument("--kind", nargs="+", default=[EXTOBJECTNAME, INTOBJECTNAME], choices=(EXTOBJECTNAME, INTOBJECTNAME))
+	run.add_argument("--engine", default="Sweep", choices=THREADENGINES)
+	run.add_argument("--repeat", type=int, default=1, help="Runs per case; fastest time per stage is kept")
+	run.add_argument("--no-retry", dest="retry", action="store_false", help="Fail a stage at once instead of trying RETRYLADDER")
+	run.add_argument("--out", help="Write results JSON here")
+	run.add_argument("--compare", metavar="BASELINE", help="Compare results against this baseline JSON")
+	run.add_argument("--threshold", type=float, default=REGRESSTHRESHOLD)
+	cmp = sub.add_parser("compare", help="Compare two results files")
+	cmp.add_argument("baseline")
+	cmp.add_argument("current")
+	cmp.add_argument("--threshold", type=float, default=REGRESSTHRESHOLD)
+	sub.add_parser("engines", help="Time each Engine over a range of lengths")
+	imp = sub.add_parser("imports", help="Time headless module imports in fresh FreeCADCmd processes")
+	imp.add_argument("--module", nargs="+", default=list(IMPORTMODULES))
+	imp.add_argument("--repeat", type=int, default=3, help="Processes per module; fastest time is kept")
+	imp.add_argument("--budget", type=float, default=IMPORTBUDGET, help="Seconds one module import may take")
+	imp.add_argument("--out", help="Write results JSON here")
+	fmap = sub.add_parser("map", help="Record the feasibility map: potatoes, timings and working base variants")
+	fmap.add_argument("--grid", nargs="+", default=["map"], choices=sorted(BENCHGRIDS))
+	fmap.add_argument("--kind", nargs="+", default=[EXTOBJECTNAME, INTOBJECTNAME], choices=(EXTOBJECTNAME, INTOBJECTNAME))
+	fmap.add_argument("--out", default=TMFeasibility.MAPFILE, help="Map file to write")
+	args = parser.parse_args(scriptArgs() if argv is None else argv)
+
+	if args.command == "run":
+		current = runSuite(args.grid, args.kind, args.engine, args.repeat, retry=args.retry)
+		if args.out:
+			with open(args.out, "w") as f:	json.dump(current, f, indent=1)
+		if not args.compare: return 0
+		with open(args.compare) as f:	baseline = json.load(f)
+	elif args.command == "compare":
+		with open(args.baseline) as f:	baseline = json.load(f)
+		with open(args.current) as f:	current = json.load(f)
+	elif args.command == "imports":
+		results = importTimes(args.module, args.repeat)
+		if args.out:
+			with open(args.out, "w") as f:	json.dump(results, f, indent=1)
+		problems = checkImports(results, args.budget)
+		printImports(results, problems)
+		return 1 if problems else 0
+	elif args.command == "map":
+		rows, meta = recordMap(args.grid, args.kind)
+		TMFeasibility.writeMap(args.out, rows, meta)
+		return 0
+	else:
+		compareEngines(EXTOBJECTNAME)
+		compareEngines(INTOBJECTNAME)
+		return 0
+	regressions = compareResults(baseline, current, args.threshold)
+	printComparison(baseline, current, regressions)
+	return 1 if regressions else 0
+
+if __name__ == "__main__":
+	sys.exit(main())
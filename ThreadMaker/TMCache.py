@@ -0,0 +1,126 @@
+# INDEMNITY: By using this software you agree not to sue me for any reason related to the use of this software.
+#
+# Copyright (c) 2022 Kurt Funderburg, all rights not explicitly relinquished in LGPL reserved.
+#
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU Lesser General Public License (LGPL)
+#   as published by the Free Software Foundation; either version 2 of
+#   the License, or (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Library General Public License for more details.
+#
+#   You should have received a copy of the GNU Library General Public
+#   License along with this program; if not, write to the Free Software
+#   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307
+#   USA
+
+import FreeCAD, Part, os, json, hashlib
+
+__title__ = "ThreadMaker: Persistent on-disk BREP cache for generated thread bodies."
+__author__ = "Kurt Funderburg"
+
+CACHEPATH = "User parameter:BaseApp/Macro/ThreadMaker/Cache"	# getParam(CACHEPATH): Enabled(bool), MaxSizeMB(int), Folder(str), HoldBodies(bool)
+GEOMVERSION = "1.2.4"		# Bump whenever kernel output changes (stages, sweep memo, base variants, mirroring) so stale bodies are never reused
+CACHEEXT = ".brp"
+DEFAULTMAXMB = 500			# LRU eviction keeps the cache folder under this many MB
+
+def cacheEnabled():
+	""" True unless the user disabled the shape cache in CACHEPATH """
+	return FreeCAD.ParamGet(CACHEPATH).GetBool("Enabled", True)
+
+def holdBodies():
+	""" True unless the user asked thread objects to keep their threaded body (for DisableThrd toggles) on disk only """
+	return FreeCAD.ParamGet(CACHEPATH).GetBool("HoldBodies", True)
+
+def cacheDir():
+	""" Cache folder: CACHEPATH Folder, else <MacroPath>/ThreadMaker/cache.  Created on first use. """
+	folder = FreeCAD.ParamGet(CACHEPATH).GetString("Folder", "")
+	if not folder:
+		macropath = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Macro").GetString("MacroPath", "")
+		if not macropath: macropath = FreeCAD.getUserMacroDir(True)
+		folder = os.path.join(macropath, "ThreadMaker", "cache")
+	if not os.path.isdir(folder):
+		os.makedirs(folder, exist_ok=True)
+	return folder
+
+def cacheKey(objtype, params):
+	""" (objtype (str), params (list)) Canonical content hash of the geometry-defining thread parameters.
+	Floats are rounded to 9 significant digits so Quantity/float round trips hash identically. """
+	canon = [GEOMVERSION, objtype]
+	for p in params:
+		if isinstance(p, bool) or p is None:	canon.append(p)
+		elif isinstance(p, (int, float)):		canon.append("%.9g" % float(p))
+		else:								canon.append(str(p))
+	return hashlib.sha1(json.dumps(canon).encode("utf-8")).hexdigest()
+
+def cacheLoad(key):
+	""" Return cached shape for key, or None on miss.  A hit refreshes the entry's LRU timestamp. """
+	if not cacheEnabled(): return None
+	path = os.path.join(cacheDir(), key + CACHEEXT)
+	if not os.path.isfile(path): return None
+	try:
+		shape = Part.Shape()
+		shape.importBrep(path)
+	except Exception:
+		FreeCAD.Console.PrintWarning("TM: Discarding unreadable cache entry " + path + "\n")
+		_remove(path)
+		return None
+	if shape.isNull() or not shape.Solids:
+		_remove(path)
+		return None
+	os.utime(path, None)		# mtime is the LRU clock (atime is unreliable on noatime mounts)
+	return shape
+
+def cacheHas(key):
+	""" True if the cache holds an entry for key (without loading it) """
+	return cacheEnabled() and os.path.isfile(os.path.join(cacheDir(), key + CACHEEXT))
+
+def cacheStore(key, shape):
+	""" Write shape to the cache under key, then evict least recently used entries over the size limit. """
+	if not cacheEnabled() or shape.isNull(): return
+	folder = cacheDir()
+	path = os.path.join(folder, key + CACHEEXT)
+	tmppath = path + "." + str(os.getpid()) + ".tmp"
+	try:
+		shape.exportBrep(tmppath)
+		os.replace(tmppath, path)		# atomic so a concurrent reader never sees a half-written file
+	except Exception as err:
+		FreeCAD.Console.PrintWarning("TM: Could not write shape cache entry: " + str(err) + "\n")
+		_remove(tmppath)
+		return
+	cacheEvict()
+
+def cacheEvict(maxbytes=None):
+	""" Delete oldest (least recently used) entries until the cache folder is under maxbytes. """
+	if maxbytes is None:
+		maxbytes = FreeCAD.ParamGet(CACHEPATH).GetInt("MaxSizeMB", DEFAULTMAXMB) * 1024 * 1024
+	folder = cacheDir()
+	entries = []
+	total = 0
+	for name in os.listdir(folder):
+		if not name.endswith(CACHEEXT): continue
+		path = os.path.join(folder, name)
+		try:
+			st = os.stat(path)
+		except OSError:
+			continue
+		entries.append((st.st_mtime, st.st_size, path))
+		total += st.st_size
+	entries.sort()
+	for mtime, size, path in entries:
+		if total <= maxbytes: break
+		_remove(path)
+		total -= size
+
+def cacheClear():
+	""" Remove every cache entry. """
+	cacheEvict(0)
+
+def _remove(path):
+	try:
+		os.remove(path)
+	except OSError:
+		pass
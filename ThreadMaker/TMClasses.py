@@ -21,140 +21,384 @@
 #	1.1
 #		* Fix deprecated refernece to activated signal on QComboBox which broke Linux FC.
 #		* Fix deprecated proxy warning in FC 1.x.
-
-import FreeCAD, Part, math, os
-from FreeCAD import Base
-from PySide import QtGui, QtCore
+#	1.2
+#		* Persistent on-disk BREP cache of finished thread bodies (TMCache.py).
+#		* Engine prop: "Tiled" builds one pitch segment and stacks copies; time roughly constant in Length (TMBench.py).
+#		* In-session memo of full-length thread sweeps: Length edits cost one boolean, not a sweep plus boolean.
+#		* execute() split into cached kernel stages; each prop change reruns only the stages it invalidates (STAGEPROPS).
+#		* Headless batch generator with FreeCADCmd worker process pool (TMBatch.py, TMWorker.py).
+#		* Parallel recompute of dirty thread objects in worker processes (TMRecompute.py, TMRecomputeThreads macro).
+#		* Headless benchmark suite: per-stage times, potatoes and geometry over spec grids, baseline compare (TMBench.py).
+#		* Optional execute() step timing (DIAGPATH StageTiming) into hidden StageNames/StageTimes props and a log line.
+#		* Analytic numpy thread mesh for preview and STL export, no OCC booleans (TMMesh.py, TMBatch --format stl).
+#		* Engine prop: "Direct" sews the thread surface from swept one-turn ribbons, no shaft.cut(thread); falls back to Sweep.
+#		* Table-driven, memoized ISO 965 deviations; numpy bulk limits and fit tables over all sizes and classes (TMTolerance.py).
+#		* FreeCAD-free ThreadSpec model; derived dims for whole arrays of specs with numpy (TMSpec.py).
+#		* One vectorized rule engine with feasible ranges for dialog, updateData() and batch tools; live dialog ranges (TMValidate.py).
+#		* Standards registry: size tables in data files (Standards/), loaded on first use, indexed, nearest-size lookup (TMStandards.py).
+#		* Qt-free import path: geometry kernel in TMKernel.py, dialog in TMDialog.py loaded on first use; TMBench.py imports timing.
+#		* updateData() cascades are queued, not recursive, and skip unchanged values; execute() skips specs edited back to the built body.
+#		* Feasibility map recorder (TMBench map); a recorded map picks base padding and refuses predicted potatoes (TMFeasibility.py).
+#		* Optional isolated execute: kernel stages in a worker process with time and memory budgets; reason kept in PotatoReason.
+#		* Retry ladder: a failed stage is retried with other seam rotations, helix pads, fuzzy booleans, transitions (Retries prop).
+#		* GUI builds run in a background worker behind a plain shaft placeholder; a new edit cancels them (TMBackground.py).
+#		* Threaded and cosmetic bodies both kept per object: toggling DisableThrd swaps shapes instead of rebuilding.
+#		* Optional parameters-only documents: Shape left out of the file, loaded from the shape cache when shown (TMPersist.py).
+#		* Thread families: App::Link instances of one master thread in linear, polar and hole-set bolt patterns (TMFamily.py).
+#		* Left-hand threads mirrored from a cached or memoized right-hand body or sweep, and vice versa (TMKernel.mirrorHand).
+
+import FreeCAD, sys, time
+import ThreadMaker.TMCache as TMCache
+import ThreadMaker.TMKernel as TMKernel
+import ThreadMaker.TMPersist as TMPersist
+import ThreadMaker.TMStandards as TMStandards
+from ThreadMaker.TMFeasibility import baseVariant, checkFeasible
+from ThreadMaker.TMTolerance import ISO965EXTPITCHTOL, ISO965EXTCRESTTOL, ISO965INTPITCHTOL, ISO965INTCRESTTOL, \
+		iso965ExtPitchDev, iso965IntPitchDev, iso965ExtCrestDev, iso965IntCrestDev
+from ThreadMaker.TMSpec import ThreadSpec, specFromInitProps, threadDims
+from ThreadMaker.TMValidate import RULEPARAMS, checkSpec, feasibleRanges
+from ThreadMaker.TMKernel import THREADENGINES, THREADSTAGES, makeProfileExt681M, makeProfileInt681M, stepTime, \
+		makeThreadSweep, memoThreadSweep, sweepMemoClear, makeTiledThread, makeDirectThread, threadEngine, threadCacheParams, \
+		retryStage, attemptText, stageShaft, stageSweep, stageCut, stageTrim, stageBase, makeThreadBody
+# Kernel names stay importable from here for macros and scripts written against 1.1.  TMDialog (Qt) is loaded by
+# __getattr__ below on first use, so importing TMClasses in FreeCADCmd never imports PySide or FreeCADGui.
 
 __title__ = "ThreadMaker: Fully parametric threaded shafts for supported standards or custom user specs."
 __author__ = "Kurt Funderburg"
 
 MRUPATH = "User parameter:BaseApp/Macro/ThreadMaker/MRU"		# getParam(MRUPATH) stores last accepted values of dialog
+DIAGPATH = "User parameter:BaseApp/Macro/ThreadMaker/Diagnostics"	# getParam(DIAGPATH): StageTiming(bool) times execute() steps
 EXTOBJECTNAME = "ThreadExt"			# Thread object name, also object label prefix.  Will also use "ThreadInsert"
 INTOBJECTNAME = "ThreadInt"			
-SUPPORTEDSTANDARDS = { 			# Dictionary constant of { Name : Taper(float) }
-	"Custom" : 0, 								# Unrestricted specification of d, p, t
-	"ISO 261 Metric" : 0 }						# Straight metric thread  
+SUPPORTEDSTANDARDS = TMStandards.supportedStandards()	# { Name : Taper(float) }: "Custom" (unrestricted d, p, t), then Standards/standards.json
+UPDATELIMIT = 50					# Most props one TMThreadVP.updateData() cascade handles (guards against assignment loops)
 
 # ISO 261 CONSTANTS AND METHODS ########################################################
-ISO965EXTPITCHTOL = ('3e', '3f', '3g', '3h', '4e', '4f', '4g', '4h', '5e', '5f', '5g', '5h', '6e', '6f', '6g', '6h', '7e', '7f', '7g', '7h', 
-						'8e', '8f', '8g', '8h', '9e', '9f', '9g', '9h')
-ISO965EXTCRESTTOL = ('4e', '4f', '4g', '4h', '6e', '6f', '6g', '6h', '8e', '8f', '8g', '8h')
-ISO965INTPITCHTOL = ('4G', '4H', '5G', '5H', '6G', '6H', '7G', '7H', '8G', '8H')
-ISO965INTCRESTTOL = ('4G', '4H', '5G', '5H', '6G', '6H', '7G', '7H', '8G', '8H')
-#ISO261PDTABLE = {  		# ISO 261 Table 2 Pitch-Diameter lookup table as Python dictionary defined at end of this module
-
-def iso965ExtPitchDev(nomdiameter, pitch, pitchtol):		# Compute & return pitch deviation per ISO965 S.13 formulae
-	""" (nomdiameter (float), pitch (float), potchtol (str)) """
-	fd = 0.0
-	td = 0.0
-	if  pitchtol[1] == "e":	fd = (50 + 11 * pitch) / 1000	#ese = – (50 + 11 P)  #exceptions for P<=0.45
-	if  pitchtol[1] == "f":	fd = (30 + 11 * pitch) / 1000	#esf = – (30 + 11 P)  # not applicable for P<=0.3
-	if  pitchtol[1] == "g":	fd = (15 + 11 * pitch) / 1000	#esg = – (15 + 11 P)
-	if  pitchtol[1] == "h":	fd = 0						#esh = 0
-	td6 = 90 * pitch**0.4 * nomdiameter**0.1 / 1000	#Crest Tol. Deviation (number grade) PTD6 (um) = 90 * P ** 0.4 * D ** 0.1; 
-	if  pitchtol[0] == "3":	td = 0.5 * td6
-	if  pitchtol[0] == "4":	td = 0.63 * td6	# PTD4 = 0,63 TD6; 
-	if  pitchtol[0] == "5":	td = 0.8 * td6		# PTD5 =  0,8 PTD6; 
-	if  pitchtol[0] == "6":	td = td6
-	if  pitchtol[0] == "7":	td = 1.25 * td6	# PTD7 = 1,25 TD6; 
-	if  pitchtol[0] == "8":	td = 1.6 * td6		# PTD8 = 1,6 TD6
-	if  pitchtol[0] == "9":	td = 2.0 * td6		# PTD8 = 1,6 TD6
-	return fd + td
-
-def iso965IntPitchDev(nomdiameter, pitch, pitchtol):		# Compute & return pitch deviation per ISO965 S.13 formulae
-	""" (nomdiameter (float), pitch (float), potchtol (str)) """
-	fd = 0.0
-	td = 0.0
-	if  pitchtol[1] == "G":	fd = (15 + 11 * pitch) / 1000	#esg = – (15 + 11 P)
-	if  pitchtol[1] == "H":	fd = 0						#esh = 0
-	td6 = 90 * pitch**0.4 * nomdiameter**0.1 / 1000	#Crest Tol. Deviation (number grade) PTD6 (um) = 90 * P ** 0.4 * D ** 0.1; 
-	if  pitchtol[0] == "4":	td = 0.85 * td6	# PTD4 = 0,63 TD6; 
-	if  pitchtol[0] == "5":	td = 1.06 * td6		# PTD5 =  0,8 PTD6; 
-	if  pitchtol[0] == "6":	td = 1.32 * td6
-	if  pitchtol[0] == "7":	td = 1.7 * td6	# PTD7 = 1,25 TD6; 
-	if  pitchtol[0] == "8":	td = 2.12 * td6		# PTD8 = 1,6 TD6
-	return fd + td
-
-def iso965ExtCrestDev(pitch, cresttol):		# Compute & return crest deviation per ISO965 S.13 formulae
-	""" (pitch (float), potchtol (str)) """
-	fd = 0.0
-	td = 0.0
-	if  cresttol[1] == "e":	fd = (50 + 11 * pitch) / 1000	#ese = – (50 + 11 P)  #exceptions for P<=0.45
-	if  cresttol[1] == "f":	fd = (30 + 11 * pitch) / 1000	#esf = – (30 + 11 P)  # not applicable for P<=0.3
-	if  cresttol[1] == "g":	fd = (15 + 11 * pitch) / 1000	#esg = – (15 + 11 P)
-	if  cresttol[1] == "h":	fd = 0						#esh = 0
-	td6 = (180 * pitch**(2/3) - 3.15/pitch**(1/2)) / 1000	#Crest Tol. Deviation (number grade) CTD6 (um) = 180 * P ** 2/3 - 3.15/sqrt(P); 
-	if  cresttol[0] == "4":	td = 0.63 * td6	# PTD4 = 0,63 TD6; 
-	if  cresttol[0] == "6":	td = td6
-	if  cresttol[0] == "8":	td = 1.6 * td6		# PTD8 = 1,6 TD6
-	return fd + td
-
-def iso965IntCrestDev(pitch, cresttol):		# Compute & return crest deviation per ISO965 S.13 formulae
-	""" (pitch (float), potchtol (str)) """
-	fd = 0.0
-	td = 0.0
-	if  cresttol[1] == "G":	fd = (15 + 11 * pitch) / 1000	#esg = – (15 + 11 P)
-	if  cresttol[1] == "H":	fd = 0						#esh = 0
-	if pitch >= 1.0: 	td6 = 230 * pitch**0.7 / 1000
-	else: 			td6 = (433 * pitch - 190 * pitch**1.22) / 1000
-	if  cresttol[0] == "4":	td = 0.63 * td6	# PTD4 = 0,63 TD6; 
-	if  cresttol[0] == "5":	td = 0.8 * td6		# PTD5 =  0,8 PTD6; 
-	if  cresttol[0] == "6":	td = td6
-	if  cresttol[0] == "7":	td = 1.25 * td6	# PTD7 = 1,25 TD6; 
-	if  cresttol[0] == "8":	td = 1.6 * td6		# PTD8 = 1,6 TD6
-	return fd + td
-
-def makeProfileExt681M(minordiameter, pitch, roundroot):	
-	""" Generated ISO 68.1M cutter (not adder) profile wire anchord to start point of helix: (majordiameter/2, 0, 0) with 
-	trangle base line extended outwards to force intersection with shaft during shaft.cut(thread) operation """
-	padding = .25		# extra distance trangle base line is extended outwards past shaft wall, without affecting Dmin (for booleans performance)
-						# 	ISO standard profile height above shaft wall.
-	profheight = pitch * 5/16 * math.sqrt(3)		# ISO 68M
-	v1 = Base.Vector(minordiameter/2 + profheight + padding, 0, padding/math.sqrt(3))	
-	v2 = Base.Vector(minordiameter/2, 0, -pitch*5/16)
-	v3 = Base.Vector(minordiameter/2, 0, -pitch*9/16)	
-	v4 = Base.Vector(minordiameter/2 + profheight + padding, 0, -pitch*7/8 - padding/math.sqrt(3))
-	l1 = Part.LineSegment(v1,v2)
-	l3 = Part.LineSegment(v3,v4)
-	l4 = Part.LineSegment(v4,v1)
-	if roundroot:
-		v5 = Base.Vector(minordiameter/2 - pitch/8/math.sqrt(3), 0, -pitch*7/16)		# ARc center point for roundroot
-		a1 = Part.Arc(v2, v5, v3)
-		sprofile = Part.Shape([l1, a1, l3, l4])
-	else:
-		l2 = Part.LineSegment(v2,v3)
-		sprofile = Part.Shape([l1, l2, l3, l4])
-	return Part.Wire(sprofile.Edges)
-# End method makeProfileExt681M()
-
-def makeProfileInt681M(minordiameter, pitch, roundroot):	
-	""" Generated ISO 68.1M cutter profile wire anchord to start point of helix: (majordiameter/2, 0, 0) with 
-	trangle base line extended inwords to force intersection with insert wall during insert.cut(thread) operation """
-	padding = .25		# extra distance trangle base line is extended outwards past shaft wall, without affecting Dmin (for booleans performance)
-						# 	ISO standard profile height above shaft wall.
-	profheight = pitch * 5/16 * math.sqrt(3)		# ISO 68M
-	v1 = Base.Vector(minordiameter/2 - padding, 0, padding/math.sqrt(3)-pitch/16)	
-	v2 = Base.Vector(minordiameter/2 + profheight, 0, -pitch*6/16)
-	v3 = Base.Vector(minordiameter/2 + profheight, 0, -pitch*8/16)	
-	v4 = Base.Vector(minordiameter/2 - padding, 0, -pitch*7/8 - padding/math.sqrt(3)+pitch/16)
-	l1 = Part.LineSegment(v1,v2)
-	l3 = Part.LineSegment(v3,v4)
-	l4 = Part.LineSegment(v4,v1)
-	if roundroot:
-		v5 = Base.Vector(minordiameter/2 + profheight + pitch/16/math.sqrt(3), 0, -pitch*7/16)		# ARc center point for roundroot
-		a1 = Part.Arc(v2, v5, v3)
-		sprofile = Part.Shape([l1, a1, l3, l4])
-	else:
-		l2 = Part.LineSegment(v2,v3)
-		sprofile = Part.Shape([l1, l2, l3, l4])
-	return Part.Wire(sprofile.Edges)
-# End method makeProfileInt681M()
+ISO261PDTABLE = TMStandards.standard("ISO 261 Metric")		# { Size : [Pitch(str)] } ISO 261 Table 2, read from Standards/ISO261.txt on first use
+# ISO 965 tolerance classes and deviations: table driven in TMTolerance.py
+# Thread geometry kernel (profiles, sweeps, THREADSTAGES stage functions): TMKernel.py
+
+def __getattr__(name):		# TMClasses.TMDialog: import the Qt dialog module only when a macro opens the dialog
+	if name == "TMDialog":
+		from ThreadMaker.TMDialog import TMDialog
+		return TMDialog
+	raise AttributeError("module " + __name__ + " has no attribute " + name)
+
+def threadSpec(fp):
+	""" Plain dict of the geometry-defining props of a ThreadExt/ThreadInt doc object (input to the kernel stages).
+	TMSpec.ThreadSpec.fromDict() gives the same spec as an object. """
+	custom = fp.ThrdStandard == "Custom"
+	return {"internal": fp.Proxy.Type == INTOBJECTNAME, "standard": fp.ThrdStandard,
+			"diameter": float(fp.Diameter), "pitch": float(fp.Pitch), "length": float(fp.Length), "taper": float(fp.Taper),
+			"clearance": float(fp.Clearance), "chamfer": fp.Chamfer, "lefty": fp.Lefty, "disable": fp.DisableThrd,
+			"roundroot": fp.RoundRoot, "tolpitch": "" if custom else fp.TolPitch, "tolcrest": "" if custom else fp.TolCrest,
+			"engine": getattr(fp, "Engine", "Sweep")}		# documents from 1.1 have no Engine prop
+
+# execute() runs the TMKernel stages in THREADSTAGES order and restarts from the first stage a property change invalidates.
+STAGEPROPS = { 		# Dictionary constant of { Property : first stage it invalidates }.  Props not listed never rebuild.
+	"ThrdStandard" : "shaft", "StdSize" : "shaft", "Diameter" : "shaft", "Pitch" : "shaft", "Length" : "shaft",
+	"Taper" : "shaft", "Clearance" : "shaft", "TolPitch" : "shaft", "TolCrest" : "shaft",
+	"RoundRoot" : "sweep", "Lefty" : "sweep", "Engine" : "sweep", "DisableThrd" : "sweep",
+	"Chamfer" : "base",
+	"AttachmentOffset" : "place", "Support" : "place", "AttachmentSupport" : "place", "MapMode" : "place",
+	"MapReversed" : "place", "MapPathParameter" : "place", "AttacherType" : "place" }
 
 # GENERIC THREAD BODY CLASSES #############################################################		
-class TMThreadShaft:		#######################################################
+class TMThreadBody:		#######################################################
+	""" Common execute/onChanged for ThreadExt and ThreadInsert doc objects: incremental rebuild of kernel stages.
+	Stage results live only in this session; documents store just Type. """
+	Type = ""
+	dirty = None		# index in THREADSTAGES of first stage invalidated by onChanged since last execute; None = no change
+	stages = None		# { stage name : result } of the last execute
+	prebuilt = None		# (threadCacheParams, finished body) built elsewhere, taken by the next execute if params match
+	failed = None		# (threadCacheParams, reason, retries) of a failed background build, reported by the next execute
+	bodies = None		# { DisableThrd : (threadCacheParams, finished body or None if left to TMCache) } of the current geometry
+	built = None		# builtKey() of the body in stages["base"]; None after a failure
+	pending = False		# fp.Shape is the plain shaft placeholder of a background build not delivered yet; saved with the document
+	executes = 0		# execute() calls this session; with TMThreadVP.edits shows how many recomputes each edit cost
+
+	def execute(self,fp):
+		"""Generates threaded body refined solid, starting from the first stage invalidated since the last execute. """
+		self.executes += 1
+		edits = fp.ViewObject.Proxy.edits if getattr(fp, "ViewObject", None) and hasattr(fp.ViewObject.Proxy, "edits") else 0
+		FreeCAD.Console.PrintLog("TM: execute " + fp.Name + " #%d after %d edits\n" % (self.executes, edits))
+		spec = threadSpec(fp)
+		start = self.firstStage(fp, spec)
+		if start is None:		# only props like Placement changed since last execute: nothing to rebuild
+			return
+		if not FreeCAD.ParamGet(DIAGPATH).GetBool("StageTiming", False):
+			self.build(fp, spec, start)
+			return
+		TMKernel._steptimes = []		# stepTime() collects kernel step times while this is a list
+		t0 = time.perf_counter()
+		try:
+			self.build(fp, spec, start)
+		finally:
+			steps, TMKernel._steptimes = TMKernel._steptimes, None
+			self.recordTimes(fp, steps, time.perf_counter() - t0)
+	#end method execute
+
+	def build(self, fp, spec, start):
+		"""Run kernel stages from THREADSTAGES[start] on, reusing cached stage results before it, and store the body in fp """
+		self.dirty = None
+		self.built = None
+		self.pending = False
+		if self.stages is None:	self.stages = {}
+		stages = self.stages
+		place = len(THREADSTAGES) - 1
+		for name in THREADSTAGES[start:]:	stages.pop(name, None)
+
+		cachekey = None
+		if start < place:
+			fp.IsPotato = False
+			if hasattr(fp, "PotatoReason"):	fp.PotatoReason = ""
+			if hasattr(fp, "Retries"):	fp.Retries = []
+			if hasattr(fp, "ShapeKey"):	fp.ShapeKey = ""		# no finished body to load until this build stores one
+			dims = threadDims(spec)
+			print(fp.Name + " Dmin = " + str(dims["diameter"]))
+			params = threadCacheParams(spec)
+			threadbody = self.heldBody(spec)		# DisableThrd toggled back: swap in the body kept from before
+			if threadbody:
+				stages["base"] = threadbody
+				fp.Shape = threadbody
+				start = place
+			elif not spec["disable"]:		# SHAPE CACHE: identical thread body already built (in any document)?
+				cachekey = TMCache.cacheKey(self.Type, params)
+				t = time.perf_counter()
+				if self.prebuilt and self.prebuilt[0] == params:	threadbody = self.prebuilt[1]	# from recomputeThreads()
+				else:												threadbody = TMKernel.cachedBody(self.Type, spec)	# or other hand, mirrored
+				self.prebuilt = None
+				stepTime("cache", t)
+				if threadbody:
+					stages["base"] = threadbody
+					fp.Shape = threadbody
+					start = place
+					cachekey = None
+
+		from ThreadMaker.TMWorker import isolationEnabled, isolatedBuild		# here: TMWorker imports this module
+		from ThreadMaker.TMBackground import backgroundEnabled, submitBuild
+		outcome = None		# (finished body or None, reason, retries) from a worker process
+		if cachekey and self.failed and self.failed[0] == params:		# background build failed
+			outcome = (None,) + self.failed[1:]
+		elif cachekey and backgroundEnabled() and self.offload(start) and submitBuild(fp, self.Type, spec, params):	# BACKGROUND: plain shaft for now
+			body, fallback = stageShaft(spec, dims)
+			stages["shaft"] = (dims, body, fallback)
+			fp.Shape = fallback
+			self.dirty = start		# TMBackground recomputes fp with the body as prebuilt
+			self.pending = True
+			fp.positionBySupport()
+			return
+		elif cachekey and isolationEnabled() and self.offload(start):		# ISOLATION: kernel stages in a worker process within ISOLATEPATH budgets
+			t = time.perf_counter()
+			outcome = isolatedBuild(self.Type, spec)		# the worker stores it in the shape cache
+			stepTime("isolated", t)
+		self.failed = None
+		if outcome:
+			threadbody, reason, retries = outcome
+			if retries:	self.recordRetries(fp, retries)
+			if threadbody is None:
+				self.dirty = start
+				fp.Shape = stageShaft(spec, dims)[1]
+				self.setPotato(fp, reason)
+				raise RuntimeError(self.ERRPREFIX + reason + "\n")
+			stages["base"] = threadbody
+			fp.Shape = threadbody
+			start = place
+			cachekey = None
+
+		name = THREADSTAGES[start]
+		retries = []		# attemptText() lines of stages that needed the retry ladder
+		try:
+			for name in THREADSTAGES[start:place]:
+				t = time.perf_counter()
+				if name == "shaft":
+					body, fallback = stageShaft(spec, dims)
+					stages["shaft"] = (dims, body, fallback)
+				else:
+					dims, body, fallback = stages["shaft"]
+				if name == THREADSTAGES[max(start, 1)]:	checkFeasible(spec, threadEngine(spec))	# map: fail before the costly stages
+				if name == "sweep":		run = lambda tune: stageSweep(spec, dims, body, tune)
+				elif name == "cut":		run = lambda tune: stageCut(spec, dims, body, stages["sweep"], tune)
+				elif name == "trim":	run = lambda tune: stageTrim(spec, dims, stages["cut"], tune)
+				elif name == "base":	run = lambda tune: stageBase(spec, dims, stages["trim"], baseVariant(spec), tune)
+				if name != "shaft":
+					stages[name], attempts = retryStage(name, run)
+					retries.extend(attemptText(name, attempts))
+				stepTime(name, t)
+		except RuntimeError as err:
+			self.dirty = THREADSTAGES.index(name)		# retry from the failed stage on next recompute
+			if "shaft" in stages:	fp.Shape = stages["shaft"][2]
+			self.recordRetries(fp, retries + attemptText(name, getattr(err, "attempts", [])))
+			self.setPotato(fp, str(err))
+			raise RuntimeError(self.ERRPREFIX + str(err) + "\n")
+		if retries:	self.recordRetries(fp, retries)
+
+		self.built = self.builtKey(spec)
+		t = time.perf_counter()
+		if cachekey: TMCache.cacheStore(cachekey, stages["base"])
+		if name != "place":		# new body built
+			fp.Shape = stages["base"]
+			if spec["internal"]:	print(fp.Name + " Dmaj = " + str(dims["majordiameter"]))
+			else:					print(fp.Name + " Dmaj = " + str(fp.Shape.BoundBox.XLength))
+		t = stepTime("store", t)
+		self.keepBody(spec, stages["base"])
+		self.persistShape(fp, spec, stages["base"])
+		fp.positionBySupport()
+		stepTime("place", t)
+	#end method build: threadbody created, fused with existing solid if any, stored into document fp object
+
+	def recordRetries(self, fp, retries):
+		"""Keep the retry ladder attempts of the last build in hidden read-only prop Retries (added on first retry) and log them"""
+		if not hasattr(fp, "Retries"):
+			fp.addProperty("App::PropertyStringList", "Retries", "Diagnostics", "Retry ladder attempts of the last build")
+			fp.setEditorMode("Retries", 3)		# read-only, hidden
+		fp.Retries = retries
+		for line in retries:	FreeCAD.Console.PrintLog("TM: Retry " + fp.Name + " " + line + "\n")
+
+	def setPotato(self, fp, reason):
+		"""Flag fp as failed and keep reason in hidden read-only prop PotatoReason (added on first failure)"""
+		fp.IsPotato = True
+		if not hasattr(fp, "PotatoReason"):
+			fp.addProperty("App::PropertyString", "PotatoReason", "Diagnostics", "Why the last execute failed")
+			fp.setEditorMode("PotatoReason", 3)		# read-only, hidden
+		fp.PotatoReason = reason.strip()
+
+	def recordTimes(self, fp, steps, total):
+		"""Store execute step times in hidden read-only props StageNames/StageTimes and write one log line:
+		TM: StageTiming <Name> total=<s> <step>=<s>...  (sweep.*, tile.* and base.* steps are inside their stage) """
+		if not hasattr(fp, "StageTimes"):		# added on first timed execute, so untimed documents are unchanged
+			fp.addProperty("App::PropertyStringList", "StageNames", "Diagnostics", "Steps timed by the last execute")
+			fp.addProperty("App::PropertyFloatList", "StageTimes", "Diagnostics", "Seconds per StageNames step of the last execute")
+			fp.setEditorMode("StageNames", 3)		# read-only, hidden
+			fp.setEditorMode("StageTimes", 3)
+		fp.StageNames = [step for step, seconds in steps] + ["total"]
+		fp.StageTimes = [seconds for step, seconds in steps] + [total]
+		FreeCAD.Console.PrintLog("TM: StageTiming " + fp.Name + " total=%.4f " % total
+				+ " ".join("%s=%.4f" % (step, seconds) for step, seconds in steps) + "\n")
+
+	def firstStage(self, fp, spec):
+		""" Index in THREADSTAGES of the first stage the next execute will run, or None if it has nothing to rebuild """
+		if self.dirty is None:	return None if self.stages else 0		# nothing held (reopened document): full rebuild
+		stages = self.stages or {}
+		place = len(THREADSTAGES) - 1
+		if self.dirty < place and "base" in stages and self.built == self.builtKey(spec):	# edits came back to the built spec
+			return place
+		for i, name in enumerate(THREADSTAGES[:min(self.dirty, place)]):	# upstream stage not cached (new session, failure, disabled sweep)
+			if name not in stages or (name == "sweep" and stages[name] is None and not spec["disable"]):
+				return i
+		if self.dirty == place and fp.Shape.isNull():	return 0
+		return self.dirty
+
+	def offload(self, start):
+		"""True if a build from THREADSTAGES[start] is worth a full kernel build in a worker process: it runs the sweep or
+		the cut, and no earlier stage result is held here to build on.  Trim and base edits, and edits below a held
+		shaft or sweep, rebuild faster in process (stage reuse, sweep memo) than a cold build elsewhere."""
+		return start <= THREADSTAGES.index("cut") and not any(name in (self.stages or {}) for name in THREADSTAGES[:start])
+
+	def heldBody(self, spec):
+		"""Finished body kept in memory by keepBody() for spec's DisableThrd state, else None (spilled bodies load through
+		the shape cache like any other)"""
+		held = (self.bodies or {}).get(spec["disable"])
+		if not held or held[0] != threadCacheParams(spec):	return None
+		return held[1]
+
+	def keepBody(self, spec, body):
+		"""Keep body for spec's DisableThrd state next to the body of the other state, dropping bodies of other geometry.
+		Threaded bodies stay in memory unless TMCache.holdBodies() is off; then the shape cache holds them on disk."""
+		params = threadCacheParams(spec)
+		self.bodies = {disable: held for disable, held in (self.bodies or {}).items() if held[0] == params}
+		spill = not spec["disable"] and not TMCache.holdBodies() and TMCache.cacheEnabled()
+		if spill and not TMCache.cacheHas(TMCache.cacheKey(self.Type, params)):
+			TMCache.cacheStore(TMCache.cacheKey(self.Type, params), body)
+		self.bodies[spec["disable"]] = (params, None if spill else body)
+
+	def persistShape(self, fp, spec, body):
+		"""With TMPersist.paramsOnly(), keep body in the shape cache under hidden prop ShapeKey (added on first use) and
+		leave Shape out of the document file.  Otherwise drop ShapeKey so the file stores Shape again."""
+		if not TMPersist.paramsOnly():
+			if hasattr(fp, "ShapeKey"):
+				fp.removeProperty("ShapeKey")
+				fp.setPropertyStatus("Shape", "-Transient")
+			return
+		key = self.shapeKey(spec)
+		if not TMCache.cacheHas(key):	TMCache.cacheStore(key, body)
+		if not hasattr(fp, "ShapeKey"):
+			fp.addProperty("App::PropertyString", "ShapeKey", "Persistence", "Shape cache key of the body; the file has no Shape")
+			fp.setEditorMode("ShapeKey", 3)		# read-only, hidden
+		fp.setPropertyStatus("Shape", "Transient")
+		fp.ShapeKey = key
+
+	def loadShape(self, fp):
+		"""Give fp the cached body its ShapeKey names, placed at fp.Placement, without execute.  If that body is gone or
+		fp's props no longer give ShapeKey, fp is marked for a full rebuild instead.  Returns True if the body was loaded."""
+		spec = threadSpec(fp)
+		body = TMCache.cacheLoad(fp.ShapeKey) if fp.ShapeKey and fp.ShapeKey == self.shapeKey(spec) else None
+		if body is None:
+			FreeCAD.Console.PrintMessage("TM: No stored shape for " + fp.Name + "; it is rebuilt on the next recompute\n")
+			self.dirty = 0
+			fp.enforceRecompute()
+			return False
+		self.stages = {"base": body}
+		self.built = self.builtKey(spec)
+		self.keepBody(spec, body)
+		placed = body.copy()
+		placed.Placement = fp.Placement		# an unplaced Shape assigned outside a recompute would reset Placement
+		fp.Shape = placed
+		fp.purgeTouched()
+		return True
+
+	def shapeKey(self, spec):
+		""" Shape cache key of the finished body for spec: the TMCache key of the thread body, another one if disabled """
+		params = threadCacheParams(spec)
+		return TMCache.cacheKey(self.Type, params + [True] if spec["disable"] else params)
+
+	def builtKey(self, spec):
+		""" Values that decide the finished body: threadCacheParams() plus disable """
+		return threadCacheParams(spec) + [spec["disable"]]
+
+	def onChanged(self, fp, prop):
+		"""Record the first kernel stage invalidated by prop (STAGEPROPS) so execute can skip the stages before it"""
+		if prop == "Visibility" and fp.Visibility and "Restore" not in fp.State:	TMPersist.restoreShape(fp)	# shown: needs its shape
+		if prop not in STAGEPROPS: return		# Placement, Label, Visibility... don't touch geometry
+		if "Restore" in fp.State: return		# document loading: saved Shape is already current
+		i = THREADSTAGES.index(STAGEPROPS[prop])
+		if self.dirty is None or i < self.dirty:	self.dirty = i
+		if i < len(THREADSTAGES) - 1 and "ThreadMaker.TMBackground" in sys.modules:	# body being built elsewhere is stale now
+			sys.modules["ThreadMaker.TMBackground"].cancelBuild(fp)
+
+	def onDocumentRestored(self, fp):
+		"""Parameters-only threads (ShapeKey prop) open without Shape: load it now, or in the GUI when a hidden thread no
+		other object uses is first shown or selected (TMPersist.deferShape).  A thread saved while its background build was
+		pending holds the plain shaft placeholder: mark it for the next recompute."""
+		if self.pending:
+			FreeCAD.Console.PrintWarning("TM: " + fp.Name + " was saved before its background build finished; recompute to build it\n")
+			fp.enforceRecompute()
+		if not hasattr(fp, "ShapeKey"): return
+		fp.setPropertyStatus("Shape", "Transient")
+		if FreeCAD.GuiUp and fp.ShapeKey and not fp.Visibility and not fp.InList:	TMPersist.deferShape(fp)
+		else:	self.loadShape(fp)		# FreeCADCmd: always now, so exports and dependent recomputes never see a null Shape
+
+	def dumps(self):
+		'''Only Type (and Pending for a placeholder) is saved with the document; cached stage shapes are rebuilt on demand.'''
+		if self.pending:	return {"Type": self.Type, "Pending": True}
+		return {"Type": self.Type}
+
+	def loads(self, state):
+		if state and "Type" in state:	self.Type = state["Type"]
+		self.pending = bool(state and state.get("Pending"))
+		self.dirty = 0		# no stage results held after reopening: a touch or forced recompute rebuilds, as in 1.1
+		return None
+
+	def __getstate__(self):		# FC < 1.0 spelling of dumps/loads
+		return self.dumps()
+
+	def __setstate__(self, state):
+		return self.loads(state)
+# end class TMThreadBody:
+
+class TMThreadShaft(TMThreadBody):		#######################################################
 	""" Threaded Shaft Class draws solid threaded shaft from  parameters given in initprops."""
-	norebuild=False		# set by onChanged to cause execute to skip solid rebuild for changes like Placement
+	ERRPREFIX = "ThreadShaft.execute: "
 
 	def __init__(self,obj, initprops):		# initprops = [standard(txt), size(txt), dia., pitch, length, taper, clearance, chamfer(bool)
 									# 	left-handed(bool), thrddisable(bool), roundroot(bool), pitchtol(txt), cresttol(txt)]
@@ -178,6 +422,7 @@ class TMThreadShaft:		#######################################################
 		obj.addProperty("App::PropertyBool","RoundRoot","Thread Parameters","Rounded profile root")
 		obj.addProperty("App::PropertyEnumeration", "TolPitch", "Thread Parameters", "Pitch Tolerance")
 		obj.addProperty("App::PropertyEnumeration", "TolCrest", "Thread Parameters", "Crest Tolerance")
+		obj.addProperty("App::PropertyEnumeration","Engine","Thread Parameters","Thread construction: full-length helix sweep, pitch-segment tiling, or boolean-free direct surface (straight threads)")
 		obj.addProperty("App::PropertyBool","IsPotato","Thread Parameters","Thread body is potato")
 		obj.setEditorMode("IsPotato",2)			# Hidden prop to indicate geometry failure for testing
 
@@ -208,6 +453,7 @@ class TMThreadShaft:		#######################################################
 		obj.Lefty = initprops[8]
 		obj.DisableThrd = initprops[9]
 		obj.RoundRoot = initprops[10]
+		obj.Engine = THREADENGINES
 		
 		obj.TolPitch = tuple(ISO965EXTPITCHTOL)
 		obj.TolPitch = initprops[11]
@@ -224,158 +470,14 @@ class TMThreadShaft:		#######################################################
 			obj.addExtension('Part::AttachExtensionPython')
 
 		self.Type = EXTOBJECTNAME
+		self.dirty = 0		# first execute builds every stage
 		obj.Proxy = self
 	# end __init__
-
-	def execute(self,fp):
-		"""Generates external threaded shaft refined solid. """
-		fp.IsPotato=False
-		if self.norebuild:		# only true when last onChange call was for placement or other listed prop
-			self.norebuild = False
-			return
-
-		# Get thread properties
-		majordiameter = float(fp.Diameter)		# for ISO this is Dmaj = Dnom-CrestDev
-		pitch = float(fp.Pitch)
-		length = float(fp.Length)
-		taper = float(fp.Taper)
-		clearance = float(fp.Clearance)
-		chamfer = fp.Chamfer
-		left = fp.Lefty
-		tdisable = fp.DisableThrd
-		roundroot = fp.RoundRoot
-		if fp.ThrdStandard == "Custom":
-			crestdev = 0.0
-			pitchdev = 0.0
-		else:
-			crestdev = iso965ExtCrestDev(pitch, fp.TolCrest)
-			pitchdev = iso965ExtPitchDev(majordiameter + crestdev, pitch, fp.TolPitch)
-
-		# Derived/internal vars
-		majordiameter = majordiameter - clearance	# Apply clearance to controlling diameter
-		profheight = pitch * 5/16 * math.sqrt(3)		# pre-tolerance truncation
-		diameter = majordiameter + crestdev - 2*profheight - pitchdev		# Dmin: ISO minor d with pitch tolerance applied
-		tdiameter = majordiameter - length * math.sin(taper*math.pi/180)		# top diamater (taper applied)
-		print(fp.Name + " Dmin = " + str(diameter))
-
-		# BUILD SHAFT
-		if majordiameter == tdiameter:
-			shaft = Part.makeCylinder(majordiameter/2, length)
-		else:
-			shaft = Part.makeCone(majordiameter/2, tdiameter/2, length)
-		shaft.rotate(Base.Vector(0,0,0), Base.Vector(0,0,1), 107)		#Fixes lots of problems doing booleans after thread fuse!
-
-		if not tdisable:			# Top L. corner of profile coincident with bottom R corner of shaft
-			# BUILD PROFILE
-			wprofile = makeProfileExt681M(diameter, pitch, roundroot)
-
-			# BUILD HELIX
-			helixpad = .01				# Extend helix above and below shaft by this amount to clear lines for flaky boolean ops
-			wprofile.translate(Base.Vector(0,0,-helixpad))		# Start thread sweep below shaft end for boolean ops
-			helix = Part.makeLongHelix(pitch, length+pitch+helixpad*2, majordiameter/2, -taper/2, left)
-			helix.translate(Base.Vector(0,0,-helixpad))
-
-			# BUILD THREAD
-			thread = Part.BRepOffsetAPI.MakePipeShell(helix)
-			thread.setFrenetMode(True)  # Sets a Frenet (true) or a CorrectedFrenet(false) trihedron to perform the sweeping.  False = corkscrew.
-			thread.setTransitionMode(1)  # 0=Transformed, *1=right corner transition, 2=Round corner
-			thread.add(wprofile, False)	# WithContact = connect to helix.  WithCorrection = orthogonal to helix tangent.
-			if not thread.isReady():		
-				fp.Shape = shaft
-				fp.IsPotato = True
-				raise RuntimeError("ThreadShaft.execute: BRepOffsetAPI not ready error sweeping thread profile.\n")
-			thread.build()
-			if not thread.makeSolid(): 
-				fp.Shape = shaft
-				fp.IsPotato = True
-				raise RuntimeError("ThreadShaft.execute: BRepOffsetAPI faled building swept thread solid.\n")
-			sthread = thread.shape()
-
-			# SHAFT.CUT(THREAD)
-			threadbody = shaft.cut(sthread)
-			if threadbody.childShapes()==[]:
-				fp.Shape = shaft
-				fp.IsPotato = True
-				raise RuntimeError("ThreadShaft.execute: Failed while fusing thread to shaft.  Try changing Diameter or Pitch.\n")
-
-		else:	# TDISABLE=True; Make fast cosmetic thread.  shaft=shaft solid
-			threadbody=shaft
-
-		# TRIM THREAD BODY TOP/BOTTOM
-		# Best results obtained using padding (not tolerance), and ensuring intersection points aren't too close
-		threadbody.rotate(Base.Vector(0,0,0), Base.Vector(0,0,1), 37)
-
-		# BEVEL TOP with THREAD.sub(Part.Face.revolve())
-		tmindiameter = tdiameter + crestdev - 2*profheight - pitchdev		#tdiameter, tmindiameter = top diameters after any taper
-		v1 = Base.Vector(tmindiameter/2-0.1, 0, length+0.1)
-		v2 = Base.Vector(tdiameter/2+0.1, 0, length+0.1)
-		v3 = Base.Vector(tdiameter/2+0.1, 0, length - tdiameter/2 + tmindiameter/2 - 0.2)
-		l1 = Part.LineSegment(v1,v2)
-		l2 = Part.LineSegment(v2,v3)
-		l3 = Part.LineSegment(v3,v1)
-		topcutter = Part.Shape([l1, l2, l3])
-		topcutter = Part.Wire(topcutter.Edges)
-		topcutter = Part.Face(topcutter)
-		topcutter = topcutter.revolve(Base.Vector(0,0,1), Base.Vector(0,0,360))
-		topcutter.rotate(Base.Vector(0,0,0), Base.Vector(0,0,1), 207)
-		threadbody = threadbody.cut(topcutter)	
-
-		if chamfer:
-			# FUSE BASE TO SHAFT
-			pad = pitch/13.856 + 1e-2	#0.15			#shifts upper, inner coner up and in to prevent fuse failures on rounded root
-			v1 = Base.Vector(0, 0, 0)		# Profile 45 deg. trangle embedded in shaft deeply enough to fill round root 
-			v10 = Base.Vector(0, 0, profheight + pad)
-			v2 = Base.Vector(diameter/2-pad, 0, profheight + pad)			# (shifted by pitch/4)
-			v3 = Base.Vector(majordiameter/2, 0, 0)
-			l1 = Part.LineSegment(v1,v10)
-			l10 = Part.LineSegment(v10, v2)
-			l2 = Part.LineSegment(v2,v3)
-			l3 = Part.LineSegment(v3,v1)
-			base = Part.Shape([l1, l10, l2, l3])
-			base = Part.Wire(base.Edges)
-			base = Part.Face(base)
-			base = base.revolve(Base.Vector(0,0,1), Base.Vector(0,0,360))
-			base.rotate(Base.Vector(0,0,0), Base.Vector(0,0,1), -107)
-			threadbody.translate(Base.Vector(0,0,2e-3))		# just enough to avoid a "splitter line" on bottom, and avoid fuse errors.
-			threadbody = threadbody.fuse(base)
-			if threadbody.childShapes()==[]:
-				fp.Shape = shaft
-				fp.IsPotato = True
-				raise RuntimeError("ThreadShaft.execute: Failed while fusing base to thread.  Try changing Diameter or Pitch.\n")
-#			threadbody = threadbody.removeSplitter()	# removeSplitter increases render time 800% on 100mm thread but enables PD fuse
-		else:	# Bevel Base
-			# BEVEL BOTTOM with THREAD.sub(Part.Face.revolve())
-			v1 = Base.Vector(diameter/2-0.1, 0, -0.1)
-			v2 = Base.Vector(majordiameter/2+0.1, 0, -0.1)
-			v3 = Base.Vector(majordiameter/2+0.1, 0, majordiameter/2 - diameter/2 + 0.2)
-			l1 = Part.LineSegment(v1,v2)
-			l2 = Part.LineSegment(v2,v3)
-			l3 = Part.LineSegment(v3,v1)
-			cutter = Part.Shape([l1, l2, l3])
-			cutter = Part.Wire(cutter.Edges)
-			cutter = Part.Face(cutter)
-			cutter = cutter.revolve(Base.Vector(0,0,0), Base.Vector(0,0,1), 360)
-			cutter.rotate(Base.Vector(0,0,0), Base.Vector(0,0,1), -107)
-			threadbody = threadbody.cut(cutter)
-		
-		fp.Shape = threadbody
-		fp.positionBySupport()
-		print(fp.Name + " Dmaj = " + str(fp.Shape.BoundBox.XLength))
-	#end method execute: threadbody created, fused with existing solid if any, stored into document fp object
-
-	def onChanged(self, fp, prop):
-		"""If prop in coded list, set flag to prevent execute from rebuilding the thread solid"""
-		#To prevent recomputation on transform.
-#		print(str(prop))
-		if prop in ["Placement"]:
-			self.norebuild=True
-		else:
-			self.norebuild=False
 # end class TMThreadShaft:
 
-class TMThreadInsert:		#######################################################
+class TMThreadInsert(TMThreadBody):		#######################################################
 	""" Threaded Insert Class draws solid threaded insert from  parameters given in initprops."""
-	norebuild=False		# set by onChanged to cause execute to skip solid rebuild for changes like Placement
+	ERRPREFIX = "ThreadInsert.execute: "
 
 	def __init__(self,obj, initprops):		# initprops = [standard(txt), size(txt), dia., pitch, length, taper, clearance, chamfer(bool)
 									# 	left-handed(bool), thrddisable(bool), roundroot(bool), pitchtol(txt), cresttol(txt)]
@@ -399,6 +501,7 @@ class TMThreadInsert:		#######################################################
 		obj.addProperty("App::PropertyBool","RoundRoot","Thread Parameters","Rounded profile root")
 		obj.addProperty("App::PropertyEnumeration", "TolPitch", "Thread Parameters", "Pitch Tolerance")
 		obj.addProperty("App::PropertyEnumeration", "TolCrest", "Thread Parameters", "Crest Tolerance")
+		obj.addProperty("App::PropertyEnumeration","Engine","Thread Parameters","Thread construction: full-length helix sweep, pitch-segment tiling, or boolean-free direct surface (straight threads)")
 		obj.addProperty("App::PropertyBool","IsPotato","Thread Parameters","Thread body is potato")
 		obj.setEditorMode("IsPotato",2)			# Hidden prop to indicate geometry failure for testing
 
@@ -429,6 +532,7 @@ class TMThreadInsert:		#######################################################
 		obj.Lefty = initprops[8]
 		obj.DisableThrd = initprops[9]
 		obj.RoundRoot = initprops[10]
+		obj.Engine = THREADENGINES
 		
 		obj.TolPitch = tuple(ISO965INTPITCHTOL)
 		obj.TolPitch = initprops[11]
@@ -445,155 +549,9 @@ class TMThreadInsert:		#######################################################
 			obj.addExtension('Part::AttachExtensionPython')
 
 		self.Type = INTOBJECTNAME
+		self.dirty = 0		# first execute builds every stage
 		obj.Proxy = self
 	# end __init__
-
-	def execute(self,fp):
-		"""Generates internal threaded shaft refined solid. """
-		fp.IsPotato=False
-		if self.norebuild:		# only true when last onChange call was for placement or other listed prop
-			self.norebuild = False
-			return
-
-		# Get thread properties
-		majordiameter = float(fp.Diameter)		# for ISO this is Dmaj = Dnom-CrestDev
-		pitch = float(fp.Pitch)
-		length = float(fp.Length)
-		taper = float(fp.Taper)
-		clearance = float(fp.Clearance)
-		chamfer = fp.Chamfer
-		left = fp.Lefty
-		tdisable = fp.DisableThrd
-		roundroot = fp.RoundRoot
-		if fp.ThrdStandard == "Custom":
-			crestdev = 0.0
-			pitchdev = 0.0
-		else:
-			crestdev = iso965IntCrestDev(pitch, fp.TolCrest)
-			pitchdev = iso965IntPitchDev(majordiameter + crestdev, pitch, fp.TolPitch)
-
-		# Derived/internal vars
-		majordiameter = majordiameter + clearance	# Apply clearance to controlling diameter
-		profheight = pitch * 5/16 * math.sqrt(3)		# pre-tolerance truncation
-		diameter = majordiameter - crestdev - 2*profheight + pitchdev		# Dmin: ISO minor d with pitch tolerance applied
-		tdiameter = majordiameter + length * math.sin(taper*math.pi/180)		# top diamater (taper applied)
-		tmindiameter = tdiameter - crestdev - 2*profheight + pitchdev		#tdiameter, tmindiameter = top diameters after any taper
-		print(fp.Name + " Dmin = " + str(diameter))
-
-		# BUILD INSERT
-		if majordiameter == tdiameter:
-			shaft = Part.makeCylinder(diameter/2, length)
-		else:
-			shaft = Part.makeCone(diameter/2, tmindiameter/2, length)
-		insert = Part.makeCylinder(tdiameter/2+0.5, length)
-		insert = insert.cut(shaft)
-		insert.rotate(Base.Vector(0,0,0), Base.Vector(0,0,1), 107)		#Fixes lots of problems doing booleans after thread fuse!
-
-		if not tdisable:			# Top L. corner of profile coincident with bottom R corner of shaft
-			# BUILD PROFILE
-			wprofile = makeProfileInt681M(diameter, pitch, roundroot)
-
-			# BUILD HELIX
-			helixpad = .01				# Extend helix above and below shaft by this amount to clear lines for flaky boolean ops
-			wprofile.translate(Base.Vector(0,0,-helixpad))		# Start thread sweep below shaft end for boolean ops
-			helix = Part.makeLongHelix(pitch, length+pitch+helixpad*2, majordiameter/2, taper/2, left)
-			helix.translate(Base.Vector(0,0,-helixpad))
-
-			# BUILD THREAD
-			thread = Part.BRepOffsetAPI.MakePipeShell(helix)
-			thread.setFrenetMode(True)  # Sets a Frenet (true) or a CorrectedFrenet(false) trihedron to perform the sweeping.  False = corkscrew.
-			thread.setTransitionMode(1)  # 0=Transformed, *1=right corner transition, 2=Round corner
-			thread.add(wprofile, False)	# WithContact = connect to helix.  WithCorrection = orthogonal to helix tangent.
-			if not thread.isReady():		
-				fp.Shape = shaft
-				fp.IsPotato = True
-				raise RuntimeError("ThreadInsert.execute: BRepOffsetAPI not ready error sweeping thread profile.\n")
-			thread.build()
-			if not thread.makeSolid(): 
-				fp.Shape = shaft
-				fp.IsPotato = True
-				raise RuntimeError("ThreadInsert.execute: BRepOffsetAPI faled building swept thread solid.\n")
-			sthread = thread.shape()
-
-			# INSERT.CUT(THREAD)
-			threadbody = insert.cut(sthread)
-			if threadbody.childShapes()==[]:
-				fp.Shape = shaft
-				fp.IsPotato = True
-				raise RuntimeError("ThreadInsert.execute: Failed while fusing thread to insert.  Try changing Diameter or Pitch.\n")
-
-		else:	# TDISABLE=True; Make fast cosmetic thread.  shaft=shaft solid
-			threadbody=insert
-
-		# TRIM THREAD BODY TOP/BOTTOM
-		# Best results obtained using padding (not tolerance), and ensuring intersection points aren't too close
-		threadbody.rotate(Base.Vector(0,0,0), Base.Vector(0,0,1), 37)
-
-		# BEVEL TOP with THREAD.sub(Part.Face.revolve())
-		v1 = Base.Vector(tdiameter/2+0.1, 0, length+0.1)
-		v2 = Base.Vector(tmindiameter/2-0.1, 0, length+0.1)
-		v3 = Base.Vector(tmindiameter/2-0.1, 0, length - tdiameter/2 + tmindiameter/2 - 0.2)
-		l1 = Part.LineSegment(v1,v2)
-		l2 = Part.LineSegment(v2,v3)
-		l3 = Part.LineSegment(v3,v1)
-		topcutter = Part.Shape([l1, l2, l3])
-		topcutter = Part.Wire(topcutter.Edges)
-		topcutter = Part.Face(topcutter)
-		topcutter = topcutter.revolve(Base.Vector(0,0,1), Base.Vector(0,0,360))
-		topcutter.rotate(Base.Vector(0,0,0), Base.Vector(0,0,1), 207)
-		threadbody = threadbody.cut(topcutter)	
-
-		if chamfer:
-			# FUSE BASE
-			pad = pitch/27.712 + 0.01			# Shifts top corner of bevel triangle up and in (to insert) to clear round root and reduce fuse failures
-			v1 = Base.Vector(tdiameter/2 + 0.5, 0, 0)		# Profile 45 deg. trangle embedded in shaft deeply enough to fill round root 
-			v2 = Base.Vector(diameter/2, 0, 0)	
-			v3 = Base.Vector(majordiameter/2+pad, 0, profheight + pad)
-			l1 = Part.LineSegment(v1,v2)
-			l2 = Part.LineSegment(v2,v3)
-			l3 = Part.LineSegment(v3,v1)
-			base = Part.Shape([l1,  l2, l3])
-			base = Part.Wire(base.Edges)       
-			base = Part.Face(base)
-			base = base.revolve(Base.Vector(0,0,1), Base.Vector(0,0,360))
-			base.rotate(Base.Vector(0,0,0), Base.Vector(0,0,1), -107)
-			vpad = 7e-4 + pitch*3e-4 + majordiameter*5e-5	#<<< Passes 100% test cases on chamfer base & round root
-			threadbody.translate(Base.Vector(0,0,vpad))
-			threadbody = threadbody.fuse(base)
-			if threadbody.childShapes()==[]:
-				fp.Shape = shaft
-				fp.IsPotato = True
-				raise RuntimeError("ThreadInsert.execute: Failed while fusing base to insert.  Try changing Diameter or Pitch.\n")
-#			threadbody = threadbody.removeSplitter()	# removeSplitter increases render time 800% on 100mm thread but enables PD fuse
-		else:	# Bevel Base
- 			# BEVEL BOTTOM with THREAD.sub(Part.Face.revolve())
-			v1 = Base.Vector(majordiameter/2+0.1, 0, -0.1)
-			v2 = Base.Vector(diameter/2-0.1, 0, -0.1)
-			v3 = Base.Vector(diameter/2-0.1, 0, majordiameter/2 - diameter/2 + 0.2)
-			l1 = Part.LineSegment(v1,v2)
-			l2 = Part.LineSegment(v2,v3)
-			l3 = Part.LineSegment(v3,v1)
-			cutter = Part.Shape([l1, l2, l3])
-			cutter = Part.Wire(cutter.Edges)
-			cutter = Part.Face(cutter)
-			cutter = cutter.revolve(Base.Vector(0,0,0), Base.Vector(0,0,1), 360)
-			cutter.rotate(Base.Vector(0,0,0), Base.Vector(0,0,1), -107)
-			threadbody = threadbody.cut(cutter)
-		
-		fp.Shape = threadbody
-		fp.positionBySupport()
-		print(fp.Name + " Dmaj = " + str(majordiameter))
-	#end method execute: threadbody created, fused with existing solid if any, stored into document fp object
-
-	def onChanged(self, fp, prop):
-		"""If prop in coded list, set flag to prevent execute from rebuilding the thread solid"""
-		#To prevent recomputation on transform.
-#		print(str(prop))
-		if prop in ["Placement"]:
-			self.norebuild=True
-		else:
-			self.norebuild=False
-
 # end class TMThreadInsert:
 
 
@@ -602,6 +560,8 @@ class TMThreadVP:		#######################################################
 	OriginalShapeColor = ()		#Store shape color to restore after rendering disabled threads
 	OriginalShapeTransparency = 0.0
 	ObjectType = ""
+	pending = None		# props queued by assignments made inside updateData(); None when no updateData() is running
+	edits = 0			# updateData() calls for STAGEPROPS props from outside (user edits) this session
 
 	def __init__(self, obj):
 		'''Set this object to the proxy object of the actual view provider'''
@@ -612,29 +572,45 @@ class TMThreadVP:		#######################################################
 		self.vobj = vobj
 
 	def updateData(self, fp, prop):
-		''' Properties validation for updates to Data panel in combo view. '''
+		''' Properties validation for updates to Data panel in combo view.  Assignments made while validating call
+		updateData() again; those calls only queue their prop, and the queue is worked off here one prop at a time, so a
+		cascade (StdSize sets Pitch sets Diameter may reset TolPitch) settles once before the recompute that follows. '''
+		if self.pending is not None:		# re-entered by an assignment below
+			if prop not in self.pending:	self.pending.append(prop)
+			return
+		if prop in STAGEPROPS:	self.edits += 1
+		self.pending = [prop]
+		handled = []
+		try:
+			while self.pending and len(handled) < UPDATELIMIT:
+				handled.append(self.pending.pop(0))
+				self.updateProp(fp, handled[-1])
+			if any(p in ["ThrdStandard", "StdSize", "Diameter", "Pitch", "Length", "TolPitch", "TolCrest", "Lefty"] for p in handled):
+				self.updateLabel(fp)
+		finally:
+			self.pending = None
+	# end VP updateData
+
+	def updateProp(self, fp, prop):
+		''' Validate and update props depending on prop.  Only assigns changed values: every assignment touches fp. '''
 		self.ObjectType = fp.Proxy.Type		# So getIcon can choose which icon
 		# if thrdstandard != Custom: size, pitch, pitchtol and cresttol recompute maj. diameter
 		#CAUTION: don't set props to value which fails validation!
 		# Custom dimension validation also applied to standardized inputs
-		if prop in ["Diameter", "Pitch", "Length", "Taper"]: 
+		if prop in ["Diameter", "Pitch", "Length", "Taper", "Clearance"]:
 			# Validation for D, P, and L based on large-pitch-small-diameter combinations which break the boolean ops in ThreadShaft.execute()
-			#d now = od.  id = od - p*1.1.  P < (od - 1.1*p - c)/1.1; < (od - c)/1.1 - p; P < (od - c)/2.2; P*2.2 + c < OD
-			if prop == "Diameter" and float(fp.Diameter)-float(fp.Clearance) < float(fp.Pitch)  * 2.3: 
-				FreeCAD.Console.PrintWarning("TM:  Outer Diameter (less Clearance and Taper) cannot be < (Pitch  * 2.3)\n")
-				fp.Diameter = float(fp.Pitch) * 2.3 + float(fp.Clearance)
-			#d now = od.  id = od - p*1.1.  P < (od - 1.1*p - c)/1.1; < (od - c)/1.1 - p; P < (od - c)/2.2
-			if prop == "Pitch" and fp.ThrdStandard == "Custom" and float(fp.Pitch) > float(fp.Diameter)/2.2 or float(fp.Pitch) < 0.1:
-				FreeCAD.Console.PrintWarning("TM:  Pitch cannot be > (Diameter / 2.3) and cannot be < 0.1.\n")
-				if float(fp.Pitch) < 0.1:	fp.Pitch = 0.1
-				if float(fp.Pitch) > float(fp.Diameter)/2.2:	fp.Pitch = float(fp.Diameter)/2.3
-			if prop == "Length" and float(fp.Length) < float(fp.Pitch):
-				FreeCAD.Console.PrintWarning("TM:  Length cannot be < Pitch\n")
-				fp.Length = fp.Pitch
-			if prop in ["Diameter", "Pitch", "Clearance"] and (float(fp.Diameter)-float(fp.Clearance)) < 3.5 and float(fp.Pitch) > 1.0:
-				FreeCAD.Console.PrintWarning("TM: Computation may fail if Diameter (less Clearance & Taper) < 3.5 while Pitch > 1.0.\n")
-			if prop == "Taper" and abs(float(fp.Taper)) > 5.0:
-				FreeCAD.Console.PrintWarning("TM: Computation may fail if |Taper| > 5.0.\n")
+			# Rules and limits are shared with TMDialog.onOk() (TMValidate.py).  Warn for broken rules involving prop;
+			# an error clamps prop into its feasible range (a changed Diameter is moved to make room for the Pitch).
+			spec = threadSpec(fp)
+			key = prop.lower()
+			clamped = False
+			for rule, severity, parameter, message in checkSpec(spec):
+				if key not in RULEPARAMS[rule] or rule == "tolerance": continue		# tolerance: handled with the tol props below
+				FreeCAD.Console.PrintWarning("TM:  " + message + "\n")
+				if severity != "error" or clamped or (prop == "Pitch" and fp.ThrdStandard != "Custom"): continue		# std pitch: enumeration
+				low, high = feasibleRanges(spec)[key]
+				setattr(fp, prop, min(max(spec[key], low), high))
+				clamped = True
 
 		if prop == "DisableThrd":			# toggle shape color for thread disable state
 			if fp.DisableThrd:
@@ -659,7 +635,7 @@ class TMThreadVP:		#######################################################
 				fp.setEditorMode("Taper", 0)
 			else:			# Not Custom
 				fp.setEditorMode("StdSize", 0)		# Size enumeration
-				if fp.StdSize not in list(ISO261PDTABLE): fp.StdSize = "M10"
+				if fp.StdSize not in ISO261PDTABLE: fp.StdSize = "M10"
 				oldpitch = fp.Pitch						# Pitch
 				fp.removeProperty("Pitch")
 				fp.addProperty("App::PropertyEnumeration","Pitch","Thread Parameters","Standard pitch selection")
@@ -669,7 +645,7 @@ class TMThreadVP:		#######################################################
 				fp.setEditorMode("TolCrest", 0)
 				fp.setEditorMode("Diameter", 1)
 				fp.setEditorMode("Taper", 1)
-				fp.Taper = SUPPORTEDSTANDARDS[fp.ThrdStandard]		# Taper
+				if float(fp.Taper) != SUPPORTEDSTANDARDS[fp.ThrdStandard]:	fp.Taper = SUPPORTEDSTANDARDS[fp.ThrdStandard]		# Taper
 
 		if prop == "StdSize" and fp.ThrdStandard != "Custom":		# update p(popup2)
 			oldpitch = fp.Pitch
@@ -680,28 +656,26 @@ class TMThreadVP:		#######################################################
 
 		if prop in ["StdSize", "Pitch", "TolCrest"] and fp.ThrdStandard != "Custom":		# Update Major Dia.
 			if self.ObjectType == EXTOBJECTNAME:
-				fp.Diameter = float(fp.StdSize[1:]) - iso965ExtCrestDev(float(fp.Pitch), fp.TolCrest)
+				diameter = float(fp.StdSize[1:]) - iso965ExtCrestDev(float(fp.Pitch), fp.TolCrest)
 			else:
-				fp.Diameter = float(fp.StdSize[1:]) + iso965IntCrestDev(float(fp.Pitch), fp.TolCrest)
+				diameter = float(fp.StdSize[1:]) + iso965IntCrestDev(float(fp.Pitch), fp.TolCrest)
+			if float(fp.Diameter) != diameter:	fp.Diameter = diameter
 
 		if prop in ["StdSize", "Pitch", "TolCrest", "TolPitch"] and fp.ThrdStandard != "Custom":		# Override invalid Tol
-			if self.ObjectType == EXTOBJECTNAME:
-				if iso965ExtPitchDev(float(fp.StdSize[1:]), float(fp.Pitch), fp.TolPitch) > iso965ExtCrestDev(float(fp.Pitch), fp.TolCrest):
-					FreeCAD.Console.PrintWarning("TM:  " + fp.TolPitch + " Ptich Deviation exceeded " + fp.TolCrest + " Crest Deviation.  Pitch Tolerance was set to 3h.\n")
-					fp.TolPitch = "3h"
-			else: 
-				if iso965IntPitchDev(float(fp.StdSize[1:]), float(fp.Pitch), fp.TolPitch) > iso965IntCrestDev(float(fp.Pitch), fp.TolCrest):
-					FreeCAD.Console.PrintWarning("TM:  " + fp.TolPitch + " Ptich Deviation exceeded " + fp.TolCrest + " Crest Deviation.  Pitch Tolerance was set to 4H.\n")
-					fp.TolPitch = "4H"
-
-		if prop in ["ThrdStandard", "StdSize", "Diameter", "Pitch", "Length", "TolPitch", "TolCrest", "Lefty"]: 
-			if fp.ThrdStandard == "Custom":
-				self.label = self.ObjectType + " " + str(round(float(fp.Diameter),3)) + " x " + str(round(float(fp.Pitch),3)) + " - " + str(round(float(fp.Length),3)) + " "
-			else:
-				self.label = self.ObjectType + " " + fp.StdSize + " x " + str(round(float(fp.Pitch),3)) + " - " + fp.TolPitch + fp.TolCrest + " - " + str(round(float(fp.Length),3)) + " "
-			if fp.Lefty:	self.label = self.label + "- L "
-			fp.Label = self.label
-	# end VP updateData
+			if any(rule == "tolerance" for rule, severity, parameter, message in checkSpec(threadSpec(fp))):
+				tolpitch = "3h" if self.ObjectType == EXTOBJECTNAME else "4H"		# tightest class: always fits
+				FreeCAD.Console.PrintWarning("TM:  " + fp.TolPitch + " Ptich Deviation exceeded " + fp.TolCrest + " Crest Deviation.  Pitch Tolerance was set to " + tolpitch + ".\n")
+				fp.TolPitch = tolpitch
+
+	# end VP updateProp
+
+	def updateLabel(self, fp):
+		if fp.ThrdStandard == "Custom":
+			self.label = self.ObjectType + " " + str(round(float(fp.Diameter),3)) + " x " + str(round(float(fp.Pitch),3)) + " - " + str(round(float(fp.Length),3)) + " "
+		else:
+			self.label = self.ObjectType + " " + fp.StdSize + " x " + str(round(float(fp.Pitch),3)) + " - " + fp.TolPitch + fp.TolCrest + " - " + str(round(float(fp.Length),3)) + " "
+		if fp.Lefty:	self.label = self.label + "- L "
+		if fp.Label != self.label:	fp.Label = self.label
 
 	def getDisplayModes(self,obj):
 		'''Return a list of display modes.'''
@@ -748,589 +722,3 @@ class TMThreadVP:		#######################################################
 				Since no data were serialized nothing needs to be done here.'''
 		return None
 # end class PDThreadVP
-
-### DIALOG BOX #############################################################################
-class TMDialog(QtGui.QDialog):
-	"""Opens dialog window for ThreadMaker object parameters. Pre-loads values from MRU if present.  Results returned =
-	[thrdstandard, stdsize, diameter, pitch, length, taper, clearance, chamfer(bool), left-handed(bool), thrddisable(bool), 
-	roundroot(bool), pitchtol, cresttol]"""
-	def __init__(self, internal):		
-		""" internal(bool) = true if internal thread object, else external thread """
-		super(TMDialog, self).__init__()
-		self.initUI(internal)
-
-	def initUI(self, internal):			
-		""" internal(bool) = true if internal thread object, else external thread """
-		# Define box & widgets; load MRU values if present.  Pitch may be popup list (non-custom) or textInput (custom) 
-		# but widgets for both are defined here
-		self.result = None
-		self.internal = internal
-		param_grp=FreeCAD.ParamGet(MRUPATH)
-		self.ts = param_grp.GetString("thrdstandard")
-		self.sz = param_grp.GetString("stdsize")
-		self.d = param_grp.GetFloat("diameter")
-		self.p = param_grp.GetFloat("pitch")
-		self.l = param_grp.GetFloat("length")
-		self.t = param_grp.GetFloat("taper")
-		self.c = param_grp.GetFloat("clearance")
-		self.cb = param_grp.GetBool("chamfer")
-		self.lh = param_grp.GetBool("lefty")
-		self.td = param_grp.GetBool("tdisable")
-		self.rr = param_grp.GetBool("roundroot")
-		self.pt = param_grp.GetString("pitchtol")
-		self.ct = param_grp.GetString("cresttol")
-
-		if internal: 		# internal thread tol selection lists & crest deviation
-			self.ISO965PITCHTOL = ISO965INTPITCHTOL
-			self.ISO965CRESTTOL = ISO965INTCRESTTOL
-		else:	 		# external thread tol selection lists & crest deviation
-			self.ISO965PITCHTOL = ISO965EXTPITCHTOL
-			self.ISO965CRESTTOL = ISO965EXTCRESTTOL
-
-
-
-		# thrdstandard reconfigures pitch from textInput to popup, size, diameter, taper
-		# size reloads pitch popup list
-		# if thrdstandard != Custom: size, pitch, pitchtol and cresttol recompute maj. diameter
-		# Build dialog window and stuff MRU values in
-		line = 15			# first line of text/widgets on dialog box
-		lineinc = 25		# added for each new line
-
-		# define window		xLoc,yLoc,xDim,yDim
-		self.setGeometry(250, 250, 270, 355)
-		self.setWindowTitle("Thread Parameters")
-		self.setWindowFlags(QtCore.Qt.WindowStaysOnTopHint)
-		self.setMouseTracking(True)
-
-		# Standard selection box- validate mru, set custom if undef. standard
-		self.label0 = QtGui.QLabel("Thread Standard", self)
-		self.label0.move(20, line)
-		# if ts then textInput = listbox with ts prepouplated
-		self.popup1 = QtGui.QComboBox(self)
-		self.popup1.setStyleSheet("background : #ffffff")
-		self.popup1.addItems(list(SUPPORTEDSTANDARDS))
-		if self.ts not in list(SUPPORTEDSTANDARDS): self.ts = "Custom"
-		self.popup1.setCurrentIndex(list(SUPPORTEDSTANDARDS).index(self.ts))
-		self.popup1.activated[int].connect(self.onPopup1)	# changed from [str] since deprecated Qt6
-		self.popup1.setFixedWidth(125)
-		self.popup1.move(120, line)
-
-		# Size selection box- if Custom: clear() else: populate SIZES list and set MRU value
-		line+=lineinc
-		self.label5 = QtGui.QLabel("Standard Size", self)
-		self.label5.move(20, line)
-		# if sz then prepouplate.  if Custom then clear else 
-		self.popup0 = QtGui.QComboBox(self)
-		self.popup0.setStyleSheet("background : #ffffff")
-		self.popup0.addItems(list(ISO261PDTABLE))
-		if self.ts == "Custom":
-			self.popup0.setDisabled(True)
-			self.label5.setStyleSheet("color : #b0b0b0")
-		else:	# ISO261 Standard
-			if self.sz not in list(ISO261PDTABLE): self.sz = list(ISO261PDTABLE)[19]
-			self.popup0.setCurrentIndex(list(ISO261PDTABLE).index(self.sz))
-			self.label5.setStyleSheet("color :")
-		self.popup0.activated[int].connect(self.onPopup0)
-		self.popup0.setFixedWidth(65)
-		self.popup0.move(120, line)
-		if self.ts != "Custom": self.popup0.setFocus()
-
-		# Pitch Tol. selection box
-		line+=lineinc
-		self.label8 = QtGui.QLabel("Pitch Tol.", self)
-		self.label8.move(20, line)
-		self.popup3 = QtGui.QComboBox(self)
-		self.popup3.setStyleSheet("background : #ffffff")
-		self.popup3.addItems(self.ISO965PITCHTOL)
-		if self.ts == "Custom":
-			self.label8.setStyleSheet("color : #b0b0b0")
-			self.popup3.setDisabled(True)
-		else:	# populate pitch tolerances
-			if self.pt not in self.ISO965PITCHTOL: 
-				if self.internal: self.pt = "6H"
-				else: self.pt = "6g"
-			self.popup3.setCurrentIndex(self.ISO965PITCHTOL.index(self.pt))
-			self.label8.setStyleSheet("color :")
-		self.popup3.activated[int].connect(self.onPopup3)
-		self.popup3.setFixedWidth(50)
-		self.popup3.move(80, line)
-
-		# Crest Tol. selection box
-		self.label9 = QtGui.QLabel("Crest Tol.", self)
-		self.label9.move(140, line)
-		# if sz then prepouplate.  if Custom then clear else 
-		self.popup4 = QtGui.QComboBox(self)
-		self.popup4.setStyleSheet("background : #ffffff")
-		self.popup4.addItems(self.ISO965CRESTTOL)
-		if self.ts == "Custom":
-			self.label9.setStyleSheet("color : #b0b0b0")
-			self.popup4.setDisabled(True)
-		else:	# populate pitch tolerances
-			if self.ct not in self.ISO965CRESTTOL:
-				if self.internal: self.ct = "6H"
-				else: self.ct = "6g"
-			self.popup4.setCurrentIndex(self.ISO965CRESTTOL.index(self.ct))
-			self.label9.setStyleSheet("color :")
-		self.popup4.activated[int].connect(self.onPopup4)
-		self.popup4.setFixedWidth(50)
-		self.popup4.move(200, line)
-
-		# Diameter input box
-		line+=lineinc
-		self.label1 = QtGui.QLabel("Major Diameter", self)
-		self.label1.move(20, line)
-		# if ts then textInput = listbox with sz prepouplated
-		self.textInput = QtGui.QLineEdit(self)
-		self.textInput.setFixedWidth(50)
-		self.textInput.move(120, line)
-		self.textInput.setText(str(round(self.d,3)))
-		if self.ts == "Custom":
-			self.textInput.setFocus()
-		else:
-			self.textInput.setDisabled(True)
-
-		# Pitch: if Custom: input box else: popup list.  Create both widgets, but show only one
-		line+=lineinc
-		self.label2 = QtGui.QLabel("Pitch", self)
-		self.label2.move(20, line)
-		self.textInput1 = QtGui.QLineEdit(self)
-		self.textInput1.setFixedWidth(50)
-		self.textInput1.move(120, line)
-		self.textInput1.setText(str(max(self.p, 0.2)))		# stuff p here even if non custom
-		self.popup2 = QtGui.QComboBox(self)
-		self.popup2.setStyleSheet("background : #ffffff")
-		self.popup2.activated[int].connect(self.onPopup2)
-		self.popup2.setFixedWidth(50)
-		self.popup2.move(120, line)
-		if self.ts == "Custom": 
-			self.popup2.hide()
-		else:
-			self.textInput1.hide()
-			self.popup2.addItems(ISO261PDTABLE[self.sz])
-			if str(self.p) not in ISO261PDTABLE[self.sz]: 	self.p = float(ISO261PDTABLE[self.sz][0])
-			self.popup2.setCurrentIndex(ISO261PDTABLE[self.sz].index(str(self.p)))
-			if internal:
-				self.d = float(self.sz[1:]) + iso965IntCrestDev(self.p, self.ct)		# Update diameter with crest deviation
-			else:
-				self.d = float(self.sz[1:]) - iso965ExtCrestDev(self.p, self.ct)		# Update diameter with crest deviation
-			self.textInput.setText(str(round(self.d, 3)))
-
-		# Length input box
-		line+=lineinc
-		self.label3 = QtGui.QLabel("Length", self)
-		self.label3.move(20, line)
-		self.textInput2 = QtGui.QLineEdit(self)
-		self.textInput2.setText(str(self.l))
-		self.textInput2.setFixedWidth(50)
-		self.textInput2.move(120, line)
-
-		# Taper input box with ISO, NPT setter buttons- if not Custom, grey out/ read-only
-		line+=lineinc
-		self.label6 = QtGui.QLabel("Taper", self)
-		self.label6.move(20, line)
-		self.textInput3 = QtGui.QLineEdit(self)
-		self.textInput3.setFixedWidth(50)
-		self.textInput3.move(120, line)
-		self.textInput3.setText(str(self.t))
-		if self.ts != "Custom":
-			self.textInput3.setDisabled(True)
-		# ISO button
-		self.pushButton1 = QtGui.QPushButton('ISO', self)
-		self.pushButton1.clicked.connect(self.onPushButton1)
-		self.pushButton1.setMaximumWidth(30)
-		self.pushButton1.move(180, line)
-		# NPT button
-		self.pushButton2 = QtGui.QPushButton('NPT', self)
-		self.pushButton2.clicked.connect(self.onPushButton2)
-		self.pushButton2.setMaximumWidth(30)
-		self.pushButton2.move(220, line)
-
-		# Radial clearance input box
-		line+=lineinc
-		self.label7 = QtGui.QLabel("Radial Clearance", self)
-		self.label7.move(20, line)
-		self.textInput4 = QtGui.QLineEdit(self)
-		self.textInput4.setText(str(self.c))
-		self.textInput4.setFixedWidth(50)
-		self.textInput4.move(120, line)
-
-		# Base selection radio buttons
-		line+=(lineinc+5)
-		self.radioButton1 = QtGui.QRadioButton("Bevel Base",self)
-		self.radioButton1.clicked.connect(self.onRadioButton1)
-		self.radioButton1.move(20,line)
-		self.radioButton2 = QtGui.QRadioButton("Chamfer Base",self)
-		self.radioButton2.clicked.connect(self.onRadioButton2)
-		self.radioButton2.move(120,line)
-		if self.cb:	#Chamfer base
-			self.radioButton2.click()
-		else:
-			self.radioButton1.click()
-
-		# Rounded Root checkbox
-		line+=(lineinc+5)
-		self.checkbox3 = QtGui.QCheckBox("Rounded Root", self)
-		self.checkbox3.clicked.connect(self.onCheckbox3)
-		self.checkbox3.move(20, line)
-		if self.rr: self.checkbox3.click()
-		# Left Handed checkbox
-		self.checkbox1 = QtGui.QCheckBox("Left-Handed", self)
-		self.checkbox1.clicked.connect(self.onCheckbox1)
-		self.checkbox1.move(130,line)
-		if self.lh: self.checkbox1.click()
-		# Thread Disable checkbox
-		line+=lineinc
-		self.checkbox2 = QtGui.QCheckBox("Disable Thread", self)
-		self.checkbox2.clicked.connect(self.onCheckbox2)
-		self.checkbox2.move(20,line)
-		if self.td: self.checkbox2.click()
-
-		# OK button
-		line+=(lineinc+10)
-		self.okButton = QtGui.QPushButton('OK', self)
-		self.okButton.clicked.connect(self.onOk)
-		self.okButton.move(40, line)
-		# cancel button
-		self.cancelButton = QtGui.QPushButton('Cancel', self)
-		self.cancelButton.clicked.connect(self.onCancel)
-		self.cancelButton.setAutoDefault(True)
-		self.cancelButton.move(150, line)
-
-		# Warning message placeholder
-		line+=lineinc
-		self.warnlabel = QtGui.QLabel("", self)
-		self.warnlabel.setMinimumWidth(250)
-		self.warnlabel.setStyleSheet("color : #ff0000")
-		self.warnlabel.move(10, line)
-		# now make the window visible
-		self.show()
-	# end initUI(self):	
-
-	def onRadioButton1(self):
-		"""Bevel base"""
-		return
-
-	def onRadioButton2(self):
-		"""Chamfer base"""
-		return
-
-	def onPushButton1(self):
-		"""ISO thread taper override"""
-		if self.ts == "Custom": self.textInput3.setText("0.0")
-
-	def onPushButton2(self):
-		"""NPT thread taper override"""
-		if self.ts == "Custom": self.textInput3.setText("1.7899")
-
-	def onCheckbox1(self):
-		"""Left-Handed thread"""
-		return
-
-	def onCheckbox2(self):
-		"""Disable thread"""
-		return
-
-	def onCheckbox3(self):
-		"""Rounded root"""
-		return
-
-	def onPopup1(self, selection):		# Standard selected- set widdgets for sz, d, p, t
-		"""Thread standard popup list """		# size/label5/popup0::tolp/label8/popup3::tolc/lagel9/popup4
-		self.ts = list(SUPPORTEDSTANDARDS)[selection]
-		if self.ts == "Custom": 	# Disable sz, p(popup), ct, pt; enable d, p(textbox), t.
-			self.popup0.setDisabled(True)					# popup0 = size 
-			self.label5.setStyleSheet("color : #b0b0b0")
-			self.popup2.hide()					# popup2 = pitch
-			self.popup3.setDisabled(True)		# pitch tol
-			self.label8.setStyleSheet("color : #b0b0b0")
-			self.popup4.setDisabled(True)		# crest tol
-			self.label9.setStyleSheet("color : #b0b0b0")
-			self.textInput.setDisabled(False)		# textInput = diameter
-			self.textInput1.show()				# textInput1 = pitch
-			self.textInput1.setText(self.popup2.currentText())
-			self.textInput3.setDisabled(False)	# textInput3 = taper
-		else: 	# ISO261	# Enable sz, p(popup), ct, pt; disable d, p(textbox), t
-							# load SIZES, PITCHES, diameter; set initial values for sz, p, d, t
-			self.popup0.setDisabled(False)					# StdSize
-			self.label5.setStyleSheet("color : ")
-			self.d = int(self.d)
-			self.sz = "M" + str(self.d)
-			if self.sz not in list(ISO261PDTABLE): self.sz = list(ISO261PDTABLE)[19]
-			self.popup0.setCurrentIndex(list(ISO261PDTABLE).index(self.sz))
-			self.popup2.clear()								# pitch
-			self.popup2.addItems(ISO261PDTABLE[self.sz])
-			if str(self.p) not in ISO261PDTABLE[self.sz]: self.p = float(ISO261PDTABLE[self.sz][0])
-			self.popup2.setCurrentIndex(ISO261PDTABLE[self.sz].index(str(self.p)))
-			self.popup2.show()			
-			self.popup3.setDisabled(False)			# 
-			self.label8.setStyleSheet("color : ")
-			self.popup4.setDisabled(False)
-			self.label9.setStyleSheet("color : ")
-			self.textInput.setDisabled(True)				# diameter
-			if self.internal:
-				self.d = float(self.sz[1:]) + iso965IntCrestDev(self.p, self.ct)
-			else:
-				self.d = float(self.sz[1:]) - iso965ExtCrestDev(self.p, self.ct)
-			self.textInput.setText(str(round(self.d, 3)))
-			self.textInput1.hide()
-			self.textInput3.setDisabled(True)			# taper
-			self.textInput3.setText(str(SUPPORTEDSTANDARDS[self.ts]))
-		return
-	# End onPopup1
-
-	def onPopup0(self, selection):		#Size popup- store sz selection, update p(popup2), update d
-		self.sz = list(ISO261PDTABLE)[selection]
-		self.popup2.clear()
-		self.popup2.addItems(ISO261PDTABLE[self.sz])
-		if str(self.p) not in ISO261PDTABLE[self.sz]: self.p = float(ISO261PDTABLE[self.sz][0])
-		self.popup2.setCurrentIndex(ISO261PDTABLE[self.sz].index(str(self.p)))
-		if self.ts != "Custom":
-			if self.internal:
-				self.d = float(self.sz[1:]) + iso965IntCrestDev(self.p, self.ct)		# diameter	
-			else:
-				self.d = float(self.sz[1:]) - iso965ExtCrestDev(self.p, self.ct)		# diameter	
-			self.textInput.setText(str(round(self.d,3)))
-		return
-
-	def onPopup2(self, selection):		# Pitch popup- lookup and set d
-		"""Pitch popup list for Custom std"""
-		self.p = float(ISO261PDTABLE[self.sz][selection])
-		if self.ts != "Custom":
-			if self.internal:
-				self.d = float(self.sz[1:]) + iso965IntCrestDev(self.p, self.ct)		# diameter	
-			else:
-				self.d = float(self.sz[1:]) - iso965ExtCrestDev(self.p, self.ct)		# diameter	
-			self.textInput.setText(str(round(self.d,3)))
-		return
-
-	def onPopup3(self, selection):		# Pitch tolerance popup- lookup and set pt
-		self.pt = self.ISO965PITCHTOL[selection]
-		return
-
-	def onPopup4(self, selection):		# Crest tolerance popup- lookup and set pt
-		self.ct = self.ISO965CRESTTOL[selection]
-		if self.ts != "Custom":		
-			if self.internal:
-				self.d = float(self.sz[1:]) + iso965IntCrestDev(self.p, self.ct)		# diameter	
-			else:
-				self.d = float(self.sz[1:]) - iso965ExtCrestDev(self.p, self.ct)		# diameter	
-			self.textInput.setText(str(round(self.d,3)))
-		return
-
-	def onCancel(self):
-		self.result = None
-		self.close()
-
-	def onOk(self):
-		"""Validate numeric text inputs, convert to positive if negative"""
-		self.ts = self.popup1.currentText()
-		self.sz = self.popup0.currentText()
-		self.d = self.textInput.text()
-		if self.ts == "Custom":
-			self.p = self.textInput1.text()
-		else:
-			self.p = self.popup2.currentText()
-		self.l = self.textInput2.text()
-		self.t = self.textInput3.text()
-		self.c = self.textInput4.text()
-		self.cb = self.radioButton2.isChecked()
-		self.lh = self.checkbox1.isChecked()
-		self.td = self.checkbox2.isChecked()
-		self.rr = self.checkbox3.isChecked()
-		self.pt = self.popup3.currentText()
-		self.ct = self.popup4.currentText()
-		self.warnlabel.setText("")
-
-		# Validate numeric input types, convert to float
-		try:		# pitch type validation
-			self.p = float(self.p)
-		except:
-			self.warnlabel.setText("Pitch must be a number (you entered " + str(self.p) + ")")
-			self.textInput1.setFocus()
-			return
-		try:		# diameter type validation
-			self.d = float(self.d)
-		except:
-			self.warnlabel.setText("Diameter must be a number (you entered " + str(self.d) + ")")
-			self.textInput.setFocus()
-			return
-		try:		# length validation
-			self.l = float(self.l)
-		except:
-			self.warnlabel.setText("Length must be a number (you entered " + str(self.l) + ")")
-			self.textInput2.setFocus()
-			return
-		try:		# taper angle validation
-			self.t = float(self.t)
-		except:
-			self.warnlabel.setText("Taper angle must be a number (you entered " + str(self.t) + ")")
-			self.textInput3.setFocus()
-			return
-		try:
-			self.c = float(self.c)
-		except:
-			self.warnlabel.setText("Clearance must be a number (you entered " + str(self.c) + ")")
-			self.textInput4.setFocus()
-			return
-
-		# Validate numeric values pitch, diam., len., clearance
-		if self.p < 0: self.p = -self.p
-		if self.d < 0: self.d = -self.d		
-		if self.l < 0: self.l = -self.l
-		#self.d = thread O.D.  id ~ od - p*1.1.     P < (od - 1.1*p - c)/1.1; < (od - c)/1.1 - p;  ***P < (od - c)/2.2***
-		if (self.p >= (self.d-self.c)/2.3):
-			self.warnlabel.setText("Pitch must be less than (Dia. - Clearance)/ 2.3")
-			self.textInput1.setFocus()
-			return
-		if (self.p < 0.1):
-			self.warnlabel.setText("Pitch must be greater than 0.1")
-			self.textInput1.setFocus()
-			return
-		if self.l <= self.p:
-			self.warnlabel.setText("Length must be greater than Pitch")
-			self.textInput2.setFocus()
-			return
-		if self.internal and self.ts != "Custom" and iso965IntPitchDev(float(self.sz[1:]), self.p, self.pt) > iso965IntCrestDev(self.p, self.ct):
-			self.warnlabel.setText(self.pt + " Pitch Dev. > " + self.ct + " Crest Dev. is not allowed.")
-			self.popup4.setFocus()
-			return
-		if not self.internal and self.ts != "Custom" and iso965ExtPitchDev(float(self.sz[1:]), self.p, self.pt) > iso965ExtCrestDev(self.p, self.ct):
-			self.warnlabel.setText(self.pt + " Pitch Dev. > " + self.ct + " Crest Dev. is not allowed.")
-			self.popup4.setFocus()
-			return
-			
-		# Stash validated props in MRU list for prepopulation
-		param_grp=FreeCAD.ParamGet(MRUPATH)
-		param_grp.SetString("thrdstandard", self.ts)
-		param_grp.SetString("stdsize", self.sz)
-		param_grp.SetFloat("diameter", self.d)
-		param_grp.SetFloat("pitch", self.p)
-		param_grp.SetFloat("length", self.l)
-		param_grp.SetFloat("taper", self.t)
-		param_grp.SetFloat("clearance", self.c)
-		param_grp.SetBool("chamfer", self.cb)
-		param_grp.SetBool("lefty", self.lh)
-		param_grp.SetBool("tdisable", self.td)
-		param_grp.SetBool("roundroot", self.rr)
-		param_grp.SetString("pitchtol", self.pt)
-		param_grp.SetString("cresttol", self.ct)
-
-		self.result = [self.ts, self.sz, self.d, self.p, self.l, self.t, self.c, self.cb, self.lh, self.td, self.rr, self.pt, self.ct]
-		self.close()
-
-	def keyPressEvent(self, event):
-		if event.nativeVirtualKey() == 27:			# Esc pressed
-			self.onCancel()
-		if event.nativeVirtualKey() == 13:			# Enter pressed
-			self.onOk()
-# end class ThreadDialog(QtGui.QDialog):
-
-### ISO 261 Table 2: Pitch/Diameter Selection.  Finer pitches were added per Table 1.
-#   Generated from PDF --(data entry)--> MS Excel, Excel formulas to format into Python dictonary text strings
-ISO261PDTABLE = {  
-'M1':['0.25','0.2'],
-'M1.1':['0.25','0.2'],
-'M1.2':['0.25','0.2'],
-'M1.4':['0.3','0.2'],
-'M1.6':['0.35','0.2'],
-'M1.8':['0.35','0.2'],
-'M2':['0.4','0.25','0.2'],
-'M2.2':['0.45','0.25','0.2'],
-'M2.5':['0.45','0.35','0.25','0.2'],
-'M3':['0.5','0.35','0.25','0.2'],
-'M3.5':['0.6','0.35','0.25','0.2'],
-'M4':['0.7','0.5','0.35','0.25'],
-'M4.5':['0.75','0.5','0.35','0.25'],
-'M5':['0.8','0.5','0.35','0.25'],
-'M5.5':['0.8','0.5','0.35','0.25'],
-'M6':['1.0','0.75','0.5','0.35','0.25'],
-'M7':['1.0','0.75','0.5','0.35','0.25'],
-'M8':['1.25','1.0','0.75','0.5','0.35','0.25'],
-'M9':['1.25','1.0','0.75','0.5','0.35','0.25'],
-'M10':['1.5','1.25','1.0','0.75','0.5','0.35'],
-'M11':['1.5','1.0','0.75','0.5','0.35'],
-'M12':['1.75','1.5','1.25','1.0','0.75','0.5'],
-'M14':['2.0','1.5','1.25','1.0','0.75','0.5'],
-'M15':['2.0','1.5','1.0','0.75','0.5'],
-'M16':['2.0','1.5','1.0','0.75','0.5'],
-'M17':['2.0','1.5','1.0','0.75','0.5'],
-'M18':['2.5','2.0','1.5','1.0','0.75','0.5'],
-'M20':['2.5','2.0','1.5','1.0','0.75','0.5'],
-'M22':['2.5','2.0','1.5','1.0','0.75','0.5'],
-'M24':['3.0','2.0','1.5','1.0','0.75'],
-'M25':['3.0','2.0','1.5','1.0','0.75'],
-'M26':['3.0','1.5','1.0','0.75'],
-'M27':['3.0','2.0','1.5','1.0','0.75'],
-'M28':['3.0','2.0','1.5','1.0','0.75'],
-'M30':['3.5','3.0','2.0','1.5','1.0','0.75'],
-'M32':['3.5','2.0','1.5','1.0','0.75'],
-'M33':['3.5','3.0','2.0','1.5','0.75'],
-'M35':['3.5','1.5','1.0'],
-'M36':['4.0','3.0','2.0','1.5','1.0'],
-'M38':['4.0','1.5','1.0'],
-'M39':['4.0','3.0','2.0','1.5','1.0'],
-'M40':['4.0','3.0','2.0','1.5','1.0'],
-'M42':['4.5','4.0','3.0','2.0','1.5','1.0'],
-'M45':['4.5','4.0','3.0','2.0','1.5','1.0'],
-'M48':['5.0','4.0','3.0','2.0','1.5','1.0'],
-'M50':['5.0','4.0','3.0','2.0','1.5','1.0'],
-'M52':['5.0','4.0','3.0','2.0','1.5','1.0'],
-'M55':['5.0','4.0','3.0','2.0','1.5','1.0'],
-'M56':['5.5','4.0','3.0','2.0','1.5','1.0'],
-'M58':['5.5','4.0','3.0','2.0','1.5','1.0'],
-'M60':['5.5','4.0','3.0','2.0','1.5','1.0'],
-'M62':['5.5','4.0','3.0','2.0','1.5','1.0'],
-'M64':['6.0','4.0','3.0','2.0','1.5','1.0'],
-'M65':['6.0','4.0','3.0','2.0','1.5','1.0'],
-'M68':['6.0','4.0','3.0','2.0','1.5','1.0'],
-'M70':['6.0','4.0','3.0','2.0','1.5','1.0'],
-'M72':['6.0','4.0','3.0','2.0','1.5','1.0'],
-'M75':['6.0','4.0','3.0','2.0','1.5','1.0'],
-'M76':['6.0','4.0','3.0','2.0','1.5','1.0'],
-'M78':['6.0','2.0','1.5','1.0'],
-'M80':['6.0','4.0','3.0','2.0','1.5','1.0'],
-'M82':['6.0','2.0','1.5'],
-'M85':['6.0','4.0','3.0','2.0','1.5'],
-'M90':['6.0','4.0','3.0','2.0','1.5'],
-'M95':['6.0','4.0','3.0','2.0','1.5'],
-'M100':['6.0','4.0','3.0','2.0','1.5'],
-'M105':['6.0','4.0','3.0','2.0','1.5'],
-'M110':['6.0','4.0','3.0','2.0','1.5'],
-'M115':['6.0','4.0','3.0','2.0','1.5'],
-'M120':['6.0','4.0','3.0','2.0','1.5'],
-'M125':['8.0','6.0','4.0','3.0','2.0','1.5'],
-'M130':['8.0','6.0','4.0','3.0','2.0','1.5'],
-'M135':['8.0','6.0','4.0','3.0','2.0','1.5'],
-'M140':['8.0','6.0','4.0','3.0','2.0','1.5'],
-'M145':['8.0','6.0','4.0','3.0','2.0','1.5'],
-'M150':['8.0','6.0','4.0','3.0','2.0','1.5'],
-'M155':['8.0','6.0','4.0','3.0','2.0'],
-'M160':['8.0','6.0','4.0','3.0','2.0'],
-'M165':['8.0','6.0','4.0','3.0','2.0'],
-'M170':['8.0','6.0','4.0','3.0','2.0'],
-'M175':['8.0','6.0','4.0','3.0','2.0'],
-'M180':['8.0','6.0','4.0','3.0','2.0'],
-'M185':['8.0','6.0','4.0','3.0','2.0'],
-'M190':['8.0','6.0','4.0','3.0','2.0'],
-'M195':['8.0','6.0','4.0','3.0','2.0'],
-'M200':['8.0','6.0','4.0','3.0','2.0'],
-'M205':['8.0','6.0','4.0','3.0'],
-'M210':['8.0','6.0','4.0','3.0'],
-'M215':['8.0','6.0','4.0','3.0'],
-'M220':['8.0','6.0','4.0','3.0'],
-'M225':['8.0','6.0','4.0','3.0'],
-'M230':['8.0','6.0','4.0','3.0'],
-'M235':['8.0','6.0','4.0','3.0'],
-'M240':['8.0','6.0','4.0','3.0'],
-'M245':['8.0','6.0','4.0','3.0'],
-'M250':['8.0','6.0','4.0','3.0'],
-'M255':['8.0','6.0','4.0','3.0'],
-'M260':['8.0','6.0','4.0','3.0'],
-'M265':['8.0','6.0','4.0','3.0'],
-'M270':['8.0','6.0','4.0','3.0'],
-'M275':['8.0','6.0','4.0','3.0'],
-'M280':['8.0','6.0','4.0','3.0'],
-'M285':['8.0','6.0','4.0','3.0'],
-'M290':['8.0','6.0','4.0','3.0'],
-'M295':['8.0','6.0','4.0','3.0'],
-'M300':['8.0','6.0','4.0','3.0'] }
\ No newline at end of file
@@ -0,0 +1,526 @@
+# INDEMNITY: By using this software you agree not to sue me for any reason related to the use of this software.
+#
+# Copyright (c) 2022 Kurt Funderburg, all rights not explicitly relinquished in LGPL reserved.
+#
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU Lesser General Public License (LGPL)
+#   as published by the Free Software Foundation; either version 2 of
+#   the License, or (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Library General Public License for more details.
+#
+#   You should have received a copy of the GNU Library General Public
+#   License along with this program; if not, write to the Free Software
+#   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307
+#   USA
+#
+#	ThreadMaker parameter dialog (Qt).  TMMakeShaft/TMMakeInsert macros open it as TMClasses.TMDialog, which imports this
+#	module on first use; nothing headless imports it, so FreeCADCmd jobs never load PySide.
+
+import FreeCAD
+from PySide import QtGui, QtCore
+from ThreadMaker.TMTolerance import ISO965EXTPITCHTOL, ISO965EXTCRESTTOL, ISO965INTPITCHTOL, ISO965INTCRESTTOL, \
+		iso965ExtCrestDev, iso965IntCrestDev
+from ThreadMaker.TMSpec import specFromInitProps
+from ThreadMaker.TMValidate import checkSpec, feasibleRanges
+from ThreadMaker.TMClasses import MRUPATH, SUPPORTEDSTANDARDS, ISO261PDTABLE
+
+__title__ = "ThreadMaker: Thread parameter dialog."
+__author__ = "Kurt Funderburg"
+
+### DIALOG BOX #############################################################################
+class TMDialog(QtGui.QDialog):
+	"""Opens dialog window for ThreadMaker object parameters. Pre-loads values from MRU if present.  Results returned =
+	[thrdstandard, stdsize, diameter, pitch, length, taper, clearance, chamfer(bool), left-handed(bool), thrddisable(bool), 
+	roundroot(bool), pitchtol, cresttol]"""
+	def __init__(self, internal):		
+		""" internal(bool) = true if internal thread object, else external thread """
+		super(TMDialog, self).__init__()
+		self.initUI(internal)
+
+	def initUI(self, internal):			
+		""" internal(bool) = true if internal thread object, else external thread """
+		# Define box & widgets; load MRU values if present.  Pitch may be popup list (non-custom) or textInput (custom) 
+		# but widgets for both are defined here
+		self.result = None
+		self.internal = internal
+		param_grp=FreeCAD.ParamGet(MRUPATH)
+		self.ts = param_grp.GetString("thrdstandard")
+		self.sz = param_grp.GetString("stdsize")
+		self.d = param_grp.GetFloat("diameter")
+		self.p = param_grp.GetFloat("pitch")
+		self.l = param_grp.GetFloat("length")
+		self.t = param_grp.GetFloat("taper")
+		self.c = param_grp.GetFloat("clearance")
+		self.cb = param_grp.GetBool("chamfer")
+		self.lh = param_grp.GetBool("lefty")
+		self.td = param_grp.GetBool("tdisable")
+		self.rr = param_grp.GetBool("roundroot")
+		self.pt = param_grp.GetString("pitchtol")
+		self.ct = param_grp.GetString("cresttol")
+
+		if internal: 		# internal thread tol selection lists & crest deviation
+			self.ISO965PITCHTOL = ISO965INTPITCHTOL
+			self.ISO965CRESTTOL = ISO965INTCRESTTOL
+		else:	 		# external thread tol selection lists & crest deviation
+			self.ISO965PITCHTOL = ISO965EXTPITCHTOL
+			self.ISO965CRESTTOL = ISO965EXTCRESTTOL
+
+
+
+		# thrdstandard reconfigures pitch from textInput to popup, size, diameter, taper
+		# size reloads pitch popup list
+		# if thrdstandard != Custom: size, pitch, pitchtol and cresttol recompute maj. diameter
+		# Build dialog window and stuff MRU values in
+		line = 15			# first line of text/widgets on dialog box
+		lineinc = 25		# added for each new line
+
+		# define window		xLoc,yLoc,xDim,yDim
+		self.setGeometry(250, 250, 270, 355)
+		self.setWindowTitle("Thread Parameters")
+		self.setWindowFlags(QtCore.Qt.WindowStaysOnTopHint)
+		self.setMouseTracking(True)
+
+		# Standard selection box- validate mru, set custom if undef. standard
+		self.label0 = QtGui.QLabel("Thread Standard", self)
+		self.label0.move(20, line)
+		# if ts then textInput = listbox with ts prepouplated
+		self.popup1 = QtGui.QComboBox(self)
+		self.popup1.setStyleSheet("background : #ffffff")
+		self.popup1.addItems(list(SUPPORTEDSTANDARDS))
+		if self.ts not in list(SUPPORTEDSTANDARDS): self.ts = "Custom"
+		self.popup1.setCurrentIndex(list(SUPPORTEDSTANDARDS).index(self.ts))
+		self.popup1.activated[int].connect(self.onPopup1)	# changed from [str] since deprecated Qt6
+		self.popup1.setFixedWidth(125)
+		self.popup1.move(120, line)
+
+		# Size selection box- if Custom: clear() else: populate SIZES list and set MRU value
+		line+=lineinc
+		self.label5 = QtGui.QLabel("Standard Size", self)
+		self.label5.move(20, line)
+		# if sz then prepouplate.  if Custom then clear else 
+		self.popup0 = QtGui.QComboBox(self)
+		self.popup0.setStyleSheet("background : #ffffff")
+		self.popup0.addItems(list(ISO261PDTABLE.sizes()))
+		if self.ts == "Custom":
+			self.popup0.setDisabled(True)
+			self.label5.setStyleSheet("color : #b0b0b0")
+		else:	# ISO261 Standard
+			if self.sz not in ISO261PDTABLE: self.sz = "M10"
+			self.popup0.setCurrentIndex(ISO261PDTABLE.sizeIndex(self.sz))
+			self.label5.setStyleSheet("color :")
+		self.popup0.activated[int].connect(self.onPopup0)
+		self.popup0.setFixedWidth(65)
+		self.popup0.move(120, line)
+		if self.ts != "Custom": self.popup0.setFocus()
+
+		# Pitch Tol. selection box
+		line+=lineinc
+		self.label8 = QtGui.QLabel("Pitch Tol.", self)
+		self.label8.move(20, line)
+		self.popup3 = QtGui.QComboBox(self)
+		self.popup3.setStyleSheet("background : #ffffff")
+		self.popup3.addItems(self.ISO965PITCHTOL)
+		if self.ts == "Custom":
+			self.label8.setStyleSheet("color : #b0b0b0")
+			self.popup3.setDisabled(True)
+		else:	# populate pitch tolerances
+			if self.pt not in self.ISO965PITCHTOL: 
+				if self.internal: self.pt = "6H"
+				else: self.pt = "6g"
+			self.popup3.setCurrentIndex(self.ISO965PITCHTOL.index(self.pt))
+			self.label8.setStyleSheet("color :")
+		self.popup3.activated[int].connect(self.onPopup3)
+		self.popup3.setFixedWidth(50)
+		self.popup3.move(80, line)
+
+		# Crest Tol. selection box
+		self.label9 = QtGui.QLabel("Crest Tol.", self)
+		self.label9.move(140, line)
+		# if sz then prepouplate.  if Custom then clear else 
+		self.popup4 = QtGui.QComboBox(self)
+		self.popup4.setStyleSheet("background : #ffffff")
+		self.popup4.addItems(self.ISO965CRESTTOL)
+		if self.ts == "Custom":
+			self.label9.setStyleSheet("color : #b0b0b0")
+			self.popup4.setDisabled(True)
+		else:	# populate pitch tolerances
+			if self.ct not in self.ISO965CRESTTOL:
+				if self.internal: self.ct = "6H"
+				else: self.ct = "6g"
+			self.popup4.setCurrentIndex(self.ISO965CRESTTOL.index(self.ct))
+			self.label9.setStyleSheet("color :")
+		self.popup4.activated[int].connect(self.onPopup4)
+		self.popup4.setFixedWidth(50)
+		self.popup4.move(200, line)
+
+		# Diameter input box
+		line+=lineinc
+		self.label1 = QtGui.QLabel("Major Diameter", self)
+		self.label1.move(20, line)
+		# if ts then textInput = listbox with sz prepouplated
+		self.textInput = QtGui.QLineEdit(self)
+		self.textInput.textEdited.connect(self.onInputChanged)
+		self.textInput.setFixedWidth(50)
+		self.textInput.move(120, line)
+		self.textInput.setText(str(round(self.d,3)))
+		if self.ts == "Custom":
+			self.textInput.setFocus()
+		else:
+			self.textInput.setDisabled(True)
+
+		# Pitch: if Custom: input box else: popup list.  Create both widgets, but show only one
+		line+=lineinc
+		self.label2 = QtGui.QLabel("Pitch", self)
+		self.label2.move(20, line)
+		self.textInput1 = QtGui.QLineEdit(self)
+		self.textInput1.textEdited.connect(self.onInputChanged)
+		self.textInput1.setFixedWidth(50)
+		self.textInput1.move(120, line)
+		self.textInput1.setText(str(max(self.p, 0.2)))		# stuff p here even if non custom
+		self.popup2 = QtGui.QComboBox(self)
+		self.popup2.setStyleSheet("background : #ffffff")
+		self.popup2.activated[int].connect(self.onPopup2)
+		self.popup2.setFixedWidth(50)
+		self.popup2.move(120, line)
+		if self.ts == "Custom": 
+			self.popup2.hide()
+		else:
+			self.textInput1.hide()
+			self.popup2.addItems(ISO261PDTABLE[self.sz])
+			if str(self.p) not in ISO261PDTABLE[self.sz]: 	self.p = float(ISO261PDTABLE[self.sz][0])
+			self.popup2.setCurrentIndex(ISO261PDTABLE[self.sz].index(str(self.p)))
+			if internal:
+				self.d = float(self.sz[1:]) + iso965IntCrestDev(self.p, self.ct)		# Update diameter with crest deviation
+			else:
+				self.d = float(self.sz[1:]) - iso965ExtCrestDev(self.p, self.ct)		# Update diameter with crest deviation
+			self.textInput.setText(str(round(self.d, 3)))
+
+		# Length input box
+		line+=lineinc
+		self.label3 = QtGui.QLabel("Length", self)
+		self.label3.move(20, line)
+		self.textInput2 = QtGui.QLineEdit(self)
+		self.textInput2.textEdited.connect(self.onInputChanged)
+		self.textInput2.setText(str(self.l))
+		self.textInput2.setFixedWidth(50)
+		self.textInput2.move(120, line)
+
+		# Taper input box with ISO, NPT setter buttons- if not Custom, grey out/ read-only
+		line+=lineinc
+		self.label6 = QtGui.QLabel("Taper", self)
+		self.label6.move(20, line)
+		self.textInput3 = QtGui.QLineEdit(self)
+		self.textInput3.textEdited.connect(self.onInputChanged)
+		self.textInput3.setFixedWidth(50)
+		self.textInput3.move(120, line)
+		self.textInput3.setText(str(self.t))
+		if self.ts != "Custom":
+			self.textInput3.setDisabled(True)
+		# ISO button
+		self.pushButton1 = QtGui.QPushButton('ISO', self)
+		self.pushButton1.clicked.connect(self.onPushButton1)
+		self.pushButton1.setMaximumWidth(30)
+		self.pushButton1.move(180, line)
+		# NPT button
+		self.pushButton2 = QtGui.QPushButton('NPT', self)
+		self.pushButton2.clicked.connect(self.onPushButton2)
+		self.pushButton2.setMaximumWidth(30)
+		self.pushButton2.move(220, line)
+
+		# Radial clearance input box
+		line+=lineinc
+		self.label7 = QtGui.QLabel("Radial Clearance", self)
+		self.label7.move(20, line)
+		self.textInput4 = QtGui.QLineEdit(self)
+		self.textInput4.textEdited.connect(self.onInputChanged)
+		self.textInput4.setText(str(self.c))
+		self.textInput4.setFixedWidth(50)
+		self.textInput4.move(120, line)
+
+		# Base selection radio buttons
+		line+=(lineinc+5)
+		self.radioButton1 = QtGui.QRadioButton("Bevel Base",self)
+		self.radioButton1.clicked.connect(self.onRadioButton1)
+		self.radioButton1.move(20,line)
+		self.radioButton2 = QtGui.QRadioButton("Chamfer Base",self)
+		self.radioButton2.clicked.connect(self.onRadioButton2)
+		self.radioButton2.move(120,line)
+		if self.cb:	#Chamfer base
+			self.radioButton2.click()
+		else:
+			self.radioButton1.click()
+
+		# Rounded Root checkbox
+		line+=(lineinc+5)
+		self.checkbox3 = QtGui.QCheckBox("Rounded Root", self)
+		self.checkbox3.clicked.connect(self.onCheckbox3)
+		self.checkbox3.move(20, line)
+		if self.rr: self.checkbox3.click()
+		# Left Handed checkbox
+		self.checkbox1 = QtGui.QCheckBox("Left-Handed", self)
+		self.checkbox1.clicked.connect(self.onCheckbox1)
+		self.checkbox1.move(130,line)
+		if self.lh: self.checkbox1.click()
+		# Thread Disable checkbox
+		line+=lineinc
+		self.checkbox2 = QtGui.QCheckBox("Disable Thread", self)
+		self.checkbox2.clicked.connect(self.onCheckbox2)
+		self.checkbox2.move(20,line)
+		if self.td: self.checkbox2.click()
+
+		# OK button
+		line+=(lineinc+10)
+		self.okButton = QtGui.QPushButton('OK', self)
+		self.okButton.clicked.connect(self.onOk)
+		self.okButton.move(40, line)
+		# cancel button
+		self.cancelButton = QtGui.QPushButton('Cancel', self)
+		self.cancelButton.clicked.connect(self.onCancel)
+		self.cancelButton.setAutoDefault(True)
+		self.cancelButton.move(150, line)
+
+		# Warning message placeholder
+		line+=lineinc
+		self.warnlabel = QtGui.QLabel("", self)
+		self.warnlabel.setMinimumWidth(250)
+		self.warnlabel.setStyleSheet("color : #ff0000")
+		self.warnlabel.move(10, line)
+		# Live feasibility on popup changes too.  Queued: runs after the activated[int] handlers above update sz, p, d...
+		for popup in (self.popup1, self.popup0, self.popup2, self.popup3, self.popup4):
+			popup.currentIndexChanged.connect(self.onInputChanged, QtCore.Qt.QueuedConnection)
+		# now make the window visible
+		self.show()
+	# end initUI(self):	
+
+	def onRadioButton1(self):
+		"""Bevel base"""
+		return
+
+	def onRadioButton2(self):
+		"""Chamfer base"""
+		return
+
+	def onPushButton1(self):
+		"""ISO thread taper override"""
+		if self.ts == "Custom": self.textInput3.setText("0.0")
+		self.onInputChanged()
+
+	def onPushButton2(self):
+		"""NPT thread taper override"""
+		if self.ts == "Custom": self.textInput3.setText("1.7899")
+		self.onInputChanged()
+
+	def onCheckbox1(self):
+		"""Left-Handed thread"""
+		return
+
+	def onCheckbox2(self):
+		"""Disable thread"""
+		return
+
+	def onCheckbox3(self):
+		"""Rounded root"""
+		return
+
+	def onPopup1(self, selection):		# Standard selected- set widdgets for sz, d, p, t
+		"""Thread standard popup list """		# size/label5/popup0::tolp/label8/popup3::tolc/lagel9/popup4
+		self.ts = list(SUPPORTEDSTANDARDS)[selection]
+		if self.ts == "Custom": 	# Disable sz, p(popup), ct, pt; enable d, p(textbox), t.
+			self.popup0.setDisabled(True)					# popup0 = size 
+			self.label5.setStyleSheet("color : #b0b0b0")
+			self.popup2.hide()					# popup2 = pitch
+			self.popup3.setDisabled(True)		# pitch tol
+			self.label8.setStyleSheet("color : #b0b0b0")
+			self.popup4.setDisabled(True)		# crest tol
+			self.label9.setStyleSheet("color : #b0b0b0")
+			self.textInput.setDisabled(False)		# textInput = diameter
+			self.textInput1.show()				# textInput1 = pitch
+			self.textInput1.setText(self.popup2.currentText())
+			self.textInput3.setDisabled(False)	# textInput3 = taper
+		else: 	# ISO261	# Enable sz, p(popup), ct, pt; disable d, p(textbox), t
+							# load SIZES, PITCHES, diameter; set initial values for sz, p, d, t
+			self.popup0.setDisabled(False)					# StdSize
+			self.label5.setStyleSheet("color : ")
+			self.sz = ISO261PDTABLE.nearestSize(self.d)
+			self.popup0.setCurrentIndex(ISO261PDTABLE.sizeIndex(self.sz))
+			self.popup2.clear()								# pitch
+			self.popup2.addItems(ISO261PDTABLE[self.sz])
+			if str(self.p) not in ISO261PDTABLE[self.sz]: self.p = float(ISO261PDTABLE[self.sz][0])
+			self.popup2.setCurrentIndex(ISO261PDTABLE[self.sz].index(str(self.p)))
+			self.popup2.show()			
+			self.popup3.setDisabled(False)			# 
+			self.label8.setStyleSheet("color : ")
+			self.popup4.setDisabled(False)
+			self.label9.setStyleSheet("color : ")
+			self.textInput.setDisabled(True)				# diameter
+			if self.internal:
+				self.d = float(self.sz[1:]) + iso965IntCrestDev(self.p, self.ct)
+			else:
+				self.d = float(self.sz[1:]) - iso965ExtCrestDev(self.p, self.ct)
+			self.textInput.setText(str(round(self.d, 3)))
+			self.textInput1.hide()
+			self.textInput3.setDisabled(True)			# taper
+			self.textInput3.setText(str(SUPPORTEDSTANDARDS[self.ts]))
+		return
+	# End onPopup1
+
+	def onPopup0(self, selection):		#Size popup- store sz selection, update p(popup2), update d
+		self.sz = ISO261PDTABLE.sizes()[selection]
+		self.popup2.clear()
+		self.popup2.addItems(ISO261PDTABLE[self.sz])
+		if str(self.p) not in ISO261PDTABLE[self.sz]: self.p = float(ISO261PDTABLE[self.sz][0])
+		self.popup2.setCurrentIndex(ISO261PDTABLE[self.sz].index(str(self.p)))
+		if self.ts != "Custom":
+			if self.internal:
+				self.d = float(self.sz[1:]) + iso965IntCrestDev(self.p, self.ct)		# diameter	
+			else:
+				self.d = float(self.sz[1:]) - iso965ExtCrestDev(self.p, self.ct)		# diameter	
+			self.textInput.setText(str(round(self.d,3)))
+		return
+
+	def onPopup2(self, selection):		# Pitch popup- lookup and set d
+		"""Pitch popup list for Custom std"""
+		self.p = float(ISO261PDTABLE[self.sz][selection])
+		if self.ts != "Custom":
+			if self.internal:
+				self.d = float(self.sz[1:]) + iso965IntCrestDev(self.p, self.ct)		# diameter	
+			else:
+				self.d = float(self.sz[1:]) - iso965ExtCrestDev(self.p, self.ct)		# diameter	
+			self.textInput.setText(str(round(self.d,3)))
+		return
+
+	def onPopup3(self, selection):		# Pitch tolerance popup- lookup and set pt
+		self.pt = self.ISO965PITCHTOL[selection]
+		return
+
+	def onPopup4(self, selection):		# Crest tolerance popup- lookup and set pt
+		self.ct = self.ISO965CRESTTOL[selection]
+		if self.ts != "Custom":		
+			if self.internal:
+				self.d = float(self.sz[1:]) + iso965IntCrestDev(self.p, self.ct)		# diameter	
+			else:
+				self.d = float(self.sz[1:]) - iso965ExtCrestDev(self.p, self.ct)		# diameter	
+			self.textInput.setText(str(round(self.d,3)))
+		return
+
+	def onCancel(self):
+		self.result = None
+		self.close()
+
+	def onOk(self):
+		"""Validate numeric text inputs, convert to positive if negative"""
+		self.ts = self.popup1.currentText()
+		self.sz = self.popup0.currentText()
+		self.d = self.textInput.text()
+		if self.ts == "Custom":
+			self.p = self.textInput1.text()
+		else:
+			self.p = self.popup2.currentText()
+		self.l = self.textInput2.text()
+		self.t = self.textInput3.text()
+		self.c = self.textInput4.text()
+		self.cb = self.radioButton2.isChecked()
+		self.lh = self.checkbox1.isChecked()
+		self.td = self.checkbox2.isChecked()
+		self.rr = self.checkbox3.isChecked()
+		self.pt = self.popup3.currentText()
+		self.ct = self.popup4.currentText()
+		self.warnlabel.setText("")
+
+		# Validate numeric input types, convert to float
+		try:		# pitch type validation
+			self.p = float(self.p)
+		except:
+			self.warnlabel.setText("Pitch must be a number (you entered " + str(self.p) + ")")
+			self.textInput1.setFocus()
+			return
+		try:		# diameter type validation
+			self.d = float(self.d)
+		except:
+			self.warnlabel.setText("Diameter must be a number (you entered " + str(self.d) + ")")
+			self.textInput.setFocus()
+			return
+		try:		# length validation
+			self.l = float(self.l)
+		except:
+			self.warnlabel.setText("Length must be a number (you entered " + str(self.l) + ")")
+			self.textInput2.setFocus()
+			return
+		try:		# taper angle validation
+			self.t = float(self.t)
+		except:
+			self.warnlabel.setText("Taper angle must be a number (you entered " + str(self.t) + ")")
+			self.textInput3.setFocus()
+			return
+		try:
+			self.c = float(self.c)
+		except:
+			self.warnlabel.setText("Clearance must be a number (you entered " + str(self.c) + ")")
+			self.textInput4.setFocus()
+			return
+
+		# Validate numeric values pitch, diam., len., clearance
+		if self.p < 0: self.p = -self.p
+		if self.d < 0: self.d = -self.d		
+		if self.l < 0: self.l = -self.l
+		# Validate spec with the rules shared with TMThreadVP.updateData() (TMValidate.py)
+		spec = specFromInitProps(self.internal, [self.ts, self.sz, self.d, self.p, self.l, self.t, self.c,
+				self.cb, self.lh, self.td, self.rr, self.pt, self.ct])
+		for rule, severity, parameter, message in checkSpec(spec):
+			if severity != "error": continue
+			if rule == "tolerance":	message = self.pt + " Pitch Dev. > " + self.ct + " Crest Dev. is not allowed."
+			self.warnlabel.setText(message)
+			self.inputWidget(parameter).setFocus()
+			return
+			
+		# Stash validated props in MRU list for prepopulation
+		param_grp=FreeCAD.ParamGet(MRUPATH)
+		param_grp.SetString("thrdstandard", self.ts)
+		param_grp.SetString("stdsize", self.sz)
+		param_grp.SetFloat("diameter", self.d)
+		param_grp.SetFloat("pitch", self.p)
+		param_grp.SetFloat("length", self.l)
+		param_grp.SetFloat("taper", self.t)
+		param_grp.SetFloat("clearance", self.c)
+		param_grp.SetBool("chamfer", self.cb)
+		param_grp.SetBool("lefty", self.lh)
+		param_grp.SetBool("tdisable", self.td)
+		param_grp.SetBool("roundroot", self.rr)
+		param_grp.SetString("pitchtol", self.pt)
+		param_grp.SetString("cresttol", self.ct)
+
+		self.result = [self.ts, self.sz, self.d, self.p, self.l, self.t, self.c, self.cb, self.lh, self.td, self.rr, self.pt, self.ct]
+		self.close()
+
+	def inputWidget(self, parameter):
+		""" Dialog widget holding spec parameter (TMValidate.RULES parameter names) """
+		if parameter == "pitch":	return self.textInput1 if self.ts == "Custom" else self.popup2
+		return {"diameter": self.textInput, "length": self.textInput2, "taper": self.textInput3,
+				"clearance": self.textInput4, "tolpitch": self.popup4}.get(parameter, self.textInput)
+
+	def onInputChanged(self, value=None):
+		"""Live feasibility after a text edit, popup change or taper button: feasible range tooltips on the numeric inputs,
+		first broken rule in the warning label"""
+		try:
+			p = float(self.textInput1.text()) if self.ts == "Custom" else float(self.popup2.currentText())
+			spec = specFromInitProps(self.internal, [self.ts, self.sz, abs(float(self.textInput.text())), abs(p),
+					abs(float(self.textInput2.text())), float(self.textInput3.text()), float(self.textInput4.text()),
+					False, False, False, False, self.pt, self.ct])
+		except ValueError:
+			return		# onOk() reports non-numbers
+		for parameter, (low, high) in feasibleRanges(spec).items():
+			self.inputWidget(parameter).setToolTip("Feasible: " + ("%.3f" % low if low > -1e300 else "any") + " to "
+					+ ("%.3f" % high if high < 1e300 else "any"))
+		broken = checkSpec(spec)
+		self.warnlabel.setText(broken[0][3] if broken else "")
+
+	def keyPressEvent(self, event):
+		if event.nativeVirtualKey() == 27:			# Esc pressed
+			self.onCancel()
+		if event.nativeVirtualKey() == 13:			# Enter pressed
+			self.onOk()
+# end class ThreadDialog(QtGui.QDialog):
@@ -0,0 +1,114 @@
+# INDEMNITY: By using this software you agree not to sue me for any reason related to the use of this software.
+#
+# Copyright (c) 2022 Kurt Funderburg, all rights not explicitly relinquished in LGPL reserved.
+#
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU Lesser General Public License (LGPL)
+#   as published by the Free Software Foundation; either version 2 of
+#   the License, or (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Library General Public License for more details.
+#
+#   You should have received a copy of the GNU Library General Public
+#   License along with this program; if not, write to the Free Software
+#   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307
+#   USA
+#
+#	Thread families.  One master ThreadExt/ThreadInt builds the body once; its instances are App::Link placements of it,
+#	so repeated fasteners cost one execute() and one B-rep per distinct spec.  makePattern() adds one Link array of the
+#	master at linear, polar or hole-set placements (TMBoltPattern macro).  mergeFamilies() turns existing free-standing
+#	copies of a thread into Links of the first object with the same built spec.
+
+import FreeCAD, Part, math
+from ThreadMaker.TMClasses import TMThreadBody, threadSpec
+from ThreadMaker.TMRecompute import threadObjects
+
+__title__ = "ThreadMaker: Thread families; App::Link instances of one master thread body in linear, polar and hole patterns."
+__author__ = "Kurt Funderburg"
+
+PATTERNS = ("Linear", "Polar", "Holes")		# makePattern() layouts, see the *Placements() functions
+
+def familyKey(obj):
+	""" Objects with equal familyKey() have identical bodies: object type plus TMThreadBody.builtKey() """
+	return [obj.Proxy.Type] + obj.Proxy.builtKey(threadSpec(obj))
+
+def familyMaster(obj):
+	""" Thread object behind obj: obj itself, or the thread a Link (array) points to.  None if obj is no thread. """
+	target = obj.getLinkedObject(True)
+	return target if isinstance(getattr(target, "Proxy", None), TMThreadBody) else None
+
+def linearPlacements(count, spacing, direction=FreeCAD.Vector(1, 0, 0), rows=1, rowspacing=0.0, rowdirection=FreeCAD.Vector(0, 1, 0)):
+	""" count x rows grid from the origin: spacing apart along direction, rowspacing apart along rowdirection """
+	step = FreeCAD.Vector(direction).normalize() * spacing
+	rowstep = FreeCAD.Vector(rowdirection).normalize() * rowspacing
+	return [FreeCAD.Placement(step * i + rowstep * j, FreeCAD.Rotation()) for j in range(rows) for i in range(count)]
+
+def polarPlacements(count, radius, angle=360.0, start=0.0):
+	""" count positions on a circle of radius around Z, from start deg. over angle deg. (a full circle doesn't repeat
+	its first position).  Instances keep their own orientation. """
+	step = angle / count if abs(angle) >= 360.0 or count < 2 else angle / (count - 1)
+	placements = []
+	for i in range(count):
+		a = math.radians(start + i * step)
+		placements.append(FreeCAD.Placement(FreeCAD.Vector(radius * math.cos(a), radius * math.sin(a), 0), FreeCAD.Rotation()))
+	return placements
+
+def holePlacements(subshapes):
+	""" One placement per hole in subshapes (selected sub-elements in global coordinates): the centre of each circular
+	edge, and of each circular inner edge of a planar face.  Z points along the edge axis, into the material for faces. """
+	placements = []
+	for sub in subshapes:
+		if isinstance(sub, Part.Face) and isinstance(sub.Surface, Part.Plane):
+			normal = sub.normalAt(*sub.Surface.parameter(sub.CenterOfMass))
+			edges = [(e, normal * -1) for wire in sub.Wires if not wire.isSame(sub.OuterWire) for e in wire.Edges]
+		else:
+			edges = [(e, None) for e in sub.Edges]
+		for edge, axis in edges:
+			if not isinstance(edge.Curve, Part.Circle): continue
+			rotation = FreeCAD.Rotation(FreeCAD.Vector(0, 0, 1), axis or edge.Curve.Axis)
+			placement = FreeCAD.Placement(edge.Curve.Center, rotation)
+			if not any(placement.Base.isEqual(p.Base, 1e-6) for p in placements):	placements.append(placement)
+	return placements
+
+def makePattern(master, placements, label=None):
+	""" Add one App::Link array of master's thread (master may be a Link to it) with an element at each placement.
+	The elements share the master's body; the master keeps its own placement.  Returns the Link array. """
+	thread = familyMaster(master)
+	if thread is None: raise ValueError(master.Label + " is not a ThreadMaker thread")
+	if not placements: raise ValueError("Pattern has no positions")
+	link = thread.Document.addObject("App::Link", thread.Name + "Pattern")
+	link.LinkedObject = thread
+	link.ShowElement = False		# one object however many elements
+	link.ElementCount = len(placements)
+	link.PlacementList = placements
+	link.Label = label or thread.Label + "x" + str(len(placements)) + " "
+	return link
+
+def mergeFamilies(doc=None):
+	""" Replace each thread object that has the same body as an earlier one (familyKey) by a Link to that one with its
+	Placement and Label.  Threads other objects use and attached threads stay.  Returns number replaced. """
+	doc = doc or FreeCAD.ActiveDocument
+	masters = {}
+	replaced = 0
+	for obj in threadObjects(doc):
+		key = repr(familyKey(obj))
+		attached = getattr(obj, "MapMode", "Deactivated") != "Deactivated"
+		if key not in masters:
+			masters[key] = obj
+			continue
+		if obj.InList or attached: continue
+		link = doc.addObject("App::Link", obj.Name + "Link")
+		link.LinkedObject = masters[key]
+		link.Placement = obj.Placement
+		label, visible = obj.Label, obj.Visibility
+		doc.removeObject(obj.Name)
+		link.Label = label
+		link.Visibility = visible
+		replaced += 1
+	if replaced:
+		FreeCAD.Console.PrintMessage("TM: Replaced %d duplicate threads by links to %d masters\n" % (replaced, len(masters)))
+		doc.recompute()
+	return replaced
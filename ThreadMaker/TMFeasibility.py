@@ -0,0 +1,131 @@
+# INDEMNITY: By using this software you agree not to sue me for any reason related to the use of this software.
+#
+# Copyright (c) 2022 Kurt Funderburg, all rights not explicitly relinquished in LGPL reserved.
+#
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU Lesser General Public License (LGPL)
+#   as published by the Free Software Foundation; either version 2 of
+#   the License, or (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Library General Public License for more details.
+#
+#   You should have received a copy of the GNU Library General Public
+#   License along with this program; if not, write to the Free Software
+#   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307
+#   USA
+#
+#	Feasibility map: which base stage padding/rotation (BASEVARIANTS) built each point of a recorded (Diameter, Pitch,
+#	Taper, Chamfer, RoundRoot, Lefty) sweep of shafts and inserts, how long it took, and which points no variant could
+#	build.  TMBench.py --pass map records it into MAPFILE.  With FEASIBILITYPATH Enabled, execute() builds the base with
+#	the variant that worked for the nearest recorded point, and refuses at once specs whose nearest point always failed.
+#	The macro ships only the recorder: MAPFILE is an empty template until a map is recorded on the user's FreeCAD/OCC.
+
+import FreeCAD, os, json
+import numpy
+
+__title__ = "ThreadMaker: Recorded feasibility map of the thread kernel; base padding choice and failure prediction."
+__author__ = "Kurt Funderburg"
+
+FEASIBILITYPATH = "User parameter:BaseApp/Macro/ThreadMaker/Feasibility"	# getParam(FEASIBILITYPATH): Enabled(bool), File(str)
+MAPFILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "feasibility.json")		# empty until TMBench map records it
+BASEVARIANTS = ( 		# (pad scale, vpad scale, extra base rotation deg.) tried in this order by TMBench map.  First is default.
+	(1.0, 1.0, 0.0), (1.0, 2.0, 0.0), (1.5, 1.0, 0.0), (1.0, 1.0, 23.0), (1.5, 2.0, 23.0), (0.75, 0.5, 0.0))
+MAPCOLUMNS = ("internal", "diameter", "pitch", "taper", "chamfer", "roundroot", "lefty", "variant", "seconds", "failed")
+MAPRADIUS = 0.25			# Nearest recorded point counts if its distance (log D, log P, Taper/MAPTAPERSCALE) is within this
+FAILRADIUS = 0.05			# ...and predicts failure only if it failed and is within this (about 5% off in D and P)
+MAPTAPERSCALE = 10.0		# Degrees of taper that weigh like a factor e in Diameter or Pitch
+
+class TMFeasibilityMap:		#######################################################
+	""" Rows of a map file as numpy columns (MAPCOLUMNS), grouped for nearest-point lookup by the bool columns """
+	def __init__(self, data):
+		self.meta = data.get("meta", {})
+		self.variants = [tuple(v) for v in data.get("variants", BASEVARIANTS)]
+		rows = data.get("rows", [])
+		self.failed = [row[MAPCOLUMNS.index("failed")] for row in rows]
+		table = numpy.array([row[:-1] for row in rows], dtype=float).reshape(len(rows), len(MAPCOLUMNS) - 1)
+		self.columns = {name: table[:, i] for i, name in enumerate(MAPCOLUMNS[:-1])}
+		self.groups = {}		# { (internal, chamfer, roundroot, lefty) : row index array }
+		keys = table[:, [0, 4, 5, 6]].astype(bool)
+		for i, key in enumerate(map(tuple, keys.tolist())):	self.groups.setdefault(key, []).append(i)
+		self.groups = {key: numpy.array(index) for key, index in self.groups.items()}
+
+	def __len__(self):
+		return len(self.failed)
+
+	def nearest(self, spec):
+		""" (row index, distance) of the recorded point nearest spec with the same internal, chamfer, roundroot and lefty,
+		or None if there is none """
+		index = self.groups.get((bool(spec["internal"]), bool(spec["chamfer"]), bool(spec["roundroot"]), bool(spec["lefty"])))
+		if index is None or spec["diameter"] <= 0 or spec["pitch"] <= 0: return None
+		c = self.columns
+		distance = numpy.sqrt(numpy.log(c["diameter"][index] / spec["diameter"])**2 + numpy.log(c["pitch"][index] / spec["pitch"])**2
+				+ ((c["taper"][index] - spec["taper"]) / MAPTAPERSCALE)**2)
+		i = int(numpy.argmin(distance))
+		return int(index[i]), float(distance[i])
+
+	def lookup(self, spec):
+		""" Recorded outcome nearest spec within MAPRADIUS: dict of variant (tuple, None if every variant failed), seconds,
+		failed (stage name, "" on success) and distance.  None if no recorded point is close enough. """
+		found = self.nearest(spec)
+		if found is None or found[1] > MAPRADIUS: return None
+		i, distance = found
+		v = int(self.columns["variant"][i])
+		return {"variant": self.variants[v] if v >= 0 else None, "seconds": float(self.columns["seconds"][i]),
+				"failed": self.failed[i], "distance": distance}
+# end class TMFeasibilityMap
+
+_map = None		# (path, TMFeasibilityMap) loaded by feasibilityMap()
+
+def mapEnabled():
+	""" True if the user switched on map guided builds in FEASIBILITYPATH """
+	return FreeCAD.ParamGet(FEASIBILITYPATH).GetBool("Enabled", False)
+
+def feasibilityMap():
+	""" TMFeasibilityMap of FEASIBILITYPATH File, else MAPFILE; read on first use.  An unreadable map is empty. """
+	global _map
+	path = FreeCAD.ParamGet(FEASIBILITYPATH).GetString("File", "") or MAPFILE
+	if _map is None or _map[0] != path:
+		try:
+			with open(path) as f:	data = json.load(f)
+		except (OSError, ValueError) as err:
+			FreeCAD.Console.PrintWarning("TM: Feasibility map " + path + " not loaded: " + str(err) + "\n")
+			data = {}
+		_map = (path, TMFeasibilityMap(data))
+	return _map[1]
+
+def baseVariant(spec):
+	""" BASEVARIANTS entry stageBase() should use for spec: the one recorded for the nearest map point when the map is
+	enabled, else the default """
+	if not mapEnabled(): return BASEVARIANTS[0]
+	found = feasibilityMap().lookup(spec)
+	if found is None or found["variant"] is None: return BASEVARIANTS[0]
+	return found["variant"]
+
+def checkFeasible(spec, engine="Sweep"):
+	""" Raise RuntimeError if the map is enabled and every recorded build of a point within FAILRADIUS of spec failed.
+	Only specs built by the engine the map was recorded with are judged. """
+	if not mapEnabled() or spec["disable"]: return
+	fmap = feasibilityMap()
+	if engine != fmap.meta.get("engine", "Sweep"): return
+	found = fmap.lookup(spec)
+	if found and found["variant"] is None and found["distance"] <= FAILRADIUS:
+		raise RuntimeError("Feasibility map: builds like this one fail at " + found["failed"] + ".  Try changing Diameter or Pitch.")
+
+def mapRows(cases):
+	""" Map rows (lists in MAPCOLUMNS order) from (spec, result) pairs; result is a TMBench.mapCase() dict """
+	rows = []
+	for spec, r in cases:
+		rows.append([int(bool(spec["internal"])), spec["diameter"], spec["pitch"], spec["taper"], int(bool(spec["chamfer"])),
+				int(bool(spec["roundroot"])), int(bool(spec["lefty"])), r["variant"], round(r["seconds"], 4), r["failed"]])
+	return rows
+
+def writeMap(path, rows, meta):
+	""" Write a map file: meta, BASEVARIANTS and one compact row per line """
+	with open(path, "w") as f:
+		f.write('{"meta": ' + json.dumps(meta) + ',\n "variants": ' + json.dumps(BASEVARIANTS) + ',\n "columns": '
+				+ json.dumps(MAPCOLUMNS) + ',\n "rows": [')
+		f.write(",".join("\n  " + json.dumps(row) for row in rows))
+		f.write("]}\n")
@@ -0,0 +1,542 @@
+# INDEMNITY: By using this software you agree not to sue me for any reason related to the use of this software.
+#
+# Copyright (c) 2022 Kurt Funderburg, all rights not explicitly relinquished in LGPL reserved.
+#
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU Lesser General Public License (LGPL)
+#   as published by the Free Software Foundation; either version 2 of
+#   the License, or (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Library General Public License for more details.
+#
+#   You should have received a copy of the GNU Library General Public
+#   License along with this program; if not, write to the Free Software
+#   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307
+#   USA
+#
+#	Thread geometry kernel: ISO 68-1M profiles, helix sweeps and the stages that turn a thread spec (threadSpec() dict or
+#	TMSpec.ThreadSpec) into a finished, unplaced thread body with FreeCAD Part.  No document objects, FreeCADGui or Qt,
+#	so FreeCADCmd workers, batch jobs and benchmarks start fast.  TMClasses wraps the kernel in document objects.
+#	Left- and right-hand threads are mirror images (mirrorHand): a sweep or finished body of one hand already in the sweep
+#	memo or the shape cache gives the other hand without a sweep or boolean (memoThreadSweep, cachedBody).
+
+import FreeCAD, Part, math, time, collections
+from FreeCAD import Base
+import ThreadMaker.TMCache as TMCache
+from ThreadMaker.TMSpec import threadDims
+from ThreadMaker.TMFeasibility import BASEVARIANTS, baseVariant, checkFeasible
+
+__title__ = "ThreadMaker: Thread geometry kernel stages, FreeCAD Part only."
+__author__ = "Kurt Funderburg"
+
+THREADENGINES = ("Sweep", "Tiled", "Direct")	# Thread body construction methods, see stageSweep().  First is default.
+TILETOL = 1e-6						# Length remainder below this is ignored by the tiled engine; also cap face flatness tol.
+DIRECTPAD = 0.1						# Direct engine thread surface runs at least this far past both body ends before the end cuts
+DIRECTSEWTOL = 1e-4					# Direct engine sewing tolerance: ribbon, helicoid and step faces come from separate surfaces
+SWEEPMEMOSIZE = 8					# Number of full-length thread sweeps kept in memory by memoThreadSweep()
+SWEEPMEMOGROWTH = 1.5				# Sweeps are built this much longer than asked so later Length increases still hit the memo
+SWEEPMEMOREUSE = 2.0				# A memo sweep is reused only up to this many times the asked height; longer ones slow the cut
+TRIMANGLE = 37.0					# Trim stage turns the thread body this many deg. about Z (TMMesh.SEAMANGLE follows it)
+_steptimes = None					# [(step, seconds)] collected by stepTime() while execute() runs with StageTiming on
+TUNEDEFAULT = {"seam": 0.0, "helixpad": 0.01, "fuzzy": 0.0, "transition": 1, "base": None}	# stage knobs, see retryStage()
+RETRYLADDER = { 		# Dictionary constant of { stage : (TUNEDEFAULT overrides, ...) } tried in order after the stage fails
+	"sweep" : ({"transition": 2}, {"transition": 0}, {"helixpad": 0.03}, {"helixpad": 0.03, "transition": 2}),
+	"cut" : ({"seam": 23.0}, {"fuzzy": 1e-5}, {"seam": 53.0, "fuzzy": 1e-4}),
+	"trim" : ({"seam": 23.0}, {"fuzzy": 1e-5}),
+	"base" : tuple({"base": v} for v in BASEVARIANTS[1:]) + ({"fuzzy": 1e-5},) }
+
+def makeProfileExt681M(minordiameter, pitch, roundroot):	
+	""" Generated ISO 68.1M cutter (not adder) profile wire anchord to start point of helix: (majordiameter/2, 0, 0) with 
+	trangle base line extended outwards to force intersection with shaft during shaft.cut(thread) operation """
+	padding = .25		# extra distance trangle base line is extended outwards past shaft wall, without affecting Dmin (for booleans performance)
+						# 	ISO standard profile height above shaft wall.
+	profheight = pitch * 5/16 * math.sqrt(3)		# ISO 68M
+	v1 = Base.Vector(minordiameter/2 + profheight + padding, 0, padding/math.sqrt(3))	
+	v2 = Base.Vector(minordiameter/2, 0, -pitch*5/16)
+	v3 = Base.Vector(minordiameter/2, 0, -pitch*9/16)	
+	v4 = Base.Vector(minordiameter/2 + profheight + padding, 0, -pitch*7/8 - padding/math.sqrt(3))
+	l1 = Part.LineSegment(v1,v2)
+	l3 = Part.LineSegment(v3,v4)
+	l4 = Part.LineSegment(v4,v1)
+	if roundroot:
+		v5 = Base.Vector(minordiameter/2 - pitch/8/math.sqrt(3), 0, -pitch*7/16)		# ARc center point for roundroot
+		a1 = Part.Arc(v2, v5, v3)
+		sprofile = Part.Shape([l1, a1, l3, l4])
+	else:
+		l2 = Part.LineSegment(v2,v3)
+		sprofile = Part.Shape([l1, l2, l3, l4])
+	return Part.Wire(sprofile.Edges)
+# End method makeProfileExt681M()
+
+def makeProfileInt681M(minordiameter, pitch, roundroot):	
+	""" Generated ISO 68.1M cutter profile wire anchord to start point of helix: (majordiameter/2, 0, 0) with 
+	trangle base line extended inwords to force intersection with insert wall during insert.cut(thread) operation """
+	padding = .25		# extra distance trangle base line is extended outwards past shaft wall, without affecting Dmin (for booleans performance)
+						# 	ISO standard profile height above shaft wall.
+	profheight = pitch * 5/16 * math.sqrt(3)		# ISO 68M
+	v1 = Base.Vector(minordiameter/2 - padding, 0, padding/math.sqrt(3)-pitch/16)	
+	v2 = Base.Vector(minordiameter/2 + profheight, 0, -pitch*6/16)
+	v3 = Base.Vector(minordiameter/2 + profheight, 0, -pitch*8/16)	
+	v4 = Base.Vector(minordiameter/2 - padding, 0, -pitch*7/8 - padding/math.sqrt(3)+pitch/16)
+	l1 = Part.LineSegment(v1,v2)
+	l3 = Part.LineSegment(v3,v4)
+	l4 = Part.LineSegment(v4,v1)
+	if roundroot:
+		v5 = Base.Vector(minordiameter/2 + profheight + pitch/16/math.sqrt(3), 0, -pitch*7/16)		# ARc center point for roundroot
+		a1 = Part.Arc(v2, v5, v3)
+		sprofile = Part.Shape([l1, a1, l3, l4])
+	else:
+		l2 = Part.LineSegment(v2,v3)
+		sprofile = Part.Shape([l1, l2, l3, l4])
+	return Part.Wire(sprofile.Edges)
+# End method makeProfileInt681M()
+
+def stepTime(step, t0):
+	""" Record step as taking from t0 until now if stage timing is on.  Returns now: the start time of the next step. """
+	t = time.perf_counter()
+	if _steptimes is not None:	_steptimes.append((step, t - t0))
+	return t
+
+def makeShaftCore(majordiameter, height):
+	""" Unthreaded straight shaft cylinder, rotated so its seam stays clear of the thread booleans """
+	shaft = Part.makeCylinder(majordiameter/2, height)
+	shaft.rotate(Base.Vector(0,0,0), Base.Vector(0,0,1), 107)		#Fixes lots of problems doing booleans after thread fuse!
+	return shaft
+
+def makeInsertCore(minordiameter, tdiameter, height):
+	""" Unthreaded straight insert: tube with bore at Dmin and 0.5 wall outside the top major diameter """
+	insert = Part.makeCylinder(tdiameter/2+0.5, height)
+	insert = insert.cut(Part.makeCylinder(minordiameter/2, height))
+	insert.rotate(Base.Vector(0,0,0), Base.Vector(0,0,1), 107)		#Fixes lots of problems doing booleans after thread fuse!
+	return insert
+
+def makeThreadSweep(wprofile, pitch, height, radius, angle, left, zstart, transition=1):
+	""" Sweep profile wire (anchored at z=0) along makeLongHelix(pitch, height, radius, angle, left) started at zstart.
+	Returns swept solid.  Raises RuntimeError if BRepOffsetAPI fails. """
+	t = time.perf_counter()
+	wprofile.translate(Base.Vector(0,0,zstart))
+	helix = Part.makeLongHelix(pitch, height, radius, angle, left)
+	helix.translate(Base.Vector(0,0,zstart))
+	t = stepTime("sweep.helix", t)
+
+	thread = Part.BRepOffsetAPI.MakePipeShell(helix)
+	thread.setFrenetMode(True)  # Sets a Frenet (true) or a CorrectedFrenet(false) trihedron to perform the sweeping.  False = corkscrew.
+	thread.setTransitionMode(transition)  # 0=Transformed, *1=right corner transition, 2=Round corner
+	thread.add(wprofile, False)	# WithContact = connect to helix.  WithCorrection = orthogonal to helix tangent.
+	if not thread.isReady():
+		raise RuntimeError("BRepOffsetAPI not ready error sweeping thread profile.")
+	thread.build()
+	t = stepTime("sweep.build", t)
+	if not thread.makeSolid():
+		raise RuntimeError("BRepOffsetAPI faled building swept thread solid.")
+	stepTime("sweep.makesolid", t)
+	return thread.shape()
+# End method makeThreadSweep()
+
+_sweepmemo = collections.OrderedDict()		# memoThreadSweep() LRU: { key : (helix height, swept solid) }
+
+def memoThreadSweep(internal, minordiameter, pitch, roundroot, left, taper, radius, height, zstart, transition=1):
+	""" makeThreadSweep() of the ISO 68-1M profile, memoized for this session independent of thread Length.
+	Straight sweeps are built SWEEPMEMOGROWTH longer than asked, and a memo sweep from height to SWEEPMEMOREUSE * height long
+	is reused as is: the part of the sweep above the shaft top misses the shaft, so the main cut trims it to the requested
+	Length.  A longer one is replaced, so a short thread after a long one is not cut with a tool many times its height. """
+	key = (internal, round(minordiameter, 9), round(pitch, 9), roundroot, left, round(taper, 9), round(radius, 9), round(zstart, 9),
+			transition)
+	fits = lambda memo: memo and height - TILETOL <= memo[0] <= SWEEPMEMOREUSE * height + TILETOL
+	hit = _sweepmemo.get(key)
+	if fits(hit):
+		_sweepmemo.move_to_end(key)
+		return hit[1]
+	other = _sweepmemo.get(key[:4] + (not left,) + key[5:])
+	if fits(other):		# other hand swept already: mirror it
+		t = time.perf_counter()
+		sthread = mirrorHand(other[1], 0.0)		# not turned yet: both hands' helices start on +X
+		stepTime("sweep.mirror", t)
+		_sweepmemo[key] = (other[0], sthread)
+		while len(_sweepmemo) > SWEEPMEMOSIZE:	_sweepmemo.popitem(last=False)
+		return sthread
+	if taper:	pass		# tapered: the cone radius past the asked height runs into Dmin or the axis, so sweep just that
+	elif hit and hit[0] < height:	height = max(height, 2*hit[0])		# growing: double so a series of Length increases rebuilds only log(n) times
+	else:		height = height * SWEEPMEMOGROWTH
+	t = time.perf_counter()
+	if internal:	wprofile = makeProfileInt681M(minordiameter, pitch, roundroot)
+	else:			wprofile = makeProfileExt681M(minordiameter, pitch, roundroot)
+	stepTime("sweep.profile", t)
+	sthread = makeThreadSweep(wprofile, pitch, height, radius, taper/2 if internal else -taper/2, left, zstart, transition)
+	_sweepmemo[key] = (height, sthread)
+	_sweepmemo.move_to_end(key)
+	while len(_sweepmemo) > SWEEPMEMOSIZE:	_sweepmemo.popitem(last=False)
+	return sthread
+# End method memoThreadSweep()
+
+def mirrorHand(shape, angle):
+	""" Shape of the other hand: the mirror image of a thread sweep or body in the plane through the Z axis and the
+	direction angle deg. from +X.  Both hands' helices start on +X with the profile in XZ, so a sweep mirrors in XZ
+	(angle 0), and a finished body, turned TRIMANGLE by the trim stage, in the plane turned as far
+	(R(TRIMANGLE) M_XZ R(-TRIMANGLE)), which keeps its helix phase that of a fresh build of the other hand. """
+	a = math.radians(angle)
+	return shape.mirror(Base.Vector(0,0,0), Base.Vector(-math.sin(a), math.cos(a), 0))
+
+def sweepMemoClear():
+	""" Drop all memoized sweeps (frees memory; benchmarks call this to time cold builds) """
+	_sweepmemo.clear()
+
+def makeTiledThread(makecore, wprofile, pitch, length, radius, left, helixpad):
+	""" Pitch-segment tiling engine for straight threads.  makecore(h) returns the unthreaded body of height h.
+	The thread is cut into a single one-pitch segment (plus one short segment for any remainder of Length), then
+	translated copies of the segment faces are stacked and sewn into one solid.  A straight thread is periodic in
+	pitch, so only the segment booleans are paid and generation time is roughly constant in Length. """
+	count = int(math.floor(length/pitch + TILETOL))
+	rest = length - count*pitch
+	if count < 1:
+		raise RuntimeError("Tiled engine needs Length >= Pitch.")
+
+	# Same helix phase as the full-length sweep, started one pitch lower so the segment is covered at every angle
+	sthread = makeThreadSweep(wprofile, pitch, 3*pitch + helixpad*2, radius, 0, left, -pitch - helixpad)
+	t = time.perf_counter()
+	segment = makecore(pitch).cut(sthread)
+	if segment.childShapes()==[]:
+		raise RuntimeError("Failed cutting thread into pitch segment.  Try changing Diameter or Pitch.")
+	segments = [segment.translated(Base.Vector(0, 0, k*pitch)) for k in range(count)]
+	if rest > TILETOL:
+		top = makecore(rest).cut(sthread)
+		if top.childShapes()==[]:
+			raise RuntimeError("Failed cutting thread into top segment.  Try changing Diameter or Pitch.")
+		top.translate(Base.Vector(0, 0, count*pitch))
+		segments.append(top)
+	t = stepTime("tile.cut", t)
+
+	# STACK: drop the coincident cap faces between neighbouring segments, keep bottom of first and top of last
+	faces = []
+	for k, seg in enumerate(segments):
+		zbot = k*pitch
+		ztop = zbot + (pitch if k < count else rest)
+		for f in seg.Faces:
+			if k > 0 and _isCapFace(f, zbot): continue
+			if k < len(segments)-1 and _isCapFace(f, ztop): continue
+			faces.append(f)
+	shell = Part.Shell(faces)
+	shell.sewShape()
+	if shell.ShapeType != "Shell" or not shell.isClosed():
+		raise RuntimeError("Tiled engine failed sewing pitch segments.  Try Engine = Sweep.")
+	solid = Part.Solid(shell)
+	stepTime("tile.sew", t)
+	return solid
+# End method makeTiledThread()
+
+def _isCapFace(face, z):
+	""" True if face is a flat cap lying in the plane at height z """
+	bb = face.BoundBox
+	return bb.ZLength < TILETOL and abs(bb.ZMin - z) < TILETOL
+
+def makeSurfaceProfile681M(internal, minordiameter, majordiameter, pitch, roundroot, z):
+	""" Finished ISO 68-1M thread surface over one pitch as an open wire in the XZ plane, from the middle of a root at
+	height z to the middle of the next root at z+pitch.  Same groove as the cutter profiles (root middle at -7/16 pitch
+	from their anchor).  External: root at Dmin/2, crest at Dmaj/2.  Internal: crest (bore) at Dmin/2, root one profile
+	height out.  Returns (wire, radius of the root middle). """
+	s3 = math.sqrt(3)
+	if internal:	root, halfroot, crest, sign = minordiameter/2 + pitch*5/16*s3, pitch/16, minordiameter/2, -1
+	else:			root, halfroot, crest, sign = minordiameter/2, pitch/8, majordiameter/2, 1
+	flank = halfroot + abs(crest - root)/s3		# z from root middle to start of crest flat
+	if flank > pitch/2:		# no crest flat left: flanks meet in a point
+		crest = root + sign*(pitch/2 - halfroot)*s3
+		flank = pitch/2
+	v = lambda x, dz: Base.Vector(x, 0, z + dz)
+	a = halfroot/s3			# round root: arc radius 2a through the root corners, middle a beyond the root line
+	rroot = root - sign*a if roundroot else root
+	if roundroot:	edges = [Part.Arc(v(rroot, 0), v(root + sign*a - sign*a*s3, a), v(root, halfroot))]
+	else:			edges = [Part.LineSegment(v(root, 0), v(root, halfroot))]
+	edges.append(Part.LineSegment(v(root, halfroot), v(crest, flank)))
+	if flank < pitch/2:	edges.append(Part.LineSegment(v(crest, flank), v(crest, pitch - flank)))
+	edges.append(Part.LineSegment(v(crest, pitch - flank), v(root, pitch - halfroot)))
+	if roundroot:	edges.append(Part.Arc(v(root, pitch - halfroot), v(root + sign*a - sign*a*s3, pitch - a), v(rroot, pitch)))
+	else:			edges.append(Part.LineSegment(v(root, pitch - halfroot), v(root, pitch)))
+	return Part.Wire(Part.Shape(edges).Edges), rroot
+# End method makeSurfaceProfile681M()
+
+def makeDirectThread(internal, minordiameter, majordiameter, outerradius, pitch, length, left, roundroot, helixpad):
+	""" Direct engine for straight threads: no shaft.cut(thread).  The finished thread surface over one pitch is swept one
+	turn along the helix into a ribbon.  A straight thread is a screw motion of its profile, so pitch-translated copies of
+	the ribbon join edge to edge; enough copies cover Length.  The helical ends are closed with the helicoid swept by a
+	radial line (to the axis, or to the insert wall) and a flat step face, all sewn into one solid.  The only boolean
+	left cuts away the two end slabs below 0 and above Length. """
+	V = lambda x, z: Base.Vector(x, 0, z)
+	zroot = -helixpad - pitch*7/16		# root middle at helix angle 0: same thread phase as the Sweep and Tiled engines
+	zroot -= pitch * math.ceil((zroot + pitch + DIRECTPAD)/pitch)		# whole first turn below the body bottom
+	turns = int(math.ceil((length + DIRECTPAD - zroot)/pitch))
+	t = time.perf_counter()
+	wsurface, rroot = makeSurfaceProfile681M(internal, minordiameter, majordiameter, pitch, roundroot, zroot)
+	if internal:	lines = [Part.LineSegment(V(outerradius, zroot+pitch), V(outerradius, zroot)), Part.LineSegment(V(outerradius, zroot), V(rroot, zroot))]
+	else:			lines = [Part.LineSegment(V(0, zroot), V(rroot, zroot))]
+	wprofile = Part.Wire(Part.Shape(lines).Edges + wsurface.Edges)
+	t = stepTime("sweep.profile", t)
+
+	helix = Part.makeHelix(pitch, pitch, majordiameter/2, 0, left)
+	helix.translate(Base.Vector(0,0,zroot))
+	sweep = Part.BRepOffsetAPI.MakePipeShell(helix)
+	sweep.setFrenetMode(True)		# Frenet frame along a helix is an exact screw motion: copies one pitch apart match
+	sweep.setTransitionMode(1)
+	sweep.add(wprofile, False)
+	if not sweep.isReady():
+		raise RuntimeError("BRepOffsetAPI not ready error sweeping thread surface.")
+	sweep.build()
+	isradial = lambda e: e.BoundBox.ZLength < TILETOL and e.BoundBox.YLength < TILETOL
+	sides, caps = [], []
+	for f in sweep.shape().Faces:
+		if any(isradial(e) for e in f.Edges):	caps.append(f)
+		else:									sides.append(f)
+	if len(caps) != 1:
+		raise RuntimeError("Direct engine found %d helicoid faces in thread surface sweep, expected 1." % len(caps))
+	closing = [e for e in sweep.lastShape().Edges if isradial(e)]		# radial line one turn up closes the step
+	if not internal:	closing.append(Part.LineSegment(V(0, zroot+pitch), V(0, zroot)).toShape())
+	step = Part.Face(Part.Wire(sweep.firstShape().Edges + closing))
+	t = stepTime("direct.sweep", t)
+
+	# STACK ribbon copies, cap bottom and top turn, sew
+	top = Base.Vector(0, 0, turns*pitch)
+	faces = [f.translated(Base.Vector(0, 0, k*pitch)) for k in range(turns) for f in sides]
+	faces += [caps[0], caps[0].translated(top), step, step.translated(top)]
+	shell = Part.Shell(faces)
+	shell.sewShape(DIRECTSEWTOL)
+	if shell.ShapeType != "Shell" or not shell.isClosed():
+		raise RuntimeError("Direct engine failed sewing thread surface.")
+	solid = Part.Solid(shell)
+	if solid.Volume < 0:	solid.reverse()
+	t = stepTime("direct.sew", t)
+
+	# CUT ENDS FLAT at 0 and Length
+	radius = (outerradius if internal else majordiameter/2) + 1
+	zbottom = zroot - 1
+	ztop = zroot + (turns+1)*pitch + 1
+	threadbody = solid.cut([Part.makeCylinder(radius, -zbottom, Base.Vector(0,0,zbottom)),
+			Part.makeCylinder(radius, ztop - length, Base.Vector(0,0,length))])
+	if threadbody.childShapes()==[] or not threadbody.isValid():
+		raise RuntimeError("Direct engine failed cutting thread ends.")
+	stepTime("direct.cut", t)
+	return threadbody
+# End method makeDirectThread()
+
+def threadEngine(spec):
+	""" Engine that actually builds spec: Tiled and Direct need a pitch-periodic (straight) thread, else Sweep """
+	if spec["engine"] in ("Tiled", "Direct") and spec["taper"] != 0:	return "Sweep"
+	return spec["engine"]
+
+def threadCacheParams(spec):
+	""" Geometry-defining spec values, in fixed order, for TMCache.cacheKey(), then the base variant the body is built
+	with (baseVariant: changes with the feasibility map), so a body of one variant is never served for another """
+	return [spec["standard"], spec["diameter"], spec["pitch"], spec["length"], spec["taper"], spec["clearance"],
+			spec["chamfer"], spec["lefty"], spec["roundroot"], spec["tolpitch"], spec["tolcrest"], spec["engine"]] \
+			+ list(baseVariant(spec))
+
+def cachedBody(kind, spec):
+	""" Finished body of spec (not disabled) from the shape cache, else the mirrorHand() of the cached body of the other
+	hand, which is then cached for spec too.  None if neither hand is cached. """
+	key = TMCache.cacheKey(kind, threadCacheParams(spec))
+	body = TMCache.cacheLoad(key)
+	other = dict(spec, lefty=not spec["lefty"])
+	if body is None and baseVariant(other) == baseVariant(spec):		# the map may pick another base for the other hand
+		body = TMCache.cacheLoad(TMCache.cacheKey(kind, threadCacheParams(other)))
+		if body is not None:
+			t = time.perf_counter()
+			body = mirrorHand(body, TRIMANGLE)
+			stepTime("cache.mirror", t)
+			TMCache.cacheStore(key, body)
+	return body
+
+def bodyCached(kind, spec):
+	""" True if cachedBody() would find a body for spec, without loading it """
+	other = dict(spec, lefty=not spec["lefty"])
+	return TMCache.cacheHas(TMCache.cacheKey(kind, threadCacheParams(spec))) or (baseVariant(other) == baseVariant(spec)
+			and TMCache.cacheHas(TMCache.cacheKey(kind, threadCacheParams(other))))
+
+def retryStage(stage, build):
+	""" build(tune) with TUNEDEFAULT; if it raises or returns an invalid shape, build(tune) again with each RETRYLADDER[stage] rung merged into
+	TUNEDEFAULT until one returns a valid shape.  Returns (result, attempts): attempts is [(rung, seconds, error)] with
+	the failed default first, or [] if the default worked.  When every rung fails, raises RuntimeError with the first
+	error and the attempts as its attempts attribute. """
+	t = time.perf_counter()
+	try:
+		return _validStage(stage, build(TUNEDEFAULT)), []
+	except (RuntimeError, Part.OCCError) as err:
+		first = str(err).strip()
+	attempts = [({}, time.perf_counter() - t, first)]
+	for rung in RETRYLADDER.get(stage, ()):
+		t = time.perf_counter()
+		try:
+			result = _validStage(stage, build(dict(TUNEDEFAULT, **rung)))
+		except (RuntimeError, Part.OCCError) as err:
+			attempts.append((rung, time.perf_counter() - t, str(err).strip()))
+			continue
+		attempts.append((rung, time.perf_counter() - t, ""))
+		stepTime(stage + ".retry", t)
+		return result, attempts
+	err = RuntimeError(first)
+	err.attempts = attempts
+	raise err
+
+def _validStage(stage, result):
+	""" result of a stage build, or RuntimeError if it is a shape that fails isValid() (None = disabled thread passes) """
+	if result is not None and not result.isValid():	raise RuntimeError("Invalid " + stage + " result.")
+	return result
+
+def attemptText(stage, attempts):
+	""" One line per retryStage() attempt: <stage> <rung or default> <seconds>s ok|<error> """
+	return ["%s %s %.3fs %s" % (stage, " ".join("%s=%s" % kv for kv in sorted(rung.items())) or "default", seconds,
+			error or "ok") for rung, seconds, error in attempts]
+
+def _cut(shape, tool, fuzzy):
+	""" shape.cut(tool), as a fuzzy boolean when fuzzy > 0 """
+	return shape.cut(tool, fuzzy) if fuzzy else shape.cut(tool)
+
+def makeRevolvedProfile(points):
+	""" Closed polygon through points (x, z) in the XZ plane, revolved 360 deg. about Z into a solid """
+	vs = [Base.Vector(x, 0, z) for x, z in points]
+	lines = [Part.LineSegment(vs[i], vs[(i+1) % len(vs)]) for i in range(len(vs))]
+	face = Part.Face(Part.Wire(Part.Shape(lines).Edges))
+	return face.revolve(Base.Vector(0,0,0), Base.Vector(0,0,1), 360)
+
+# THREAD KERNEL STAGES ######################################################################
+# execute() runs these in THREADSTAGES order; each takes spec, dims and upstream results and never modifies its inputs,
+# so TMThreadBody can keep every stage result and restart from the first stage a property change invalidates.
+THREADSTAGES = ("shaft", "sweep", "cut", "trim", "base", "place")
+
+def stageShaft(spec, dims):
+	""" Unthreaded body.  Returns (body, fallback): fallback is the shape shown when a later stage fails """
+	majordiameter, diameter = dims["majordiameter"], dims["diameter"]
+	tdiameter, tmindiameter, length = dims["tdiameter"], dims["tmindiameter"], dims["length"]
+	if not spec["internal"]:		# BUILD SHAFT
+		if majordiameter == tdiameter:
+			shaft = makeShaftCore(majordiameter, length)
+		else:
+			shaft = Part.makeCone(majordiameter/2, tdiameter/2, length)
+			shaft.rotate(Base.Vector(0,0,0), Base.Vector(0,0,1), 107)		#Fixes lots of problems doing booleans after thread fuse!
+		return shaft, shaft
+	# BUILD INSERT
+	if majordiameter == tdiameter:
+		shaft = Part.makeCylinder(diameter/2, length)
+		insert = makeInsertCore(diameter, tdiameter, length)
+	else:
+		shaft = Part.makeCone(diameter/2, tmindiameter/2, length)
+		insert = Part.makeCylinder(tdiameter/2+0.5, length)
+		insert = insert.cut(shaft)
+		insert.rotate(Base.Vector(0,0,0), Base.Vector(0,0,1), 107)		#Fixes lots of problems doing booleans after thread fuse!
+	return insert, shaft
+
+def stageSweep(spec, dims, body, tune=TUNEDEFAULT):
+	""" Swept thread cutter solid, or for the Tiled and Direct engines the finished thread body.  None if thread disabled.
+	tune: helixpad, and transition for the Sweep engine """
+	if spec["disable"]:	return None		# Make fast cosmetic thread
+	majordiameter, diameter, pitch, length = dims["majordiameter"], dims["diameter"], dims["pitch"], dims["length"]
+	engine = threadEngine(spec)
+	helixpad = tune["helixpad"]		# Extend helix above and below shaft by this amount to clear lines for flaky boolean ops
+	if engine == "Direct":		# BUILD THREAD SURFACE; NO SHAFT.CUT(THREAD).  Falls back to Sweep if OCC can't build it.
+		try:
+			return makeDirectThread(spec["internal"], diameter, majordiameter, dims["tdiameter"]/2+0.5, pitch, length,
+					spec["lefty"], spec["roundroot"], helixpad)
+		except (RuntimeError, Part.OCCError) as err:
+			FreeCAD.Console.PrintWarning("TM: " + str(err).strip() + "  Using Engine = Sweep.\n")
+			sweepspec = dict(spec, engine="Sweep")
+			return stageCut(sweepspec, dims, body, stageSweep(sweepspec, dims, body))
+	if engine == "Tiled":		# BUILD PROFILE; SWEEP ONE PITCH, CUT ONE SEGMENT, STACK COPIES
+		t = time.perf_counter()
+		if spec["internal"]:
+			wprofile = makeProfileInt681M(diameter, pitch, spec["roundroot"])
+			makecore = lambda h: makeInsertCore(diameter, dims["tdiameter"], h)
+		else:
+			wprofile = makeProfileExt681M(diameter, pitch, spec["roundroot"])
+			makecore = lambda h: makeShaftCore(majordiameter, h)
+		stepTime("sweep.profile", t)
+		return makeTiledThread(makecore, wprofile, pitch, length, majordiameter/2, spec["lefty"], helixpad)
+	# BUILD PROFILE, HELIX & THREAD over full length, or reuse a longer sweep from this session
+	return memoThreadSweep(spec["internal"], diameter, pitch, spec["roundroot"], spec["lefty"], spec["taper"],
+			majordiameter/2, length+pitch+helixpad*2, -helixpad, tune["transition"])		# Start sweep below shaft end for boolean ops
+
+def stageCut(spec, dims, body, sthread, tune=TUNEDEFAULT):
+	""" SHAFT.CUT(THREAD) or INSERT.CUT(THREAD).  Returns threadbody.  tune: seam (body turned about its axis), fuzzy """
+	if sthread is None:	return body		# TDISABLE=True; cosmetic thread is the plain body
+	if threadEngine(spec) != "Sweep":	return sthread		# Tiled: cut segment by segment.  Direct: no cut needed
+	if tune["seam"]:	body = body.rotated(Base.Vector(0,0,0), Base.Vector(0,0,1), tune["seam"])	# round body: moves only its seam
+	threadbody = _cut(body, sthread, tune["fuzzy"])
+	if threadbody.childShapes()==[]:
+		raise RuntimeError("Failed while fusing thread to " + ("insert" if spec["internal"] else "shaft") + ".  Try changing Diameter or Pitch.")
+	return threadbody
+
+def stageTrim(spec, dims, threadbody, tune=TUNEDEFAULT):
+	""" TRIM THREAD BODY TOP: BEVEL TOP with THREAD.sub(Part.Face.revolve()).  tune: seam (of the cutter), fuzzy """
+	# Best results obtained using padding (not tolerance), and ensuring intersection points aren't too close
+	tdiameter, tmindiameter, length = dims["tdiameter"], dims["tmindiameter"], dims["length"]
+	threadbody = threadbody.rotated(Base.Vector(0,0,0), Base.Vector(0,0,1), TRIMANGLE)
+	if spec["internal"]:
+		topcutter = makeRevolvedProfile([(tdiameter/2+0.1, length+0.1), (tmindiameter/2-0.1, length+0.1),
+				(tmindiameter/2-0.1, length - tdiameter/2 + tmindiameter/2 - 0.2)])
+	else:
+		topcutter = makeRevolvedProfile([(tmindiameter/2-0.1, length+0.1), (tdiameter/2+0.1, length+0.1),
+				(tdiameter/2+0.1, length - tdiameter/2 + tmindiameter/2 - 0.2)])
+	topcutter.rotate(Base.Vector(0,0,0), Base.Vector(0,0,1), 207 + tune["seam"])
+	threadbody = _cut(threadbody, topcutter, tune["fuzzy"])
+	if threadbody.childShapes()==[]:
+		raise RuntimeError("Failed while trimming top of " + ("insert" if spec["internal"] else "thread") + ".  Try changing Diameter or Pitch.")
+	return threadbody
+
+def stageBase(spec, dims, threadbody, variant=BASEVARIANTS[0], tune=TUNEDEFAULT):
+	""" FUSE chamfered BASE to thread body, or BEVEL BOTTOM with THREAD.sub(Part.Face.revolve()).  Returns finished body.
+	variant: (pad scale, vpad scale, extra rotation deg.) from TMFeasibility.BASEVARIANTS, see baseVariant(); a tune
+	base variant replaces it.  tune: fuzzy """
+	padscale, vpadscale, angle = tune["base"] or variant
+	fuzzy = tune["fuzzy"]
+	majordiameter, diameter, pitch = dims["majordiameter"], dims["diameter"], dims["pitch"]
+	profheight, tdiameter = dims["profheight"], dims["tdiameter"]
+	if spec["chamfer"]:
+		if spec["internal"]:
+			pad = (pitch/27.712 + 0.01) * padscale			# Shifts top corner of bevel triangle up and in (to insert) to clear round root and reduce fuse failures
+			base = makeRevolvedProfile([(tdiameter/2 + 0.5, 0), (diameter/2, 0), (majordiameter/2+pad, profheight + pad)])
+			vpad = (7e-4 + pitch*3e-4 + majordiameter*5e-5) * vpadscale	#<<< Passes 100% test cases on chamfer base & round root
+		else:
+			pad = (pitch/13.856 + 1e-2) * padscale	#0.15			#shifts upper, inner coner up and in to prevent fuse failures on rounded root
+			# Profile 45 deg. trangle embedded in shaft deeply enough to fill round root (shifted by pitch/4)
+			base = makeRevolvedProfile([(0, 0), (0, profheight + pad), (diameter/2-pad, profheight + pad), (majordiameter/2, 0)])
+			vpad = 2e-3 * vpadscale		# just enough to avoid a "splitter line" on bottom, and avoid fuse errors.
+		base.rotate(Base.Vector(0,0,0), Base.Vector(0,0,1), -107 + angle)
+		threadbody = threadbody.translated(Base.Vector(0,0,vpad))
+		t = time.perf_counter()
+		threadbody = threadbody.fuse(base, fuzzy) if fuzzy else threadbody.fuse(base)
+		stepTime("base.fuse", t)
+		if threadbody.childShapes()==[]:
+			raise RuntimeError("Failed while fusing base to " + ("insert" if spec["internal"] else "thread") + ".  Try changing Diameter or Pitch.")
+#		threadbody = threadbody.removeSplitter()	# removeSplitter increases render time 800% on 100mm thread but enables PD fuse
+		return threadbody
+	# Bevel Base
+	if spec["internal"]:
+		cutter = makeRevolvedProfile([(majordiameter/2+0.1, -0.1), (diameter/2-0.1, -0.1), (diameter/2-0.1, majordiameter/2 - diameter/2 + 0.2)])
+	else:
+		cutter = makeRevolvedProfile([(diameter/2-0.1, -0.1), (majordiameter/2+0.1, -0.1), (majordiameter/2+0.1, majordiameter/2 - diameter/2 + 0.2)])
+	cutter.rotate(Base.Vector(0,0,0), Base.Vector(0,0,1), -107 + angle)
+	t = time.perf_counter()
+	threadbody = _cut(threadbody, cutter, fuzzy)
+	stepTime("base.bevel", t)
+	return threadbody
+
+def makeThreadBody(spec, retries=None):
+	""" Run every kernel stage for spec (dict, see threadSpec) and return the finished, unplaced thread body.  A failed
+	stage is retried down its RETRYLADDER; retries (list) gets attemptText() lines of any retries.
+	Raises RuntimeError if a stage fails, or up front if the feasibility map predicts it will (TMFeasibility). """
+	checkFeasible(spec, threadEngine(spec))
+	dims = threadDims(spec)
+	body, fallback = stageShaft(spec, dims)
+	variant = baseVariant(spec)
+	runs = (("sweep", lambda tune, prior: stageSweep(spec, dims, body, tune)),
+			("cut", lambda tune, prior: stageCut(spec, dims, body, prior, tune)),
+			("trim", lambda tune, prior: stageTrim(spec, dims, prior, tune)),
+			("base", lambda tune, prior: stageBase(spec, dims, prior, variant, tune)))
+	result = None
+	for stage, run in runs:
+		try:
+			result, attempts = retryStage(stage, lambda tune: run(tune, result))
+		except RuntimeError as err:
+			if retries is not None:	retries.extend(attemptText(stage, getattr(err, "attempts", [])))
+			raise
+		if retries is not None:	retries.extend(attemptText(stage, attempts))
+	return result
@@ -0,0 +1,212 @@
+# INDEMNITY: By using this software you agree not to sue me for any reason related to the use of this software.
+#
+# Copyright (c) 2022 Kurt Funderburg, all rights not explicitly relinquished in LGPL reserved.
+#
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU Lesser General Public License (LGPL)
+#   as published by the Free Software Foundation; either version 2 of
+#   the License, or (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Library General Public License for more details.
+#
+#   You should have received a copy of the GNU Library General Public
+#   License along with this program; if not, write to the Free Software
+#   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307
+#   USA
+#
+#	Analytic thread mesh: the threaded surface is a radius function r(angle, z) built from the ISO 68-1M groove of
+#	makeProfileExt681M/makeProfileInt681M screwed along the execute() helix, limited by the crest (or bore) cone and the
+#	top trim, chamfer base or bevel base cutters of the kernel stages.  It is sampled on a helically sheared grid, so every
+#	profile corner lies on a grid line, with z clamped to [0, Length]; rows collapsed by the clamp give degenerate triangles,
+#	which are dropped, and end caps close the mesh.  No OCC sweep or boolean is run.  Only numpy is needed: spec and dims
+#	are the plain dicts of TMClasses.threadSpec() and threadDims(), passed in by the caller.
+
+import math, struct
+import numpy
+
+__title__ = "ThreadMaker: Analytic numpy thread meshes for preview and STL export."
+__author__ = "Kurt Funderburg"
+
+TOLERANCE = 0.01		# Default chord deviation (mm) between mesh and true round surface
+MINSEGMENTS = 24		# Fewest mesh columns per turn
+ROOTSEGMENTS = 4		# Segments across a round root arc
+FLANKSEGMENTS = 4		# Segments along each flank, so chamfer and trim cutters crossing a flank are followed
+CRESTSEGMENTS = 2		# Segments across the crest flat
+CHUNKPERIODS = 16		# Pitches of thread triangulated per yielded chunk (bounds memory on long threads)
+HELIXZ = -0.01			# execute(): helix starts at -helixpad
+SEAMANGLE = math.radians(37)	# execute(): trim stage turns the thread body 37 deg. (TMKernel.TRIMANGLE)
+SQRT3 = math.sqrt(3)
+STLDTYPE = numpy.dtype([("normal", "<f4", (3,)), ("vertices", "<f4", (3, 3)), ("attr", "<u2")])
+
+def angularSegments(radius, tolerance=TOLERANCE):
+	""" Mesh columns per turn so a circle of radius deviates from its chords by no more than tolerance """
+	if radius <= tolerance: return MINSEGMENTS
+	return max(MINSEGMENTS, int(math.ceil(math.pi / math.acos(1 - tolerance/radius))))
+
+def profileOffsets(spec, dims):
+	""" z offsets from the groove centre of one pitch of grid rows, in [-P/2, P/2): root, flank and crest corners included """
+	p = dims["pitch"]
+	if spec["internal"]:
+		halfroot = p/16
+		crest = min(p/2, p/16 + dims["profheight"]/SQRT3)		# flank meets bore
+	else:
+		halfroot = p/8
+		crest = min(p/2, p/8 + (dims["majordiameter"] - dims["diameter"])/2/SQRT3)		# flank meets crest cone
+	half = [numpy.linspace(0, halfroot, (ROOTSEGMENTS if spec["roundroot"] else 1) + 1),
+			numpy.linspace(halfroot, crest, FLANKSEGMENTS + 1)[1:]]
+	if crest < p/2: half.append(numpy.linspace(crest, p/2, CRESTSEGMENTS + 1)[1:])
+	half = numpy.concatenate(half)
+	return numpy.concatenate((-half[::-1], half[1:-1]))
+
+def threadRadius(spec, dims, z, zc):
+	""" Radius of the finished thread surface at height z on the mesh column whose groove centre is at zc (arrays) """
+	p, length = dims["pitch"], dims["length"]
+	rmaj, rmin = dims["majordiameter"]/2, dims["diameter"]/2
+	rtop, rtopmin = dims["tdiameter"]/2, dims["tmindiameter"]/2
+	h = dims["profheight"]
+	slope = (rtop - rmaj) / length				# taper: crest/bore cone and helix radius change together
+	w = z - zc
+	d = numpy.abs(w - p*numpy.floor(w/p + 0.5))		# distance to nearest groove centre
+	root = rmin + slope*z
+	depth = rtop - rtopmin						# top trim cutter triangle
+	if not spec["internal"]:
+		r = rmaj + slope*z
+		if not spec["disable"]:
+			groove = root + SQRT3*numpy.maximum(d - p/8, 0)
+			if spec["roundroot"]:
+				arc = root + SQRT3*p/24 - numpy.sqrt(numpy.maximum(p*p/48 - d*d, 0))
+				groove = numpy.where(d < p/8, arc, groove)
+			r = numpy.minimum(r, groove)
+		r = numpy.minimum(r, rtopmin - 0.1 + (length + 0.1 - z) * (depth + 0.2)/(depth + 0.3))
+		if spec["chamfer"]:
+			pad = p/13.856 + 1e-2
+			r = numpy.maximum(r, rmaj - z * (rmaj - rmin + pad)/(h + pad))
+		else:
+			r = numpy.minimum(r, rmin - 0.1 + (z + 0.1) * (rmaj - rmin + 0.2)/(rmaj - rmin + 0.3))
+		return r
+	r = root
+	if not spec["disable"]:
+		groove = root + h - SQRT3*numpy.maximum(d - p/16, 0)
+		if spec["roundroot"]:
+			arc = root + h - SQRT3*p/48 + numpy.sqrt(numpy.maximum(p*p/192 - d*d, 0))
+			groove = numpy.where(d < p/16, arc, groove)
+		r = numpy.maximum(r, groove)
+	r = numpy.maximum(r, rtopmin - 0.1 + (z - length + depth + 0.2) * (depth + 0.2)/(depth + 0.3))
+	if spec["chamfer"]:
+		pad = p/27.712 + 0.01
+		r = numpy.minimum(r, rmin + z * (rmaj + pad - rmin)/(h + pad))
+	else:
+		r = numpy.maximum(r, rmaj + 0.1 - (z + 0.1) * (rmaj - rmin + 0.2)/(rmaj - rmin + 0.3))
+	return r
+
+def _quads(pts, flip):
+	""" Two triangles per grid cell of pts (columns, rows, 3), outward normals unless flip """
+	a, b, c, d = pts[:-1, :-1], pts[1:, :-1], pts[1:, 1:], pts[:-1, 1:]
+	if flip:	tris = (numpy.stack((a, c, b), -2), numpy.stack((a, d, c), -2))
+	else:		tris = (numpy.stack((a, b, c), -2), numpy.stack((a, c, d), -2))
+	return numpy.concatenate([t.reshape(-1, 3, 3) for t in tris])
+
+def _nondegenerate(tris):
+	""" Drop zero area triangles (rows collapsed by the z clamp) """
+	n = numpy.cross(tris[:, 1] - tris[:, 0], tris[:, 2] - tris[:, 0])
+	return tris[numpy.einsum("ij,ij->i", n, n) > 0]
+
+def threadTriangles(spec, dims, tolerance=TOLERANCE, segments=None, chunkperiods=CHUNKPERIODS):
+	""" Yield the closed, outward facing triangle mesh of the finished (unplaced) thread body as float arrays (n, 3, 3),
+	CHUNKPERIODS pitches of threaded surface at a time, then the end caps (and insert outer wall). """
+	p, length = dims["pitch"], dims["length"]
+	internal = spec["internal"]
+	rout = dims["tdiameter"]/2 + 0.5			# insert outer wall
+	if segments is None:	segments = angularSegments(rout if internal else dims["majordiameter"]/2, tolerance)
+	offsets = profileOffsets(spec, dims)
+	rows = len(offsets)
+	turn = -1 if spec["lefty"] else 1
+
+	# Columns: last one repeats the first, one pitch along the helix, so the seam closes exactly
+	phi = 2*math.pi * numpy.arange(segments) / segments
+	cos = numpy.append(numpy.cos(phi), 1.0)
+	sin = numpy.append(numpy.sin(phi), 0.0)
+	zc = HELIXZ - p*7/16 + turn*p*(phi - SEAMANGLE)/(2*math.pi)		# groove centre: profile v2..v3 midpoint on the helix
+	zc = numpy.append(zc, zc[0])
+	shift = numpy.zeros(segments + 1, dtype=int)
+	shift[-1] = turn*rows
+	first = (int(math.floor(-zc.max()/p)) - 2) * rows
+	last = (int(math.ceil((length - zc.min())/p)) + 2) * rows
+
+	def column(z):
+		r = threadRadius(spec, dims, z, zc[:, None])
+		return numpy.stack((r * cos[:, None], r * sin[:, None], z), -1)
+
+	step = max(1, chunkperiods) * rows
+	for j0 in range(first, last, step):
+		j = numpy.arange(j0, min(j0 + step, last) + 1)[None, :] + shift[:, None]
+		z = numpy.clip(zc[:, None] + numpy.floor_divide(j, rows)*p + offsets[j % rows], 0, length)
+		yield _nondegenerate(_quads(column(z), internal))
+
+	# END CAPS: rings are the same points the clamped rows collapse to
+	bottom = column(numpy.zeros((segments + 1, 1)))[:, 0]
+	top = column(numpy.full((segments + 1, 1), float(length)))[:, 0]
+	if not internal:
+		caps = [numpy.stack((numpy.zeros_like(bottom[1:]), bottom[1:], bottom[:-1]), 1),
+				numpy.stack((numpy.tile([0, 0, length], (segments, 1)), top[:-1], top[1:]), 1)]
+	else:
+		wall = numpy.stack((rout*cos, rout*sin, numpy.zeros(segments + 1)), -1)
+		walltop = wall + [0, 0, length]
+		caps = [_quads(numpy.stack((wall, walltop), 1), False),
+				numpy.stack((bottom[:-1], bottom[1:], wall[:-1]), 1), numpy.stack((bottom[1:], wall[1:], wall[:-1]), 1),
+				numpy.stack((top[:-1], walltop[:-1], top[1:]), 1), numpy.stack((top[1:], walltop[:-1], walltop[1:]), 1)]
+	yield _nondegenerate(numpy.concatenate(caps).astype(float))
+
+def transformed(triangles, matrix):
+	""" Apply 4x4 matrix (e.g. numpy.array(Placement.toMatrix().A).reshape(4, 4)) to each chunk of triangles """
+	matrix = numpy.asarray(matrix, dtype=float)
+	for tris in triangles:
+		yield tris @ matrix[:3, :3].T + matrix[:3, 3]
+
+def writeStl(path, triangles, header=b"ThreadMaker analytic thread mesh"):
+	""" Stream chunks of triangles (n, 3, 3) to binary STL at path.  Returns (triangle count, enclosed volume). """
+	count = 0
+	volume = 0.0
+	with open(path, "wb") as f:
+		f.write(header[:80].ljust(80, b" "))
+		f.write(struct.pack("<I", 0))		# patched below: count is not known until the last chunk
+		for tris in triangles:
+			n = numpy.cross(tris[:, 1] - tris[:, 0], tris[:, 2] - tris[:, 0])
+			rec = numpy.zeros(len(tris), STLDTYPE)
+			rec["normal"] = n / numpy.linalg.norm(n, axis=1)[:, None]
+			rec["vertices"] = tris
+			f.write(rec.tobytes())
+			count += len(tris)
+			volume += numpy.einsum("ij,ij->", tris[:, 0], numpy.cross(tris[:, 1], tris[:, 2])) / 6
+		f.seek(80)
+		f.write(struct.pack("<I", count))
+	return count, volume
+
+def threadStl(path, spec, dims, tolerance=TOLERANCE, matrix=None):
+	""" Write the thread body of spec/dims to binary STL at path, placed by 4x4 matrix if given.  Returns writeStl() """
+	triangles = threadTriangles(spec, dims, tolerance)
+	if matrix is not None:	triangles = transformed(triangles, matrix)
+	return writeStl(path, triangles)
+
+# FREECAD ######################################################################
+def threadMesh(spec, dims, tolerance=TOLERANCE):
+	""" Mesh.Mesh of the unplaced thread body """
+	import Mesh
+	tris = numpy.concatenate(list(threadTriangles(spec, dims, tolerance)))
+	return Mesh.Mesh(tris.reshape(-1, 3).tolist())
+
+def previewMesh(fp, tolerance=TOLERANCE):
+	""" Create or update Mesh::Feature <fp.Name>Mesh showing thread object fp as an analytic mesh at fp's Placement """
+	from ThreadMaker.TMClasses import threadSpec, threadDims
+	spec = threadSpec(fp)
+	doc = fp.Document
+	mesh = doc.getObject(fp.Name + "Mesh")
+	if mesh is None:
+		mesh = doc.addObject("Mesh::Feature", fp.Name + "Mesh")
+	mesh.Mesh = threadMesh(spec, threadDims(spec), tolerance)
+	mesh.Placement = fp.Placement
+	mesh.Label = fp.Label.strip() + " mesh"
+	return mesh
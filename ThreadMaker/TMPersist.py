@@ -0,0 +1,84 @@
+# INDEMNITY: By using this software you agree not to sue me for any reason related to the use of this software.
+#
+# Copyright (c) 2022 Kurt Funderburg, all rights not explicitly relinquished in LGPL reserved.
+#
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU Lesser General Public License (LGPL)
+#   as published by the Free Software Foundation; either version 2 of
+#   the License, or (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Library General Public License for more details.
+#
+#   You should have received a copy of the GNU Library General Public
+#   License along with this program; if not, write to the Free Software
+#   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307
+#   USA
+#
+#	Parameters-only documents.  With PERSISTPATH ParamsOnly, every finished thread body goes to the shape cache (TMCache)
+#	under its fingerprint, kept in the object's hidden ShapeKey prop, and the document file leaves Shape out (Transient).
+#	On open a thread whose props still give ShapeKey takes the cached body without execute(); in the GUI a hidden thread
+#	nothing depends on waits until it is shown or selected (deferShape), or until restoreShapes() for scripted exports.
+#	A thread whose body is gone from the cache or no longer matches its props is rebuilt by the next recompute.
+
+import FreeCAD
+import ThreadMaker.TMCache as TMCache
+
+__title__ = "ThreadMaker: Thread objects saved as parameters plus fingerprint; shapes loaded from the shape cache on demand."
+__author__ = "Kurt Funderburg"
+
+PERSISTPATH = "User parameter:BaseApp/Macro/ThreadMaker/Persist"		# getParam(PERSISTPATH): ParamsOnly(bool)
+
+class TMLazyObserver:		#######################################################
+	""" Selection observer: a deferred thread gets its shape when it, or a group containing it, is selected """
+	def addSelection(self, docname, objname, sub, pnt):
+		doc = FreeCAD.listDocuments().get(docname)
+		obj = doc.getObject(objname) if doc else None
+		if obj is None: return
+		if sub:	obj = obj.getSubObject(sub, 1) or obj		# picked inside a Part or Link: the object under the cursor
+		restoreShape(obj)
+		for child in obj.OutListRecursive:	restoreShape(child)
+
+	def setSelection(self, docname):		# select all, selection set by script
+		import FreeCADGui
+		for obj in FreeCADGui.Selection.getSelection(docname):	self.addSelection(docname, obj.Name, "", None)
+# end class TMLazyObserver
+
+_lazy = set()		# (document name, object name) of restored threads still waiting for their shape
+_observer = None	# TMLazyObserver, added to FreeCADGui.Selection with the first deferred shape
+_warned = set()		# names of documents whose deferred shapes were reported on the console
+
+def paramsOnly():
+	""" True if the user asked for threads saved without Shape.  Needs the shape cache to hold the bodies. """
+	return FreeCAD.ParamGet(PERSISTPATH).GetBool("ParamsOnly", False) and TMCache.cacheEnabled()
+
+def deferShape(fp):
+	""" Leave restored fp without its shape until restoreShape(fp) (shown, selected) or restoreShapes() """
+	global _observer
+	_lazy.add((fp.Document.Name, fp.Name))
+	if fp.Document.Name not in _warned:
+		_warned.add(fp.Document.Name)
+		FreeCAD.Console.PrintWarning("TM: Hidden threads of " + fp.Document.Name + " have no shape until shown or selected; "
+				+ "scripts that export or recompute them must call TMPersist.restoreShapes(doc) first\n")
+	if _observer is None:
+		import FreeCADGui
+		_observer = TMLazyObserver()
+		FreeCADGui.Selection.addObserver(_observer)
+
+def restoreShape(fp):
+	""" Give deferred fp its shape now (TMThreadBody.loadShape); anything else is left alone """
+	key = (fp.Document.Name, fp.Name)
+	if key not in _lazy: return
+	_lazy.discard(key)
+	fp.Proxy.loadShape(fp)
+
+def restoreShapes(doc=None):
+	""" Load every deferred shape of doc (all documents if None), e.g. before exporting from a script """
+	for docname, objname in sorted(_lazy):
+		if doc is not None and docname != doc.Name: continue
+		_lazy.discard((docname, objname))
+		found = FreeCAD.listDocuments().get(docname)
+		obj = found.getObject(objname) if found else None
+		if obj is not None:	obj.Proxy.loadShape(obj)
@@ -0,0 +1,136 @@
+# INDEMNITY: By using this software you agree not to sue me for any reason related to the use of this software.
+#
+# Copyright (c) 2022 Kurt Funderburg, all rights not explicitly relinquished in LGPL reserved.
+#
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU Lesser General Public License (LGPL)
+#   as published by the Free Software Foundation; either version 2 of
+#   the License, or (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Library General Public License for more details.
+#
+#   You should have received a copy of the GNU Library General Public
+#   License along with this program; if not, write to the Free Software
+#   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307
+#   USA
+#
+#	Parallel document recompute.  Each thread body depends only on its own properties, so the thread bodies that need the
+#	kernel are built concurrently in TMWorkerPool processes, handed to their objects as TMThreadBody.prebuilt, and a normal
+#	document recompute then places them and updates anything that depends on them.
+#	enableThreads() turns real threads on for a scope of objects (scopedThreads: visible, selected or in a group), one by
+#	one in order of enableCost() so cheap threads appear first, with a progress callback that can stop it midway.
+
+import FreeCAD, Part, os, shutil, tempfile, time
+import ThreadMaker.TMCache as TMCache
+import ThreadMaker.TMBackground as TMBackground
+from ThreadMaker.TMWorker import TMWorkerPool, BATCHPATH
+from ThreadMaker.TMKernel import bodyCached
+from ThreadMaker.TMClasses import TMThreadBody, THREADSTAGES, threadSpec, threadCacheParams
+
+__title__ = "ThreadMaker: Recompute thread objects concurrently in worker processes."
+__author__ = "Kurt Funderburg"
+
+MINPARALLEL = 2			# Fewer kernel builds than this are not worth starting worker processes for
+ENABLESCOPES = ("all", "visible", "selection", "group")		# scopedThreads() scopes
+
+def threadObjects(doc):
+	""" ThreadMaker thread objects in doc """
+	return [obj for obj in doc.findObjects("Part::Feature", "Thread(Ext|Int)") if isinstance(obj.Proxy, TMThreadBody)]
+
+def kernelJobs(objs):
+	""" Worker jobs for objs whose next execute would run the kernel: dirty from before the trim stage, thread enabled,
+	and no kept or cached body.  Returns list of (obj, params, job). """
+	cutstage = THREADSTAGES.index("cut")
+	found = []
+	for obj in objs:
+		spec = threadSpec(obj)
+		start = obj.Proxy.firstStage(obj, spec)
+		if start is None or start > cutstage or spec["disable"]: continue		# cosmetic or cheap tail stages: build in place
+		if obj.Proxy.heldBody(spec) is not None: continue		# DisableThrd toggled back: execute swaps the kept body in
+		params = threadCacheParams(spec)
+		if bodyCached(obj.Proxy.Type, spec): continue		# execute loads it (or mirrors the other hand) from the cache
+		found.append((obj, params, {"id": obj.Name, "kind": obj.Proxy.Type, "spec": spec}))
+	return found
+
+def recomputeThreads(doc=None, workers=None):
+	""" Build the kernel bodies of all dirty thread objects in doc concurrently, then recompute doc.
+	workers defaults to BATCHPATH Workers, else one per CPU.  Bodies whose worker build failed or timed out are not
+	retried in process: their objects become potatoes with the worker's reason.  Returns number of bodies built in workers. """
+	doc = doc or FreeCAD.ActiveDocument
+	if workers is None:	workers = FreeCAD.ParamGet(BATCHPATH).GetInt("Workers", os.cpu_count() or 1)
+	found = kernelJobs(threadObjects(doc))
+	if len(found) < MINPARALLEL or workers < 2:
+		doc.recompute()
+		return 0
+
+	tmpdir = tempfile.mkdtemp(prefix="TMRecompute")
+	built = 0
+	t0 = time.perf_counter()
+	try:
+		for obj, params, job in found:
+			job["out"] = os.path.join(tmpdir, obj.Name + TMCache.CACHEEXT)
+		FreeCAD.Console.PrintMessage("TM: Building %d thread bodies in %d worker processes\n"
+				% (len(found), min(workers, len(found))))
+		pool = TMWorkerPool(min(workers, len(found)))
+		try:
+			results = pool.run([job for obj, params, job in found])
+		finally:
+			pool.close()
+		for (obj, params, job), result in zip(found, results):
+			if not result["ok"]:		# failed, hung or died in a worker: a potato now, not an in-process retry that could hang the GUI
+				obj.Proxy.failed = (params, result["error"], result.get("retries", []))
+				continue
+			shape = Part.Shape()
+			shape.importBrep(job["out"])
+			obj.Proxy.prebuilt = (params, shape)
+			built += 1
+	finally:
+		shutil.rmtree(tmpdir, ignore_errors=True)
+	FreeCAD.Console.PrintMessage("TM: %d of %d thread bodies built in %.1fs\n" % (built, len(found), time.perf_counter() - t0))
+	doc.recompute()
+	return built
+
+def scopedThreads(doc, scope="all", group=""):
+	""" Thread objects of doc in scope: "all", "visible", "selection" (GUI selection, with the contents of selected
+	groups) or "group" (contents of the objects labelled group, e.g. an App::Part or Group) """
+	threads = threadObjects(doc)
+	if scope == "all":		return threads
+	if scope == "visible":	return [obj for obj in threads if obj.Visibility]
+	if scope == "selection":
+		import FreeCADGui
+		roots = FreeCADGui.Selection.getSelection(doc.Name)
+	elif scope == "group":	roots = doc.getObjectsByLabel(group)
+	else:	raise ValueError("TMRecompute: scope must be one of " + ", ".join(ENABLESCOPES))
+	names = set()
+	for root in roots:
+		names.add(root.Name)
+		names.update(o.Name for o in root.OutListRecursive)
+	return [obj for obj in threads if obj.Name in names]
+
+def enableCost(obj):
+	""" Rough cost of enabling obj's thread: 0 if a kept or cached body can be swapped in, else turns (Length/Pitch) """
+	spec = dict(threadSpec(obj), disable=False)
+	if obj.Proxy.heldBody(spec) is not None:	return 0.0
+	if bodyCached(obj.Proxy.Type, spec):	return 0.0
+	return spec["length"] / spec["pitch"]
+
+def enableThreads(objs, progress=None):
+	""" Set DisableThrd False on objs and recompute them one at a time, cheapest enableCost() first, building in process.
+	progress(done, total, obj) is called before each object; returning False stops there, leaving the rest disabled.
+	Returns the objects enabled.  Dependents are updated by one document recompute at the end. """
+	todo = sorted((obj for obj in objs if obj.DisableThrd), key=enableCost)
+	done = []
+	t0 = time.perf_counter()
+	with TMBackground.foreground():		# progress and stop mean little if every build went to a worker at once
+		for i, obj in enumerate(todo):
+			if progress and progress(i, len(todo), obj) is False: break
+			obj.DisableThrd = False
+			obj.recompute()
+			done.append(obj)
+		if progress: progress(len(done), len(todo), None)
+		if done: done[0].Document.recompute()
+	FreeCAD.Console.PrintMessage("TM: Enabled %d of %d threads in %.1fs\n" % (len(done), len(todo), time.perf_counter() - t0))
+	return done
@@ -0,0 +1,171 @@
+# INDEMNITY: By using this software you agree not to sue me for any reason related to the use of this software.
+#
+# Copyright (c) 2022 Kurt Funderburg, all rights not explicitly relinquished in LGPL reserved.
+#
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU Lesser General Public License (LGPL)
+#   as published by the Free Software Foundation; either version 2 of
+#   the License, or (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Library General Public License for more details.
+#
+#   You should have received a copy of the GNU Library General Public
+#   License along with this program; if not, write to the Free Software
+#   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307
+#   USA
+#
+#	Thread spec model without FreeCAD: the geometry-defining parameters of a thread and the derived dimensions the kernel
+#	builds from them (ISO 965 deviations, clearance, Dmin, taper top diameters).  A spec is the plain dict of
+#	TMClasses.threadSpec(), or a ThreadSpec, which reads the same way (spec["pitch"]).  ThreadSpecArray holds many specs as
+#	numpy columns and dimsArrays() derives all their dimensions at once, for configurators that check or price large
+#	numbers of thread configurations without FreeCAD or OCC.
+
+import math
+import numpy
+from ThreadMaker.TMTolerance import iso965ExtPitchDev, iso965IntPitchDev, iso965ExtCrestDev, iso965IntCrestDev, \
+		pitchDevArray, crestDevArray
+
+__title__ = "ThreadMaker: FreeCAD-free thread spec model and batch derived dimensions."
+__author__ = "Kurt Funderburg"
+
+SPECFIELDS = ("internal", "standard", "diameter", "pitch", "length", "taper", "clearance", "chamfer", "lefty", "disable",
+		"roundroot", "tolpitch", "tolcrest", "engine")		# threadSpec() dict keys, in order
+SPECDEFAULTS = (False, "Custom", 6.0, 1.0, 10.0, 0.0, 0.0, False, False, False, False, "", "", "Sweep")
+DIMFIELDS = ("pitch", "length", "crestdev", "pitchdev", "profheight", "majordiameter", "diameter", "tdiameter", "tmindiameter")
+
+def specFromInitProps(internal, initprops, engine="Sweep"):
+	""" Kernel spec dict (see threadSpec) from an initprops list, the TMDialog result format:
+	[standard, size, diameter, pitch, length, taper, clearance, chamfer, lefty, thrddisable, roundroot, pitchtol, cresttol]
+	A standard thread given with no diameter gets Dmaj from its size and crest tolerance, as the dialog does. """
+	custom = initprops[0] == "Custom"
+	diameter = initprops[2]
+	if not diameter and not custom:
+		if internal:	diameter = float(initprops[1][1:]) + iso965IntCrestDev(float(initprops[3]), initprops[12])
+		else:			diameter = float(initprops[1][1:]) - iso965ExtCrestDev(float(initprops[3]), initprops[12])
+	return {"internal": internal, "standard": initprops[0],
+			"diameter": float(diameter), "pitch": float(initprops[3]), "length": float(initprops[4]), "taper": float(initprops[5]),
+			"clearance": float(initprops[6]), "chamfer": bool(initprops[7]), "lefty": bool(initprops[8]), "disable": bool(initprops[9]),
+			"roundroot": bool(initprops[10]), "tolpitch": "" if custom else initprops[11], "tolcrest": "" if custom else initprops[12],
+			"engine": engine}
+
+def threadDims(spec):
+	""" Derived thread dimensions (dict) from spec: ISO 965 deviations applied, clearance applied, taper applied """
+	pitch = spec["pitch"]
+	length = spec["length"]
+	if spec["standard"] == "Custom":
+		crestdev = 0.0
+		pitchdev = 0.0
+	elif spec["internal"]:
+		crestdev = iso965IntCrestDev(pitch, spec["tolcrest"])
+		pitchdev = iso965IntPitchDev(spec["diameter"] + crestdev, pitch, spec["tolpitch"])
+	else:
+		crestdev = iso965ExtCrestDev(pitch, spec["tolcrest"])
+		pitchdev = iso965ExtPitchDev(spec["diameter"] + crestdev, pitch, spec["tolpitch"])
+	profheight = pitch * 5/16 * math.sqrt(3)		# pre-tolerance truncation
+	taper = math.sin(spec["taper"]*math.pi/180)
+	if spec["internal"]:
+		majordiameter = spec["diameter"] + spec["clearance"]	# Apply clearance to controlling diameter
+		diameter = majordiameter - crestdev - 2*profheight + pitchdev		# Dmin: ISO minor d with pitch tolerance applied
+		tdiameter = majordiameter + length * taper		# top diamater (taper applied)
+		tmindiameter = tdiameter - crestdev - 2*profheight + pitchdev		#tdiameter, tmindiameter = top diameters after any taper
+	else:
+		majordiameter = spec["diameter"] - spec["clearance"]	# for ISO this is Dmaj = Dnom-CrestDev
+		diameter = majordiameter + crestdev - 2*profheight - pitchdev
+		tdiameter = majordiameter - length * taper
+		tmindiameter = tdiameter + crestdev - 2*profheight - pitchdev
+	return {"pitch": pitch, "length": length, "crestdev": crestdev, "pitchdev": pitchdev, "profheight": profheight,
+			"majordiameter": majordiameter, "diameter": diameter, "tdiameter": tdiameter, "tmindiameter": tmindiameter}
+
+class ThreadSpec:		#######################################################
+	""" One thread spec with slots for the SPECFIELDS.  Also reads as a mapping, so the kernel stages, threadDims()
+	and dict(spec) take it wherever they take a threadSpec() dict. """
+	__slots__ = SPECFIELDS
+
+	def __init__(self, *args, **kwargs):
+		values = dict(zip(SPECFIELDS, SPECDEFAULTS))
+		values.update(zip(SPECFIELDS, args))
+		for key in kwargs:
+			if key not in values: raise TypeError("ThreadSpec has no field " + key)
+		values.update(kwargs)
+		for key in SPECFIELDS:	setattr(self, key, values[key])
+
+	@classmethod
+	def fromDict(cls, spec):
+		return cls(**{key: spec[key] for key in SPECFIELDS})
+
+	def asDict(self):
+		return {key: getattr(self, key) for key in SPECFIELDS}
+
+	def keys(self):
+		return SPECFIELDS
+
+	def __getitem__(self, key):
+		if key not in SPECFIELDS: raise KeyError(key)
+		return getattr(self, key)
+
+	def __eq__(self, other):
+		return isinstance(other, ThreadSpec) and all(getattr(self, k) == getattr(other, k) for k in SPECFIELDS)
+
+	def __repr__(self):
+		return "ThreadSpec(" + ", ".join("%s=%r" % (k, getattr(self, k)) for k in SPECFIELDS) + ")"
+
+	def dims(self):
+		""" threadDims() of this spec """
+		return threadDims(self)
+# end class ThreadSpec
+
+class ThreadSpecArray:		#######################################################
+	""" Many thread specs as one numpy column per SPECFIELDS field (bool, str or float arrays of equal length) """
+	__slots__ = SPECFIELDS
+
+	def __init__(self, **columns):
+		size = max([numpy.size(v) for v in columns.values()] or [0])
+		for key, default in zip(SPECFIELDS, SPECDEFAULTS):
+			column = numpy.asarray(columns.pop(key, default))
+			setattr(self, key, numpy.broadcast_to(column, (size,)) if column.ndim == 0 else column)
+		if columns: raise TypeError("ThreadSpecArray has no fields " + ", ".join(columns))
+
+	@classmethod
+	def fromSpecs(cls, specs):
+		""" Columns from a list of threadSpec() dicts or ThreadSpecs """
+		specs = list(specs)
+		return cls(**{key: [spec[key] for spec in specs] for key in SPECFIELDS})
+
+	def __len__(self):
+		return len(self.pitch)
+
+	def __getitem__(self, index):
+		""" ThreadSpec of row index """
+		return ThreadSpec(**{key: getattr(self, key)[index].item() for key in SPECFIELDS})
+
+	def dims(self):
+		""" dimsArrays() of these specs """
+		return dimsArrays(self)
+# end class ThreadSpecArray
+
+def dimsArrays(specs):
+	""" threadDims() of every row of a ThreadSpecArray at once: dict of DIMFIELDS arrays.  Agrees with threadDims() to
+	floating point rounding.  Rows with impossible values (pitch <= 0) give nan or inf rather than raising. """
+	internal = numpy.asarray(specs.internal, dtype=bool)
+	custom = numpy.asarray(specs.standard) == "Custom"
+	pitch = numpy.asarray(specs.pitch, dtype=float)
+	length = numpy.asarray(specs.length, dtype=float)
+	nomdiameter = numpy.asarray(specs.diameter, dtype=float)
+	with numpy.errstate(divide="ignore", invalid="ignore"):
+		crestdev = numpy.where(custom, 0.0, numpy.where(internal, crestDevArray(True, pitch, specs.tolcrest),
+				crestDevArray(False, pitch, specs.tolcrest)))
+		pitchdev = numpy.where(custom, 0.0, numpy.where(internal,
+				pitchDevArray(True, nomdiameter + crestdev, pitch, specs.tolpitch),
+				pitchDevArray(False, nomdiameter + crestdev, pitch, specs.tolpitch)))
+	sign = numpy.where(internal, 1.0, -1.0)		# internal threads grow outwards from the controlling diameter
+	profheight = pitch * 5/16 * math.sqrt(3)
+	taper = numpy.sin(numpy.asarray(specs.taper, dtype=float)*math.pi/180)
+	majordiameter = nomdiameter + sign*numpy.asarray(specs.clearance, dtype=float)
+	diameter = majordiameter - sign*crestdev - 2*profheight + sign*pitchdev
+	tdiameter = majordiameter + sign*length*taper
+	tmindiameter = tdiameter - sign*crestdev - 2*profheight + sign*pitchdev
+	return {"pitch": pitch, "length": length, "crestdev": crestdev, "pitchdev": pitchdev, "profheight": profheight,
+			"majordiameter": majordiameter, "diameter": diameter, "tdiameter": tdiameter, "tmindiameter": tmindiameter}
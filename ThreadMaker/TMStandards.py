@@ -0,0 +1,132 @@
+# INDEMNITY: By using this software you agree not to sue me for any reason related to the use of this software.
+#
+# Copyright (c) 2022 Kurt Funderburg, all rights not explicitly relinquished in LGPL reserved.
+#
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU Lesser General Public License (LGPL)
+#   as published by the Free Software Foundation; either version 2 of
+#   the License, or (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Library General Public License for more details.
+#
+#   You should have received a copy of the GNU Library General Public
+#   License along with this program; if not, write to the Free Software
+#   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307
+#   USA
+#
+#	Thread standards registry.  Standards/standards.json lists each standard with its taper and size table file; a table
+#	file has one line per size: size name, coarse pitch, fine pitches (# starts a comment).  Only the small index is read
+#	at import; a size table is read and indexed the first time it is used, so adding standards costs nothing until
+#	someone picks one.  Sizes are indexed by name and by nominal diameter (sorted, bisect nearest-size lookup).
+
+import os, json, bisect, collections.abc
+
+__title__ = "ThreadMaker: Lazily loaded, indexed thread standards registry."
+__author__ = "Kurt Funderburg"
+
+STANDARDSDIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Standards")
+STANDARDSINDEX = "standards.json"
+CUSTOM = "Custom"			# Unrestricted specification of d, p, t: no size table
+
+class TMStandard(collections.abc.Mapping):		#######################################################
+	""" Size table of one standard: a read-only { size : [pitch str, coarse first] } mapping in table order, loaded from
+	its data file on first access, with O(1) name lookups and bisect nearest-diameter lookup """
+	def __init__(self, name, filename, taper=0.0, prefix="", tolerance=""):
+		self.name = name
+		self.filename = filename
+		self.taper = float(taper)
+		self.prefix = prefix		# Size name prefix before the nominal diameter, e.g. "M" in "M10"
+		self.tolerance = tolerance
+		self._pitches = None		# { size : [pitch str] }, dict order = table order
+		self._sizes = None			# (size,) in table order
+		self._index = None			# { size : position in _sizes }
+		self._diameters = None		# [nominal diameter] ascending
+		self._bydiameter = None		# [size] in _diameters order
+
+	def load(self):
+		""" Read and index the size table (first use only) """
+		if self._pitches is not None: return
+		pitches = {}
+		with open(os.path.join(STANDARDSDIR, self.filename)) as f:
+			for line in f:
+				fields = line.split("#")[0].split()
+				if fields: pitches[fields[0]] = fields[1:]
+		self._sizes = tuple(pitches)
+		self._index = {size: i for i, size in enumerate(self._sizes)}
+		bydiameter = sorted((self.nominalDiameter(size), size) for size in self._sizes)
+		self._diameters = [d for d, size in bydiameter]
+		self._bydiameter = [size for d, size in bydiameter]
+		self._pitches = pitches
+
+	def __getitem__(self, size):
+		self.load()
+		return self._pitches[size]
+
+	def __iter__(self):
+		self.load()
+		return iter(self._sizes)
+
+	def __len__(self):
+		self.load()
+		return len(self._sizes)
+
+	def __contains__(self, size):
+		self.load()
+		return size in self._pitches
+
+	def sizes(self):
+		""" Size names in table order """
+		self.load()
+		return self._sizes
+
+	def sizeIndex(self, size):
+		""" Position of size in sizes() (popup index).  KeyError if not in the table. """
+		self.load()
+		return self._index[size]
+
+	def nominalDiameter(self, size):
+		return float(size[len(self.prefix):])
+
+	def nearestSize(self, diameter):
+		""" Size whose nominal diameter is closest to diameter (the smaller one on a tie) """
+		self.load()
+		i = bisect.bisect_left(self._diameters, diameter)
+		if i == 0: return self._bydiameter[0]
+		if i == len(self._diameters): return self._bydiameter[-1]
+		below, above = self._diameters[i-1], self._diameters[i]
+		return self._bydiameter[i-1] if diameter - below <= above - diameter else self._bydiameter[i]
+
+	def coarsePitch(self, size):
+		return self[size][0]
+
+	def finePitches(self, size):
+		return self[size][1:]
+
+	def isCoarse(self, size, pitch):
+		""" True if pitch (float or str) is the coarse pitch of size """
+		return abs(float(pitch) - float(self[size][0])) < 1e-9
+# end class TMStandard
+
+_standards = None		# { name : TMStandard }, from STANDARDSINDEX
+
+def registry():
+	""" { name : TMStandard } of all standards in STANDARDSINDEX order (tables not loaded) """
+	global _standards
+	if _standards is None:
+		with open(os.path.join(STANDARDSDIR, STANDARDSINDEX)) as f:
+			index = json.load(f, object_pairs_hook=collections.OrderedDict)
+		_standards = collections.OrderedDict((name, TMStandard(name, **spec)) for name, spec in index.items())
+	return _standards
+
+def standard(name):
+	""" TMStandard of name.  KeyError for Custom or unknown names. """
+	return registry()[name]
+
+def supportedStandards():
+	""" { name : taper } of Custom and every registered standard, the dialog order """
+	standards = collections.OrderedDict([(CUSTOM, 0)])
+	for name, std in registry().items():	standards[name] = std.taper
+	return standards
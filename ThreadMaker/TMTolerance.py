@@ -0,0 +1,161 @@
+# INDEMNITY: By using this software you agree not to sue me for any reason related to the use of this software.
+#
+# Copyright (c) 2022 Kurt Funderburg, all rights not explicitly relinquished in LGPL reserved.
+#
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU Lesser General Public License (LGPL)
+#   as published by the Free Software Foundation; either version 2 of
+#   the License, or (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Library General Public License for more details.
+#
+#   You should have received a copy of the GNU Library General Public
+#   License along with this program; if not, write to the Free Software
+#   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307
+#   USA
+#
+#	ISO 965-1 tolerance engine.  A tolerance class such as "6g" is a grade digit (tolerance = grade factor * grade 6
+#	tolerance) and a position letter (fundamental deviation A + B*P um).  Both are table lookups here.  The scalar
+#	iso965*Dev() functions give the same values as the 1.1 if-chains and are memoized, because the dialog and updateData()
+#	ask for the same few combinations over and over.  The *Array functions, limitsArrays() and fitTable() do the same math
+#	with numpy over whole arrays of specs, for fit tables over all ISO 261 sizes and classes.
+
+import math, functools
+import numpy
+import ThreadMaker.TMStandards as TMStandards
+
+__title__ = "ThreadMaker: Table-driven ISO 965 thread tolerances, scalar and numpy bulk."
+__author__ = "Kurt Funderburg"
+
+ISO965EXTPITCHTOL = ('3e', '3f', '3g', '3h', '4e', '4f', '4g', '4h', '5e', '5f', '5g', '5h', '6e', '6f', '6g', '6h', '7e', '7f', '7g', '7h',
+						'8e', '8f', '8g', '8h', '9e', '9f', '9g', '9h')
+ISO965EXTCRESTTOL = ('4e', '4f', '4g', '4h', '6e', '6f', '6g', '6h', '8e', '8f', '8g', '8h')
+ISO965INTPITCHTOL = ('4G', '4H', '5G', '5H', '6G', '6H', '7G', '7H', '8G', '8H')
+ISO965INTCRESTTOL = ('4G', '4H', '5G', '5H', '6G', '6H', '7G', '7H', '8G', '8H')
+EXTFUNDAMENTAL = {"e": (50, 11), "f": (30, 11), "g": (15, 11), "h": (0, 0)}	# es = -(A + B*P) um.  e: exceptions for P<=0.45, f: n/a for P<=0.3
+INTFUNDAMENTAL = {"G": (15, 11), "H": (0, 0)}								# EI = +(A + B*P) um
+EXTPITCHGRADE = {"3": 0.5, "4": 0.63, "5": 0.8, "6": 1.0, "7": 1.25, "8": 1.6, "9": 2.0}	# Td2 = factor * Td2(6)
+INTPITCHGRADE = {"4": 0.85, "5": 1.06, "6": 1.32, "7": 1.7, "8": 2.12}					# TD2 = factor * Td2(6)
+EXTCRESTGRADE = {"4": 0.63, "6": 1.0, "8": 1.6}												# Td = factor * Td(6)
+INTCRESTGRADE = {"4": 0.63, "5": 0.8, "6": 1.0, "7": 1.25, "8": 1.6}						# TD1 = factor * TD1(6)
+PITCHDIAMETERK = 3/8 * math.sqrt(3)		# basic pitch diameter d2 = d - K*P (0.649519 P)
+MINORDIAMETERK = 5/8 * math.sqrt(3)		# basic minor diameter d1 = d - K*P (1.082532 P), ThreadMaker Dmin at zero deviation
+
+def toleranceClass(tol, grades, fundamentals):
+	""" (grade factor, A, B) of tolerance class tol (str).  Unknown grade or position counts as 0, as in 1.1. """
+	a, b = fundamentals.get(tol[1:2], (0, 0))
+	return grades.get(tol[0:1], 0.0), a, b
+
+@functools.lru_cache(maxsize=1024)
+def iso965ExtPitchDev(nomdiameter, pitch, pitchtol):		# Compute & return pitch deviation per ISO965 S.13 formulae
+	""" (nomdiameter (float), pitch (float), pitchtol (str)) """
+	factor, a, b = toleranceClass(pitchtol, EXTPITCHGRADE, EXTFUNDAMENTAL)
+	td6 = 90 * pitch**0.4 * nomdiameter**0.1 / 1000		# Td2(6) um = 90 * P ** 0.4 * d ** 0.1
+	return (a + b * pitch) / 1000 + factor * td6
+
+@functools.lru_cache(maxsize=1024)
+def iso965IntPitchDev(nomdiameter, pitch, pitchtol):		# Compute & return pitch deviation per ISO965 S.13 formulae
+	""" (nomdiameter (float), pitch (float), pitchtol (str)) """
+	factor, a, b = toleranceClass(pitchtol, INTPITCHGRADE, INTFUNDAMENTAL)
+	td6 = 90 * pitch**0.4 * nomdiameter**0.1 / 1000
+	return (a + b * pitch) / 1000 + factor * td6
+
+@functools.lru_cache(maxsize=1024)
+def iso965ExtCrestDev(pitch, cresttol):		# Compute & return crest deviation per ISO965 S.13 formulae
+	""" (pitch (float), cresttol (str)) """
+	factor, a, b = toleranceClass(cresttol, EXTCRESTGRADE, EXTFUNDAMENTAL)
+	td6 = (180 * pitch**(2/3) - 3.15/pitch**(1/2)) / 1000	# Td(6) um = 180 * P ** 2/3 - 3.15/sqrt(P)
+	return (a + b * pitch) / 1000 + factor * td6
+
+@functools.lru_cache(maxsize=1024)
+def iso965IntCrestDev(pitch, cresttol):		# Compute & return crest deviation per ISO965 S.13 formulae
+	""" (pitch (float), cresttol (str)) """
+	factor, a, b = toleranceClass(cresttol, INTCRESTGRADE, INTFUNDAMENTAL)
+	if pitch >= 1.0: 	td6 = 230 * pitch**0.7 / 1000
+	else: 			td6 = (433 * pitch - 190 * pitch**1.22) / 1000
+	return (a + b * pitch) / 1000 + factor * td6
+
+# NUMPY BULK API ########################################################
+# Arguments broadcast against each other; tolerance arguments are str or arrays of class strings.  Results agree with the
+# scalar functions to floating point rounding (numpy and Python may round powers differently in the last bit).
+
+def classArrays(tolerances, grades, fundamentals):
+	""" (grade factor, A, B) arrays for an array of tolerance class strings, parsing each distinct class once """
+	classes, inverse = numpy.unique(numpy.asarray(tolerances, dtype=str), return_inverse=True)
+	table = numpy.array([toleranceClass(str(c), grades, fundamentals) for c in classes], dtype=float).reshape(-1, 3)
+	inverse = inverse.reshape(numpy.shape(tolerances))
+	return table[inverse, 0], table[inverse, 1], table[inverse, 2]
+
+def pitchDevArray(internal, nomdiameter, pitch, pitchtol):
+	""" iso965ExtPitchDev()/iso965IntPitchDev() over arrays: fundamental deviation + pitch diameter tolerance (mm) """
+	grades, fundamentals = (INTPITCHGRADE, INTFUNDAMENTAL) if internal else (EXTPITCHGRADE, EXTFUNDAMENTAL)
+	factor, a, b = classArrays(pitchtol, grades, fundamentals)
+	d = numpy.asarray(nomdiameter, dtype=float)
+	p = numpy.asarray(pitch, dtype=float)
+	return (a + b * p) / 1000 + factor * (90 * p**0.4 * d**0.1 / 1000)
+
+def crestDevArray(internal, pitch, cresttol):
+	""" iso965ExtCrestDev()/iso965IntCrestDev() over arrays: fundamental deviation + crest diameter tolerance (mm) """
+	p = numpy.asarray(pitch, dtype=float)
+	if internal:
+		factor, a, b = classArrays(cresttol, INTCRESTGRADE, INTFUNDAMENTAL)
+		td6 = numpy.where(p >= 1.0, 230 * p**0.7 / 1000, (433 * p - 190 * p**1.22) / 1000)
+	else:
+		factor, a, b = classArrays(cresttol, EXTCRESTGRADE, EXTFUNDAMENTAL)
+		td6 = (180 * p**(2/3) - 3.15/p**(1/2)) / 1000
+	return (a + b * p) / 1000 + factor * td6
+
+def fundamentalArray(internal, pitch, tolerances):
+	""" Fundamental deviation magnitude |es| or EI (mm) of each tolerance class """
+	factor, a, b = classArrays(tolerances, {}, INTFUNDAMENTAL if internal else EXTFUNDAMENTAL)
+	return (a + b * numpy.asarray(pitch, dtype=float)) / 1000
+
+def limitsArrays(internal, nomdiameter, pitch, pitchtol, cresttol):
+	""" ISO 965-1 diameter limits (mm) for arrays of nominal diameters, pitches and tolerance classes.  Returns dict of
+	arrays "majormax", "majormin", "pitchmax", "pitchmin", "minormax", "minormin", plus "pitchdev" and "crestdev" (the
+	ThreadMaker deviations).  External: Dmaj from the crest class, d2 from the pitch class, minormin is the Dmin
+	ThreadMaker builds (d1 - pitchdev).  Internal: D1 from the crest class, D2 from the pitch class, majormax is
+	not toleranced (nan) and majormin is D + EI. """
+	d = numpy.asarray(nomdiameter, dtype=float)
+	p = numpy.asarray(pitch, dtype=float)
+	pitchdev = pitchDevArray(internal, d, p, pitchtol)
+	crestdev = crestDevArray(internal, p, cresttol)
+	pitchfd = fundamentalArray(internal, p, pitchtol)
+	crestfd = fundamentalArray(internal, p, cresttol)
+	d2 = d - PITCHDIAMETERK * p
+	d1 = d - MINORDIAMETERK * p
+	if internal:
+		limits = {"majormax": numpy.full(numpy.broadcast(d, p).shape, numpy.nan), "majormin": d + crestfd,
+				"pitchmax": d2 + pitchdev, "pitchmin": d2 + pitchfd, "minormax": d1 + crestdev, "minormin": d1 + crestfd}
+	else:
+		limits = {"majormax": d - crestfd, "majormin": d - crestdev, "pitchmax": d2 - pitchfd, "pitchmin": d2 - pitchdev,
+				"minormax": d1 - pitchfd, "minormin": d1 - pitchdev}
+	limits["pitchdev"] = pitchdev
+	limits["crestdev"] = crestdev
+	for key in limits:	limits[key] = numpy.broadcast_to(limits[key], numpy.broadcast(d, p, pitchdev, crestdev).shape)
+	return limits
+
+_fittables = {}		# fitTable() results: { internal : table dict }
+
+def fitTable(internal, pdtable=None):
+	""" Limits of every size x pitch of pdtable (default ISO261PDTABLE) x pitch class x crest class, computed once and
+	kept.  Returns dict: "size" and "pitch" arrays (one row per size/pitch pair), "pitchtol" and "cresttol" tuples, and
+	the limitsArrays() keys as arrays of shape (rows, pitch classes, crest classes).  Treat the arrays as read-only. """
+	if pdtable is None and internal in _fittables:	return _fittables[internal]
+	if pdtable is None:
+		table = TMStandards.standard("ISO 261 Metric")
+	else:
+		table = pdtable
+	rows = [(size, float(p)) for size in table for p in table[size]]
+	pitchtols = ISO965INTPITCHTOL if internal else ISO965EXTPITCHTOL
+	cresttols = ISO965INTCRESTTOL if internal else ISO965EXTCRESTTOL
+	sizes = numpy.array([size for size, p in rows])
+	d = numpy.array([float(size[1:]) for size, p in rows])[:, None, None]
+	p = numpy.array([p for size, p in rows])[:, None, None]
+	fits = limitsArrays(internal, d, p, numpy.array(pitchtols)[None, :, None], numpy.array(cresttols)[None, None, :])
+	fits.update({"size": sizes, "pitch": p[:, 0, 0], "pitchtol": pitchtols, "cresttol": cresttols})
+	if pdtable is None:	_fittables[internal] = fits
+	return fits
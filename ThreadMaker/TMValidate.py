@@ -0,0 +1,99 @@
+# INDEMNITY: By using this software you agree not to sue me for any reason related to the use of this software.
+#
+# Copyright (c) 2022 Kurt Funderburg, all rights not explicitly relinquished in LGPL reserved.
+#
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU Lesser General Public License (LGPL)
+#   as published by the Free Software Foundation; either version 2 of
+#   the License, or (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Library General Public License for more details.
+#
+#   You should have received a copy of the GNU Library General Public
+#   License along with this program; if not, write to the Free Software
+#   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307
+#   USA
+#
+#	Thread spec feasibility rules, shared by TMDialog.onOk(), TMThreadVP.updateData() and batch tools.  "error" rules
+#	are specs the kernel booleans cannot build; "warning" rules often fail.  checkArrays() evaluates every rule over a
+#	TMSpec.ThreadSpecArray in one numpy pass, rangeArrays() gives the feasible interval of each numeric parameter with the
+#	others held; checkSpec() and feasibleRanges() do the same for one spec dict or ThreadSpec.  No FreeCAD needed.
+
+import numpy
+from ThreadMaker.TMTolerance import pitchDevArray, crestDevArray
+from ThreadMaker.TMSpec import ThreadSpecArray
+
+__title__ = "ThreadMaker: Vectorized thread spec validation rules and feasible ranges."
+__author__ = "Kurt Funderburg"
+
+MINPITCH = 0.1			# Smallest pitch the kernel is tried with
+PITCHRATIO = 2.3		# Pitch may not exceed (Diameter - Clearance)/PITCHRATIO: large pitch on small diameter breaks shaft.cut(thread)
+MAXTAPER = 5.0			# |Taper| above this (deg.) warns
+SMALLDIAMETER = 3.5		# Diameter - Clearance below this with Pitch above COARSEPITCH warns
+COARSEPITCH = 1.0
+VALIDTOL = 1e-9			# Slack on the rule limits, so values clamped to a limit (updateData) pass the rules again
+RULES = (		# (rule, severity, parameter it constrains, message) in reporting order
+	("pitchmax", "error", "pitch", "Pitch must not be more than (Diameter - Clearance) / 2.3"),
+	("pitchmin", "error", "pitch", "Pitch must be at least 0.1"),
+	("length", "error", "length", "Length must not be less than Pitch"),
+	("tolerance", "error", "tolpitch", "Pitch Deviation must not exceed Crest Deviation"),
+	("taper", "warning", "taper", "Computation may fail if |Taper| > 5.0"),
+	("smallcoarse", "warning", "diameter", "Computation may fail if Diameter (less Clearance & Taper) < 3.5 while Pitch > 1.0"))
+RULEPARAMS = {		# { rule : spec parameters it depends on }
+	"pitchmax" : ("diameter", "pitch", "clearance"), "pitchmin" : ("pitch",), "length" : ("length", "pitch"),
+	"tolerance" : ("pitch", "tolpitch", "tolcrest"), "taper" : ("taper",), "smallcoarse" : ("diameter", "pitch", "clearance") }
+
+def checkArrays(specs):
+	""" Violations of every rule for a ThreadSpecArray: { rule : bool array, True where the spec breaks the rule } """
+	internal = numpy.asarray(specs.internal, dtype=bool)
+	custom = numpy.asarray(specs.standard) == "Custom"
+	diameter = numpy.asarray(specs.diameter, dtype=float)
+	pitch = numpy.asarray(specs.pitch, dtype=float)
+	length = numpy.asarray(specs.length, dtype=float)
+	clearance = numpy.asarray(specs.clearance, dtype=float)
+	with numpy.errstate(divide="ignore", invalid="ignore"):		# bad pitches are reported by pitchmin, not numpy
+		crestdev = numpy.where(internal, crestDevArray(True, pitch, specs.tolcrest), crestDevArray(False, pitch, specs.tolcrest))
+		nominal = diameter + numpy.where(internal, -crestdev, crestdev)		# standard Diameter is size -/+ crest deviation
+		pitchdev = numpy.where(internal, pitchDevArray(True, nominal, pitch, specs.tolpitch),
+				pitchDevArray(False, nominal, pitch, specs.tolpitch))
+	return {"pitchmax": pitch*PITCHRATIO > diameter - clearance + VALIDTOL,
+			"pitchmin": pitch < MINPITCH - VALIDTOL,
+			"length": length < pitch - VALIDTOL,
+			"tolerance": ~custom & (pitchdev > crestdev),
+			"taper": numpy.abs(numpy.asarray(specs.taper, dtype=float)) > MAXTAPER,
+			"smallcoarse": (diameter - clearance < SMALLDIAMETER) & (pitch > COARSEPITCH)}
+
+def rangeArrays(specs):
+	""" Feasible (low, high) arrays of each numeric parameter of a ThreadSpecArray, other parameters held:
+	{ "diameter", "pitch", "length", "clearance", "taper" : (low array, high array) }.  Ignores the tolerance rule. """
+	diameter = numpy.asarray(specs.diameter, dtype=float)
+	pitch = numpy.asarray(specs.pitch, dtype=float)
+	length = numpy.asarray(specs.length, dtype=float)
+	clearance = numpy.asarray(specs.clearance, dtype=float)
+	inf = numpy.full(pitch.shape, numpy.inf)
+	return {"diameter": (pitch*PITCHRATIO + clearance, inf),
+			"pitch": (numpy.full(pitch.shape, MINPITCH), numpy.minimum((diameter - clearance)/PITCHRATIO, length)),
+			"length": (pitch, inf),
+			"clearance": (-inf, diameter - pitch*PITCHRATIO),
+			"taper": (numpy.full(pitch.shape, -MAXTAPER), numpy.full(pitch.shape, MAXTAPER))}
+
+def validSpecs(specs):
+	""" Bool array: True where a ThreadSpecArray row breaks no "error" rule (worth sending to the kernel) """
+	violations = checkArrays(specs)
+	ok = numpy.ones(len(specs), dtype=bool)
+	for rule, severity, parameter, message in RULES:
+		if severity == "error":	ok &= ~violations[rule]
+	return ok
+
+def checkSpec(spec):
+	""" Broken rules of one spec dict or ThreadSpec: list of (rule, severity, parameter, message) in RULES order """
+	violations = checkArrays(ThreadSpecArray.fromSpecs([spec]))
+	return [r for r in RULES if violations[r[0]][0]]
+
+def feasibleRanges(spec):
+	""" rangeArrays() of one spec dict or ThreadSpec: { parameter : (low, high) } floats """
+	ranges = rangeArrays(ThreadSpecArray.fromSpecs([spec]))
+	return {key: (float(low[0]), float(high[0])) for key, (low, high) in ranges.items()}
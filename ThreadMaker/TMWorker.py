@@ -0,0 +1,261 @@
+# INDEMNITY: By using this software you agree not to sue me for any reason related to the use of this software.
+#
+# Copyright (c) 2022 Kurt Funderburg, all rights not explicitly relinquished in LGPL reserved.
+#
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU Lesser General Public License (LGPL)
+#   as published by the Free Software Foundation; either version 2 of
+#   the License, or (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Library General Public License for more details.
+#
+#   You should have received a copy of the GNU Library General Public
+#   License along with this program; if not, write to the Free Software
+#   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307
+#   USA
+#
+#	Thread geometry worker processes.  Each worker is a FreeCADCmd process running this file, which reads one JSON job
+#	per line on stdin and answers with one "TMW {json}" line on stdout (other FreeCAD console chatter is ignored).
+#	TMWorkerPool keeps N workers busy from a shared job queue.
+#	Job:	{"id": any, "kind": "ThreadExt"|"ThreadInt", "props": [initprops], "engine": "Sweep", "out": path|null,
+#			 "format": "brep"|"step"|"stl", "cache": true}		("spec": threadSpec() dict may replace props and engine)
+#	Result:	{"id", "ok", "potato", "error", "seconds", "cached", "faces", "volume", "out", "retries"}
+#	"stl" writes the analytic TMMesh mesh without running the OCC kernel; faces is then the triangle count.
+#	A TMWorker given a timeout kills a worker that doesn't answer in time, and a memory budget caps each worker's address
+#	space (POSIX only), so one hung or runaway OCC boolean costs one job, not the session or the batch.  isolatedBuild()
+#	is the execute() side of this: ISOLATEPATH Enabled runs the kernel stages in a shared worker within its budgets.
+
+import FreeCAD, Part, os, sys, io, json, time, shutil, tempfile, threading, subprocess, queue
+
+if __name__ == "__main__":		# FreeCADCmd runs this file as a script: make ThreadMaker importable
+	sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ThreadMaker.TMCache as TMCache
+import ThreadMaker.TMMesh as TMMesh
+from ThreadMaker.TMSpec import specFromInitProps, threadDims
+from ThreadMaker.TMKernel import makeThreadBody, threadCacheParams, cachedBody
+from ThreadMaker.TMClasses import INTOBJECTNAME
+
+__title__ = "ThreadMaker: Headless thread geometry worker processes."
+__author__ = "Kurt Funderburg"
+
+BATCHPATH = "User parameter:BaseApp/Macro/ThreadMaker/Batch"		# getParam(BATCHPATH): FreeCADCmd(str) path override, Workers(int)
+ISOLATEPATH = "User parameter:BaseApp/Macro/ThreadMaker/Isolation"	# getParam(ISOLATEPATH): Enabled(bool), TimeoutSeconds(float), MemoryMB(int)
+RESULTTAG = "TMW "
+DEFAULTTIMEOUT = 120.0		# ISOLATEPATH TimeoutSeconds default: seconds an isolated kernel build may take
+
+def runJob(job):
+	""" Build one thread body from job (dict, see module comment), optionally export it, and return a result dict """
+	result = {"id": job.get("id"), "ok": False, "potato": False, "error": "", "seconds": 0.0, "cached": False,
+			"faces": 0, "volume": 0.0, "out": job.get("out"), "retries": []}
+	t0 = time.perf_counter()
+	try:
+		if "spec" in job:	spec = job["spec"]
+		else:				spec = specFromInitProps(job["kind"] == INTOBJECTNAME, job["props"], job.get("engine", "Sweep"))
+		if job.get("format", "brep").lower() == "stl":		# analytic mesh: no sweep, no booleans
+			result["faces"], result["volume"] = TMMesh.threadStl(job.get("out") or os.devnull, spec, threadDims(spec))
+			result["ok"] = True
+			result["seconds"] = time.perf_counter() - t0
+			return result
+		shape = None
+		cachekey = None
+		if job.get("cache", True) and not spec["disable"]:
+			cachekey = TMCache.cacheKey(job["kind"], threadCacheParams(spec))
+			shape = cachedBody(job["kind"], spec)		# or the other hand's body, mirrored
+			result["cached"] = shape is not None
+		if shape is None:
+			shape = makeThreadBody(spec, result["retries"])
+			if cachekey: TMCache.cacheStore(cachekey, shape)
+		result["faces"] = len(shape.Faces)
+		result["volume"] = shape.Volume
+		if job.get("out"):
+			if job.get("format", "brep").lower() == "step":	shape.exportStep(job["out"])
+			else:												shape.exportBrep(job["out"])
+		result["ok"] = True
+	except Exception as err:		# RuntimeError from the kernel, OCC errors from booleans: all are potatoes
+		result["potato"] = True
+		result["error"] = str(err).strip()
+	result["seconds"] = time.perf_counter() - t0
+	return result
+
+def serve():
+	""" Worker main loop: JSON job per stdin line, RESULTTAG + JSON result per stdout line, until EOF or "quit" """
+	stdin = io.open(0, "rb", closefd=False)		# raw fds: FreeCAD may redirect sys.stdin/sys.stdout
+	for line in stdin:
+		line = line.strip()
+		if not line: continue
+		if line == b"quit": break
+		try:
+			job = json.loads(line.decode("utf-8"))
+		except ValueError as err:
+			job = None
+			result = {"id": None, "ok": False, "potato": False, "error": "Bad job line: " + str(err)}
+		if job is not None:	result = runJob(job)
+		os.write(1, (RESULTTAG + json.dumps(result) + "\n").encode("utf-8"))
+
+def freecadCmdPath():
+	""" Path of the console FreeCAD executable used to start workers: BATCHPATH FreeCADCmd, else next to this FreeCAD """
+	path = FreeCAD.ParamGet(BATCHPATH).GetString("FreeCADCmd", "")
+	if path: return path
+	bindir = os.path.join(FreeCAD.getHomePath(), "bin")
+	for name in ("FreeCADCmd", "freecadcmd", "FreeCADCmd.exe"):
+		if os.path.isfile(os.path.join(bindir, name)): return os.path.join(bindir, name)
+	for name in ("FreeCADCmd", "freecadcmd"):
+		if shutil.which(name): return shutil.which(name)
+	raise RuntimeError("TMWorker: FreeCADCmd not found.  Set it in parameter group " + BATCHPATH + "\n")
+
+class TMWorker:		#######################################################
+	""" One FreeCADCmd worker process speaking the job/result line protocol.  timeout: seconds a job may take before
+	the worker is killed (None = no limit).  memorymb: address space limit of the worker process (0 = none, POSIX only). """
+	def __init__(self, cmd=None, timeout=None, memorymb=0):
+		self.cmd = cmd or freecadCmdPath()
+		self.timeout = timeout
+		self.memorymb = memorymb
+		self.proc = None
+
+	def start(self):
+		if self.proc and self.proc.poll() is None: return
+		limit = None
+		if self.memorymb and os.name == "posix":
+			def limit():
+				import resource
+				size = int(self.memorymb) * 1024 * 1024
+				resource.setrlimit(resource.RLIMIT_AS, (size, size))
+		self.proc = subprocess.Popen([self.cmd, os.path.abspath(__file__)], stdin=subprocess.PIPE,
+				stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, preexec_fn=limit)
+
+	def call(self, job):
+		""" Send job, block until its result line or timeout; restarts the worker and reports an error if it died or
+		was killed for taking too long """
+		self.start()
+		proc = self.proc
+		answer = []
+
+		def read():
+			try:
+				for line in proc.stdout:
+					if line.startswith(RESULTTAG.encode("utf-8")):
+						answer.append(json.loads(line[len(RESULTTAG):].decode("utf-8")))
+						return
+			except (OSError, ValueError):
+				pass
+
+		t0 = time.perf_counter()
+		try:
+			proc.stdin.write((json.dumps(job) + "\n").encode("utf-8"))
+			proc.stdin.flush()
+		except OSError:
+			pass
+		reader = threading.Thread(target=read, daemon=True)
+		reader.start()
+		reader.join(self.timeout)
+		if answer: return answer[0]
+		if reader.is_alive():		# hung or pathologically slow: kill it, the next job gets a fresh worker
+			proc.kill()
+			proc.wait()
+			reader.join()
+			self.proc = None
+			error = "Timed out after %gs" % self.timeout
+		else:
+			self.stop()
+			error = "Worker process died"
+			if self.memorymb and os.name == "posix": error += " (memory budget %d MB?)" % self.memorymb
+		return {"id": job.get("id"), "ok": False, "potato": True, "error": error, "seconds": time.perf_counter() - t0,
+				"cached": False, "faces": 0, "volume": 0.0, "out": job.get("out"), "retries": []}
+
+	def cancel(self):
+		""" Kill the worker process from another thread: a call() in progress returns a "died" result """
+		proc = self.proc
+		if proc and proc.poll() is None:	proc.kill()
+
+	def stop(self):
+		if not self.proc: return
+		try:
+			if self.proc.poll() is None:
+				self.proc.stdin.write(b"quit\n")
+				self.proc.stdin.close()
+				self.proc.wait(5)
+		except (OSError, subprocess.TimeoutExpired):
+			self.proc.kill()
+		self.proc = None
+# end class TMWorker
+
+class TMWorkerPool:		#######################################################
+	""" N worker processes fed from one job queue.  workers=0 runs jobs serially in this process (no budgets).
+	timeout and memorymb are the per job budgets of each TMWorker. """
+	def __init__(self, workers=os.cpu_count(), cmd=None, timeout=None, memorymb=0):
+		self.workers = [TMWorker(cmd, timeout, memorymb) for i in range(max(0, workers or 0))]
+
+	def run(self, jobs, progress=None):
+		""" Run all jobs, return results in job order.  progress(result, done, total) is called as each job finishes
+		(from a pool thread). """
+		jobs = list(jobs)
+		results = [None] * len(jobs)
+		if not self.workers:
+			for i, job in enumerate(jobs):
+				results[i] = runJob(job)
+				if progress: progress(results[i], i+1, len(jobs))
+			return results
+		todo = queue.Queue()
+		for i, job in enumerate(jobs): todo.put(i)
+		lock = threading.Lock()
+		done = [0]
+
+		def feed(worker):
+			while True:
+				try:
+					i = todo.get_nowait()
+				except queue.Empty:
+					return
+				results[i] = worker.call(jobs[i])
+				with lock:
+					done[0] += 1
+					if progress: progress(results[i], done[0], len(jobs))
+
+		threads = [threading.Thread(target=feed, args=(w,)) for w in self.workers]
+		for t in threads: t.start()
+		for t in threads: t.join()
+		return results
+
+	def close(self):
+		for w in self.workers: w.stop()
+# end class TMWorkerPool
+
+# ISOLATED EXECUTE ######################################################################
+_isolated = None		# TMWorker shared by isolatedBuild(), started on first use
+
+def isolationEnabled():
+	""" True if the user asked for kernel builds in a child process in ISOLATEPATH """
+	return FreeCAD.ParamGet(ISOLATEPATH).GetBool("Enabled", False)
+
+def isolationBudgets():
+	""" (timeout seconds or None, memory MB or 0) for worker builds from ISOLATEPATH; no limits unless it is Enabled """
+	if not isolationEnabled(): return None, 0
+	param = FreeCAD.ParamGet(ISOLATEPATH)
+	return param.GetFloat("TimeoutSeconds", DEFAULTTIMEOUT) or None, param.GetInt("MemoryMB", 0)
+
+def isolatedBuild(kind, spec):
+	""" Build the finished, unplaced body of spec (threadSpec() dict) in a worker process within the ISOLATEPATH budgets,
+	going through the shape cache.  Returns (shape, "", retries) or (None, reason, retries) if it failed, timed out or ran out
+	of memory; retries are the worker's retry ladder attempts (TMKernel.attemptText() lines). """
+	global _isolated
+	timeout, memorymb = isolationBudgets()
+	if _isolated is None or (_isolated.timeout, _isolated.memorymb) != (timeout, memorymb):
+		if _isolated: _isolated.stop()
+		_isolated = TMWorker(None, timeout, memorymb)
+	fd, out = tempfile.mkstemp(prefix="TMIsolated", suffix=TMCache.CACHEEXT)
+	os.close(fd)
+	try:
+		result = _isolated.call({"id": kind, "kind": kind, "spec": spec, "out": out})
+		if not result["ok"]: return None, result["error"], result.get("retries", [])
+		shape = Part.Shape()
+		shape.importBrep(out)
+		return shape, "", result["retries"]
+	finally:
+		os.remove(out)
+
+if __name__ == "__main__":
+	serve()
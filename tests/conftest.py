@@ -0,0 +1,4 @@
+# Tests import the macro package as ThreadMaker.<module>, as FreeCAD does from the macro folder.
+import os, sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
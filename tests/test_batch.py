@@ -0,0 +1,57 @@
+# TMBatch spec list parsing: CSV rows to initprops (blank numbers, bool spellings, optional name and engine columns),
+# missing CSV columns, JSON checks and output file names.  Needs FreeCAD to import TMBatch; no geometry is built.
+
+import json
+import pytest
+
+FreeCAD = pytest.importorskip("FreeCAD")
+pytest.importorskip("Part")
+from ThreadMaker.TMBatch import CSVCOLUMNS, loadSpecs, specName
+
+HEADER = ",".join(CSVCOLUMNS)
+
+def write(tmp_path, name, text):
+	path = tmp_path / name
+	path.write_text(text)
+	return str(path)
+
+def test_csv_row_to_initprops(tmp_path):
+	path = write(tmp_path, "specs.csv", HEADER + "\n"
+			+ "ThreadExt,ISO,M8,,1.25,10,,,yes,0,false,TRUE,6g,6g\n"
+			+ "ThreadInt,Custom,M10,10.2,1.5,12.5,0,0.05,1,t,n,y,6H,6H\n")
+	specs = loadSpecs(path)
+	assert specs[0] == {"kind": "ThreadExt", "name": None, "engine": "Sweep",
+			"props": ["ISO", "M8", 0.0, 1.25, 10.0, 0.0, 0.0, True, False, False, True, "6g", "6g"]}
+	assert specs[1]["props"] == ["Custom", "M10", 10.2, 1.5, 12.5, 0.0, 0.05, True, True, False, True, "6H", "6H"]
+
+def test_csv_optional_columns(tmp_path):
+	path = write(tmp_path, "specs.CSV", HEADER + ",name,engine\n"
+			+ "ThreadExt,ISO,M8,,1.25,10,,,0,0,0,0,6g,6g,bolt,Tiled\n"
+			+ "ThreadExt,ISO,M8,,1.25,10,,,0,0,0,0,6g,6g,,\n")
+	specs = loadSpecs(path)
+	assert (specs[0]["name"], specs[0]["engine"]) == ("bolt", "Tiled")
+	assert (specs[1]["name"], specs[1]["engine"]) == (None, "Sweep")
+
+def test_csv_missing_columns(tmp_path):
+	path = write(tmp_path, "specs.csv", ",".join(c for c in CSVCOLUMNS if c not in ("lefty", "cresttol")) + "\n")
+	with pytest.raises(ValueError, match="lefty, cresttol"):
+		loadSpecs(path)
+
+def test_csv_bad_number(tmp_path):
+	path = write(tmp_path, "specs.csv", HEADER + "\nThreadExt,ISO,M8,,,10,,,0,0,0,0,6g,6g\n")		# no pitch
+	with pytest.raises(ValueError):
+		loadSpecs(path)
+
+def test_json_checks(tmp_path):
+	good = {"kind": "ThreadExt", "props": ["ISO", "M8", 0, 1.25, 10, 0, 0, False, False, False, True, "6g", "6g"]}
+	assert loadSpecs(write(tmp_path, "good.json", json.dumps([good]))) == [good]
+	for bad in (dict(good, kind="Bolt"), dict(good, props=good["props"][:12])):
+		with pytest.raises(ValueError):
+			loadSpecs(write(tmp_path, "bad.json", json.dumps([bad])))
+
+def test_spec_names():
+	props = ["ISO", "M8", 0, 1.25, 10, 0, 0, False, True, False, True, "6g", "6g"]
+	assert specName(3, {"kind": "ThreadExt", "props": props}) == "0003_ThreadExt_M8x1.25x10_L"
+	custom = ["Custom", "M8", 8.2, 1.0, 6, 0, 0, False, False, False, True, "6g", "6g"]
+	assert specName(0, {"kind": "ThreadInt", "props": custom}) == "0000_ThreadInt_8.2x1x6"
+	assert specName(0, {"kind": "ThreadExt", "props": props, "name": "my bolt/1"}) == "my_bolt_1"
@@ -0,0 +1,69 @@
+# TMCache pure logic: cacheKey canonicalization and GEOMVERSION invalidation, and LRU eviction by size in a scratch
+# cache folder.  Needs FreeCAD (ParamGet), but no geometry is built.
+
+import os
+import pytest
+
+FreeCAD = pytest.importorskip("FreeCAD")
+pytest.importorskip("Part")
+from ThreadMaker import TMCache
+from ThreadMaker.TMSpec import ThreadSpec
+from ThreadMaker.TMKernel import threadCacheParams
+
+PARAMS = ["ISO", 8.0, 1.25, 10.0, 0.0, 0.0, False, False, True, "6g", "6g", "Sweep", 1.0, 1.0, 0.0]
+
+@pytest.fixture
+def folder(tmp_path):
+	""" Point the cache at an empty scratch folder, enabled, and restore the user's settings afterwards """
+	param = FreeCAD.ParamGet(TMCache.CACHEPATH)
+	saved = param.GetString("Folder", ""), param.GetBool("Enabled", True)
+	param.SetString("Folder", str(tmp_path))
+	param.SetBool("Enabled", True)
+	yield tmp_path
+	param.SetString("Folder", saved[0])
+	param.SetBool("Enabled", saved[1])
+
+def entry(folder, name, size, mtime):
+	path = os.path.join(str(folder), name + TMCache.CACHEEXT)
+	with open(path, "wb") as f:	f.write(b"x" * size)
+	os.utime(path, (mtime, mtime))
+	return path
+
+def test_key_rounds_floats():
+	key = TMCache.cacheKey("ThreadExt", PARAMS)
+	assert TMCache.cacheKey("ThreadExt", [p + 1e-12 if type(p) is float else p for p in PARAMS]) == key	# Quantity round trip
+	assert TMCache.cacheKey("ThreadExt", [8 if p == 8.0 and type(p) is float else p for p in PARAMS]) == key	# int or float
+	assert TMCache.cacheKey("ThreadExt", PARAMS[:1] + [8.001] + PARAMS[2:]) != key
+
+def test_key_keeps_bools_and_type_apart():
+	key = TMCache.cacheKey("ThreadExt", PARAMS)
+	assert TMCache.cacheKey("ThreadInsert", PARAMS) != key
+	assert TMCache.cacheKey("ThreadExt", PARAMS[:6] + [True] + PARAMS[7:]) != key		# Chamfer
+	assert TMCache.cacheKey("ThreadExt", PARAMS[:6] + [0.0] + PARAMS[7:]) != key		# False is not 0
+
+def test_key_ignores_spec_dict_order():
+	spec = ThreadSpec(diameter=8.0, pitch=1.25, length=10.0).asDict()
+	shuffled = dict(reversed(list(spec.items())))
+	assert TMCache.cacheKey("ThreadExt", threadCacheParams(shuffled)) == TMCache.cacheKey("ThreadExt", threadCacheParams(spec))
+
+def test_geomversion_invalidates(monkeypatch):
+	key = TMCache.cacheKey("ThreadExt", PARAMS)
+	monkeypatch.setattr(TMCache, "GEOMVERSION", TMCache.GEOMVERSION + ".x")
+	assert TMCache.cacheKey("ThreadExt", PARAMS) != key
+
+def test_evict_oldest_first(folder):
+	paths = [entry(folder, "k%d" % i, 1000, 1000000 + i) for i in range(5)]		# k0 least recently used
+	TMCache.cacheEvict(2500)
+	assert [os.path.isfile(p) for p in paths] == [False, False, False, True, True]
+
+def test_evict_under_limit_keeps_all(folder):
+	paths = [entry(folder, "k%d" % i, 1000, 1000000 + i) for i in range(3)]
+	other = os.path.join(str(folder), "notes.txt")
+	with open(other, "w") as f:	f.write("x" * 10000)		# not a cache entry: neither counted nor removed
+	TMCache.cacheEvict(3000)
+	assert all(os.path.isfile(p) for p in paths + [other])
+
+def test_clear(folder):
+	entry(folder, "k0", 10, 1000000)
+	TMCache.cacheClear()
+	assert not TMCache.cacheHas("k0")
@@ -0,0 +1,42 @@
+# TMMesh: the analytic thread mesh must be a closed, consistently oriented 2-manifold with positive volume.
+
+import numpy
+import pytest
+from ThreadMaker.TMSpec import ThreadSpec
+from ThreadMaker.TMMesh import threadTriangles
+
+CASES = {		# name : ThreadSpec fields
+	"external": dict(standard="ISO 261 Metric", diameter=7.974, pitch=1.25, length=12.0, tolpitch="6g", tolcrest="6g"),
+	"internal": dict(internal=True, standard="ISO 261 Metric", diameter=8.0, pitch=1.25, length=12.0, tolpitch="6H", tolcrest="6H"),
+	"lefty": dict(diameter=10.0, pitch=1.5, length=10.0, lefty=True),
+	"lefty internal": dict(internal=True, diameter=10.0, pitch=1.5, length=10.0, lefty=True),
+	"taper": dict(diameter=12.0, pitch=1.5, length=15.0, taper=1.79),
+	"taper internal": dict(internal=True, diameter=12.0, pitch=1.5, length=15.0, taper=1.79),
+	"chamfer": dict(diameter=8.0, pitch=1.25, length=10.0, chamfer=True),
+	"round root": dict(diameter=8.0, pitch=1.25, length=10.0, roundroot=True),
+	"flat root internal": dict(internal=True, diameter=8.0, pitch=1.25, length=10.0, roundroot=False),
+	"disabled": dict(diameter=8.0, pitch=1.25, length=10.0, disable=True),
+	"disabled internal": dict(internal=True, diameter=8.0, pitch=1.25, length=10.0, disable=True),
+	"fractional length": dict(diameter=6.0, pitch=1.0, length=7.3)}
+
+def mesh(fields):
+	spec = ThreadSpec(**fields)
+	return numpy.concatenate(list(threadTriangles(spec, spec.dims(), tolerance=0.05)))
+
+@pytest.mark.parametrize("name", sorted(CASES))
+def test_closed_manifold(name):
+	tris = mesh(CASES[name])
+	points, index = numpy.unique(numpy.round(tris.reshape(-1, 3), 9), axis=0, return_inverse=True)
+	index = index.reshape(-1, 3)
+	assert (index[:, 0] != index[:, 1]).all() and (index[:, 1] != index[:, 2]).all() and (index[:, 2] != index[:, 0]).all()
+	directed = numpy.concatenate([index[:, [0, 1]], index[:, [1, 2]], index[:, [2, 0]]])
+	edges, counts = numpy.unique(directed, axis=0, return_counts=True)
+	assert (counts == 1).all(), "edge used twice in the same direction: inconsistent orientation or non-manifold"
+	reverse = set(map(tuple, edges[:, ::-1].tolist()))
+	assert all(edge in reverse for edge in map(tuple, edges.tolist())), "edge without its opposite: mesh not closed"
+
+@pytest.mark.parametrize("name", sorted(CASES))
+def test_positive_volume(name):
+	tris = mesh(CASES[name])
+	volume = numpy.einsum("ij,ij->", tris[:, 0], numpy.cross(tris[:, 1], tris[:, 2])) / 6
+	assert volume > 0
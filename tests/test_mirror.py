@@ -0,0 +1,47 @@
+# TMKernel.mirrorHand: a body of one hand mirrored by cachedBody(), or built from the memo's mirrored sweep of the other
+# hand, is the body a fresh build of its own hand gives (same volume, and their common is all of it).  Needs FreeCAD.
+
+import pytest
+
+FreeCAD = pytest.importorskip("FreeCAD")
+Part = pytest.importorskip("Part")
+from ThreadMaker.TMSpec import ThreadSpec
+from ThreadMaker.TMKernel import TRIMANGLE, mirrorHand, makeThreadBody, sweepMemoClear
+
+RELTOL = 1e-5		# volumes: relative
+CASES = {		# name : ThreadSpec fields
+	"external": dict(diameter=8.0, pitch=1.25, length=10.0),
+	"internal": dict(internal=True, diameter=8.0, pitch=1.25, length=10.0),
+	"chamfer": dict(diameter=10.0, pitch=1.5, length=12.0, chamfer=True),
+	"round root": dict(internal=True, diameter=10.0, pitch=1.5, length=12.0, roundroot=True),
+	"tapered": dict(diameter=12.0, pitch=1.5, length=12.0, taper=1.79),
+	"tiled": dict(diameter=8.0, pitch=1.25, length=10.0, engine="Tiled"),
+	"direct": dict(diameter=8.0, pitch=1.25, length=10.0, engine="Direct")}
+
+def fresh(fields, lefty):
+	""" Body of one hand built without any memoized sweep """
+	sweepMemoClear()
+	return makeThreadBody(ThreadSpec(**dict(fields, lefty=lefty)).asDict())
+
+def assertSame(body, expect):
+	assert body.isValid()
+	assert body.Volume == pytest.approx(expect.Volume, rel=RELTOL)
+	assert body.common(expect).Volume == pytest.approx(expect.Volume, rel=RELTOL)
+
+@pytest.mark.parametrize("name", sorted(CASES))
+@pytest.mark.parametrize("lefty", [False, True])
+def test_mirrored_body_is_fresh_other_hand(name, lefty):
+	assertSame(mirrorHand(fresh(CASES[name], lefty), TRIMANGLE), fresh(CASES[name], not lefty))
+
+@pytest.mark.parametrize("name", ["external", "internal", "tapered"])
+def test_body_from_mirrored_memo_sweep(name):
+	expect = fresh(CASES[name], True)
+	sweepMemoClear()
+	makeThreadBody(ThreadSpec(**dict(CASES[name], lefty=False)).asDict())		# leaves the right-hand sweep in the memo
+	assertSame(makeThreadBody(ThreadSpec(**dict(CASES[name], lefty=True)).asDict()), expect)
+	sweepMemoClear()
+
+def test_unturned_mirror_is_off_phase():
+	body = fresh(CASES["external"], False)
+	expect = fresh(CASES["external"], True)
+	assert mirrorHand(body, 0.0).common(expect).Volume < expect.Volume * (1 - 1e-3)
@@ -0,0 +1,63 @@
+# TMThreadBody after reopening a document: no stage results are saved, so a touch or forced recompute must rebuild
+# the body from the first stage instead of skipping the execute.  Needs FreeCAD.
+
+import pytest
+
+FreeCAD = pytest.importorskip("FreeCAD")
+pytest.importorskip("Part")
+from ThreadMaker.TMClasses import TMThreadShaft
+from ThreadMaker import TMCache, TMPersist
+
+SPECS = ["Custom", "M8", 8.0, 1.25, 10.0, 0.0, 0.0, False, False, False, False, "6g", "6g"]
+
+def reopened(tmp_path, prepare=None):
+	""" Thread object of a saved and reopened document; prepare(obj) runs just before saving """
+	doc = FreeCAD.newDocument("TMRestore")
+	obj = doc.addObject("Part::FeaturePython", "ThreadExt")
+	TMThreadShaft(obj, SPECS)
+	doc.recompute()
+	if prepare: prepare(obj)
+	path = str(tmp_path / "restore.FCStd")
+	doc.saveAs(path)
+	FreeCAD.closeDocument(doc.Name)
+	doc = FreeCAD.openDocument(path)
+	return doc.getObject("ThreadExt")
+
+def test_touch_rebuilds_after_reopen(tmp_path):
+	obj = reopened(tmp_path)
+	volume = obj.Shape.Volume
+	assert obj.Proxy.stages is None
+	obj.touch()
+	obj.Document.recompute()
+	assert obj.Proxy.stages		# ran every stage again
+	assert obj.Shape.Volume == pytest.approx(volume)
+	FreeCAD.closeDocument(obj.Document.Name)
+
+def test_pending_placeholder_rebuilds_after_reopen(tmp_path):
+	def pending(obj):		# as saved while TMBackground was still building the body behind the plain shaft
+		obj.Proxy.pending = True
+		obj.Shape = obj.Proxy.stages["shaft"][2]
+	obj = reopened(tmp_path, pending)
+	assert obj.Proxy.pending
+	assert "Touched" in obj.State		# Ctrl+R picks it up
+	obj.Document.recompute()
+	assert not obj.Proxy.pending
+	assert obj.Proxy.stages["base"]
+	assert obj.Shape.Volume == pytest.approx(obj.Proxy.stages["base"].Volume)
+	FreeCAD.closeDocument(obj.Document.Name)
+
+def test_params_only_shape_loads_headless(tmp_path):		# FreeCADCmd: nothing is deferred, export sees the body
+	persist, cache = FreeCAD.ParamGet(TMPersist.PERSISTPATH), FreeCAD.ParamGet(TMCache.CACHEPATH)
+	saved = persist.GetBool("ParamsOnly", False), cache.GetString("Folder", ""), cache.GetBool("Enabled", True)
+	persist.SetBool("ParamsOnly", True)
+	cache.SetString("Folder", str(tmp_path / "cache"))
+	cache.SetBool("Enabled", True)
+	try:
+		obj = reopened(tmp_path, lambda obj: setattr(obj, "Visibility", False))		# hidden: deferred in the GUI
+		assert obj.ShapeKey and not obj.Shape.isNull()
+		assert "Touched" not in obj.State
+		FreeCAD.closeDocument(obj.Document.Name)
+	finally:
+		persist.SetBool("ParamsOnly", saved[0])
+		cache.SetString("Folder", saved[1])
+		cache.SetBool("Enabled", saved[2])
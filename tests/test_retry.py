@@ -0,0 +1,61 @@
+# TMKernel.retryStage: the default attempt and each RETRYLADDER rung, with stand-in stage builds that fail, return an
+# invalid shape, or succeed on a chosen rung.  Needs FreeCAD (Part).
+
+import pytest
+
+FreeCAD = pytest.importorskip("FreeCAD")
+Part = pytest.importorskip("Part")
+from ThreadMaker.TMKernel import RETRYLADDER, TUNEDEFAULT, retryStage, attemptText
+
+def valid():
+	return Part.makeBox(1, 1, 1)
+
+def invalid():
+	return Part.Shape()		# null shape: isValid() is False
+
+def ladder(stage, good):
+	""" Stage build that fails until the tune of rung index good (-1 = default) and records the tunes it got """
+	tunes = []
+	def build(tune):
+		tunes.append(tune)
+		if len(tunes) - 2 < good:	raise RuntimeError("failed %d" % len(tunes))
+		return valid()
+	return build, tunes
+
+def test_default_ok():
+	build, tunes = ladder("cut", -1)
+	result, attempts = retryStage("cut", build)
+	assert result.isValid() and attempts == [] and tunes == [TUNEDEFAULT]
+
+@pytest.mark.parametrize("stage", sorted(RETRYLADDER))
+def test_rungs_in_order(stage):
+	good = len(RETRYLADDER[stage]) - 1
+	build, tunes = ladder(stage, good)
+	result, attempts = retryStage(stage, build)
+	assert result.isValid()
+	assert tunes == [TUNEDEFAULT] + [dict(TUNEDEFAULT, **rung) for rung in RETRYLADDER[stage]]
+	assert [rung for rung, seconds, error in attempts] == [{}] + list(RETRYLADDER[stage])
+	assert [bool(error) for rung, seconds, error in attempts] == [True] * (good + 1) + [False]
+
+def test_invalid_default_runs_ladder():
+	shapes = [invalid(), valid()]
+	result, attempts = retryStage("cut", lambda tune: shapes.pop(0))
+	assert result.isValid()
+	assert attempts[0][2] == "Invalid cut result." and attempts[1][0] == RETRYLADDER["cut"][0]
+
+def test_none_is_accepted():		# DisableThrd: the sweep stage returns no thread
+	assert retryStage("sweep", lambda tune: None) == (None, [])
+
+def test_all_fail_raises_first_error():
+	def build(tune):
+		raise RuntimeError("boom" if tune is TUNEDEFAULT else "again")
+	with pytest.raises(RuntimeError, match="boom") as err:
+		retryStage("trim", build)
+	assert len(err.value.attempts) == 1 + len(RETRYLADDER["trim"])
+	lines = attemptText("trim", err.value.attempts)
+	assert lines[0].startswith("trim default ") and lines[0].endswith(" boom")
+	assert lines[1].startswith("trim seam=23.0 ")
+
+def test_stage_without_ladder():
+	with pytest.raises(RuntimeError):
+		retryStage("shaft", lambda tune: invalid())
@@ -0,0 +1,57 @@
+# TMSpec: dimsArrays() over a ThreadSpecArray gives threadDims() of every row; ThreadSpec reads like a threadSpec() dict.
+
+import itertools
+import numpy
+import pytest
+import ThreadMaker.TMStandards as TMStandards
+from ThreadMaker.TMSpec import SPECFIELDS, DIMFIELDS, ThreadSpec, ThreadSpecArray, threadDims, dimsArrays, specFromInitProps
+
+TOL = 1e-12
+
+def specGrid():
+	""" Standard sizes in every class pairing of both kinds, plus custom threads with clearance and taper """
+	specs = []
+	table = TMStandards.standard("ISO 261 Metric")
+	for size in ("M1", "M3", "M8", "M24", "M64"):
+		for internal, pitchtol, cresttol in ((False, "4h", "6g"), (False, "6g", "6g"), (False, "8e", "8e"),
+				(True, "4H", "5H"), (True, "6H", "6H"), (True, "8G", "7G")):
+			for pitch in table[size]:
+				props = ["ISO 261 Metric", size, 0, float(pitch), 20.0, 0.0, 0.05, False, False, False, True, pitchtol, cresttol]
+				specs.append(specFromInitProps(internal, props))
+	for internal, diameter, pitch, taper, clearance in itertools.product((False, True), (4.0, 12.5), (0.7, 1.5),
+			(0.0, 1.79, -3.0), (0.0, 0.1)):
+		specs.append(ThreadSpec(internal=internal, diameter=diameter, pitch=pitch, length=15.0, taper=taper, clearance=clearance).asDict())
+	return specs
+
+def test_dims_arrays_match_thread_dims():
+	specs = specGrid()
+	dims = dimsArrays(ThreadSpecArray.fromSpecs(specs))
+	for field in DIMFIELDS:
+		expect = numpy.array([threadDims(spec)[field] for spec in specs])
+		assert numpy.abs(dims[field] - expect).max() < TOL, field
+
+def test_spec_array_rows_round_trip():
+	specs = specGrid()
+	array = ThreadSpecArray.fromSpecs(specs)
+	assert len(array) == len(specs)
+	for i in (0, len(specs) // 2, len(specs) - 1):
+		assert array[i] == ThreadSpec.fromDict(specs[i])
+		assert array[i].dims() == pytest.approx(threadDims(specs[i]))
+
+def test_broadcast_columns():
+	array = ThreadSpecArray(diameter=[6.0, 8.0, 10.0], pitch=1.0)
+	assert len(array) == 3
+	dims = array.dims()
+	assert dims["majordiameter"].tolist() == [6.0, 8.0, 10.0]
+
+def test_thread_spec_reads_like_dict():
+	spec = ThreadSpec(diameter=8.0, pitch=1.25)
+	assert list(dict(spec)) == list(SPECFIELDS)
+	assert spec["pitch"] == 1.25
+	with pytest.raises(KeyError):	spec["nosuchfield"]
+	with pytest.raises(TypeError):	ThreadSpec(nosuchfield=1)
+
+def test_bad_pitch_gives_nan_not_error():
+	dims = dimsArrays(ThreadSpecArray(standard="ISO 261 Metric", diameter=[8.0, 8.0], pitch=[1.25, 0.0],
+			tolpitch="6g", tolcrest="6g"))
+	assert numpy.isfinite(dims["diameter"][0]) and not numpy.isfinite(dims["crestdev"][1])
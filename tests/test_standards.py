@@ -0,0 +1,132 @@
+# TMStandards: the ISO 261 table loaded from Standards/ISO261.txt is the 1.1 built-in ISO261PDTABLE, in the same order,
+# and the registry lookups work on it.
+
+import ThreadMaker.TMStandards as TMStandards
+
+ISO261PDTABLE11 = {		# 1.1 built-in table, as it was at the end of TMClasses.py  
+'M1':['0.25','0.2'],
+'M1.1':['0.25','0.2'],
+'M1.2':['0.25','0.2'],
+'M1.4':['0.3','0.2'],
+'M1.6':['0.35','0.2'],
+'M1.8':['0.35','0.2'],
+'M2':['0.4','0.25','0.2'],
+'M2.2':['0.45','0.25','0.2'],
+'M2.5':['0.45','0.35','0.25','0.2'],
+'M3':['0.5','0.35','0.25','0.2'],
+'M3.5':['0.6','0.35','0.25','0.2'],
+'M4':['0.7','0.5','0.35','0.25'],
+'M4.5':['0.75','0.5','0.35','0.25'],
+'M5':['0.8','0.5','0.35','0.25'],
+'M5.5':['0.8','0.5','0.35','0.25'],
+'M6':['1.0','0.75','0.5','0.35','0.25'],
+'M7':['1.0','0.75','0.5','0.35','0.25'],
+'M8':['1.25','1.0','0.75','0.5','0.35','0.25'],
+'M9':['1.25','1.0','0.75','0.5','0.35','0.25'],
+'M10':['1.5','1.25','1.0','0.75','0.5','0.35'],
+'M11':['1.5','1.0','0.75','0.5','0.35'],
+'M12':['1.75','1.5','1.25','1.0','0.75','0.5'],
+'M14':['2.0','1.5','1.25','1.0','0.75','0.5'],
+'M15':['2.0','1.5','1.0','0.75','0.5'],
+'M16':['2.0','1.5','1.0','0.75','0.5'],
+'M17':['2.0','1.5','1.0','0.75','0.5'],
+'M18':['2.5','2.0','1.5','1.0','0.75','0.5'],
+'M20':['2.5','2.0','1.5','1.0','0.75','0.5'],
+'M22':['2.5','2.0','1.5','1.0','0.75','0.5'],
+'M24':['3.0','2.0','1.5','1.0','0.75'],
+'M25':['3.0','2.0','1.5','1.0','0.75'],
+'M26':['3.0','1.5','1.0','0.75'],
+'M27':['3.0','2.0','1.5','1.0','0.75'],
+'M28':['3.0','2.0','1.5','1.0','0.75'],
+'M30':['3.5','3.0','2.0','1.5','1.0','0.75'],
+'M32':['3.5','2.0','1.5','1.0','0.75'],
+'M33':['3.5','3.0','2.0','1.5','0.75'],
+'M35':['3.5','1.5','1.0'],
+'M36':['4.0','3.0','2.0','1.5','1.0'],
+'M38':['4.0','1.5','1.0'],
+'M39':['4.0','3.0','2.0','1.5','1.0'],
+'M40':['4.0','3.0','2.0','1.5','1.0'],
+'M42':['4.5','4.0','3.0','2.0','1.5','1.0'],
+'M45':['4.5','4.0','3.0','2.0','1.5','1.0'],
+'M48':['5.0','4.0','3.0','2.0','1.5','1.0'],
+'M50':['5.0','4.0','3.0','2.0','1.5','1.0'],
+'M52':['5.0','4.0','3.0','2.0','1.5','1.0'],
+'M55':['5.0','4.0','3.0','2.0','1.5','1.0'],
+'M56':['5.5','4.0','3.0','2.0','1.5','1.0'],
+'M58':['5.5','4.0','3.0','2.0','1.5','1.0'],
+'M60':['5.5','4.0','3.0','2.0','1.5','1.0'],
+'M62':['5.5','4.0','3.0','2.0','1.5','1.0'],
+'M64':['6.0','4.0','3.0','2.0','1.5','1.0'],
+'M65':['6.0','4.0','3.0','2.0','1.5','1.0'],
+'M68':['6.0','4.0','3.0','2.0','1.5','1.0'],
+'M70':['6.0','4.0','3.0','2.0','1.5','1.0'],
+'M72':['6.0','4.0','3.0','2.0','1.5','1.0'],
+'M75':['6.0','4.0','3.0','2.0','1.5','1.0'],
+'M76':['6.0','4.0','3.0','2.0','1.5','1.0'],
+'M78':['6.0','2.0','1.5','1.0'],
+'M80':['6.0','4.0','3.0','2.0','1.5','1.0'],
+'M82':['6.0','2.0','1.5'],
+'M85':['6.0','4.0','3.0','2.0','1.5'],
+'M90':['6.0','4.0','3.0','2.0','1.5'],
+'M95':['6.0','4.0','3.0','2.0','1.5'],
+'M100':['6.0','4.0','3.0','2.0','1.5'],
+'M105':['6.0','4.0','3.0','2.0','1.5'],
+'M110':['6.0','4.0','3.0','2.0','1.5'],
+'M115':['6.0','4.0','3.0','2.0','1.5'],
+'M120':['6.0','4.0','3.0','2.0','1.5'],
+'M125':['8.0','6.0','4.0','3.0','2.0','1.5'],
+'M130':['8.0','6.0','4.0','3.0','2.0','1.5'],
+'M135':['8.0','6.0','4.0','3.0','2.0','1.5'],
+'M140':['8.0','6.0','4.0','3.0','2.0','1.5'],
+'M145':['8.0','6.0','4.0','3.0','2.0','1.5'],
+'M150':['8.0','6.0','4.0','3.0','2.0','1.5'],
+'M155':['8.0','6.0','4.0','3.0','2.0'],
+'M160':['8.0','6.0','4.0','3.0','2.0'],
+'M165':['8.0','6.0','4.0','3.0','2.0'],
+'M170':['8.0','6.0','4.0','3.0','2.0'],
+'M175':['8.0','6.0','4.0','3.0','2.0'],
+'M180':['8.0','6.0','4.0','3.0','2.0'],
+'M185':['8.0','6.0','4.0','3.0','2.0'],
+'M190':['8.0','6.0','4.0','3.0','2.0'],
+'M195':['8.0','6.0','4.0','3.0','2.0'],
+'M200':['8.0','6.0','4.0','3.0','2.0'],
+'M205':['8.0','6.0','4.0','3.0'],
+'M210':['8.0','6.0','4.0','3.0'],
+'M215':['8.0','6.0','4.0','3.0'],
+'M220':['8.0','6.0','4.0','3.0'],
+'M225':['8.0','6.0','4.0','3.0'],
+'M230':['8.0','6.0','4.0','3.0'],
+'M235':['8.0','6.0','4.0','3.0'],
+'M240':['8.0','6.0','4.0','3.0'],
+'M245':['8.0','6.0','4.0','3.0'],
+'M250':['8.0','6.0','4.0','3.0'],
+'M255':['8.0','6.0','4.0','3.0'],
+'M260':['8.0','6.0','4.0','3.0'],
+'M265':['8.0','6.0','4.0','3.0'],
+'M270':['8.0','6.0','4.0','3.0'],
+'M275':['8.0','6.0','4.0','3.0'],
+'M280':['8.0','6.0','4.0','3.0'],
+'M285':['8.0','6.0','4.0','3.0'],
+'M290':['8.0','6.0','4.0','3.0'],
+'M295':['8.0','6.0','4.0','3.0'],
+'M300':['8.0','6.0','4.0','3.0'] }
+
+
+def test_iso261_equals_builtin_table():
+	table = TMStandards.standard("ISO 261 Metric")
+	assert len(table) == len(ISO261PDTABLE11) == 106
+	assert list(table) == list(ISO261PDTABLE11)		# dialog popup order
+	assert {size: list(table[size]) for size in table} == ISO261PDTABLE11
+
+def test_registry():
+	standards = TMStandards.supportedStandards()
+	assert list(standards)[:2] == [TMStandards.CUSTOM, "ISO 261 Metric"]
+	assert standards["ISO 261 Metric"] == 0.0
+
+def test_lookups():
+	table = TMStandards.standard("ISO 261 Metric")
+	assert table.sizeIndex("M10") == list(ISO261PDTABLE11).index("M10")
+	assert table.coarsePitch("M8") == "1.25" and table.finePitches("M8") == ["1.0", "0.75", "0.5", "0.35", "0.25"]
+	assert table.isCoarse("M12", 1.75) and not table.isCoarse("M12", "1.5")
+	assert table.nearestSize(7.9) == "M8" and table.nearestSize(0.1) == "M1" and table.nearestSize(1000) == "M300"
+	assert "M8" in table and "M8.5" not in table
@@ -0,0 +1,123 @@
+# TMTolerance: table-driven and numpy ISO 965 deviations against the 1.1 if-chain formulas, over every ISO 261 size,
+# pitch and tolerance class.
+
+import numpy
+import pytest
+import ThreadMaker.TMStandards as TMStandards
+from ThreadMaker.TMTolerance import ISO965EXTPITCHTOL, ISO965EXTCRESTTOL, ISO965INTPITCHTOL, ISO965INTCRESTTOL, \
+		iso965ExtPitchDev, iso965IntPitchDev, iso965ExtCrestDev, iso965IntCrestDev, pitchDevArray, crestDevArray, \
+		limitsArrays, fitTable
+
+TOL = 1e-12		# mm; numpy and Python may round powers differently in the last bit
+
+# 1.1 formulas, as they were in TMClasses.py ################################
+def legacyExtPitchDev(nomdiameter, pitch, pitchtol):
+	fd = 0.0
+	td = 0.0
+	if  pitchtol[1] == "e":	fd = (50 + 11 * pitch) / 1000
+	if  pitchtol[1] == "f":	fd = (30 + 11 * pitch) / 1000
+	if  pitchtol[1] == "g":	fd = (15 + 11 * pitch) / 1000
+	if  pitchtol[1] == "h":	fd = 0
+	td6 = 90 * pitch**0.4 * nomdiameter**0.1 / 1000
+	if  pitchtol[0] == "3":	td = 0.5 * td6
+	if  pitchtol[0] == "4":	td = 0.63 * td6
+	if  pitchtol[0] == "5":	td = 0.8 * td6
+	if  pitchtol[0] == "6":	td = td6
+	if  pitchtol[0] == "7":	td = 1.25 * td6
+	if  pitchtol[0] == "8":	td = 1.6 * td6
+	if  pitchtol[0] == "9":	td = 2.0 * td6
+	return fd + td
+
+def legacyIntPitchDev(nomdiameter, pitch, pitchtol):
+	fd = 0.0
+	td = 0.0
+	if  pitchtol[1] == "G":	fd = (15 + 11 * pitch) / 1000
+	if  pitchtol[1] == "H":	fd = 0
+	td6 = 90 * pitch**0.4 * nomdiameter**0.1 / 1000
+	if  pitchtol[0] == "4":	td = 0.85 * td6
+	if  pitchtol[0] == "5":	td = 1.06 * td6
+	if  pitchtol[0] == "6":	td = 1.32 * td6
+	if  pitchtol[0] == "7":	td = 1.7 * td6
+	if  pitchtol[0] == "8":	td = 2.12 * td6
+	return fd + td
+
+def legacyExtCrestDev(pitch, cresttol):
+	fd = 0.0
+	td = 0.0
+	if  cresttol[1] == "e":	fd = (50 + 11 * pitch) / 1000
+	if  cresttol[1] == "f":	fd = (30 + 11 * pitch) / 1000
+	if  cresttol[1] == "g":	fd = (15 + 11 * pitch) / 1000
+	if  cresttol[1] == "h":	fd = 0
+	td6 = (180 * pitch**(2/3) - 3.15/pitch**(1/2)) / 1000
+	if  cresttol[0] == "4":	td = 0.63 * td6
+	if  cresttol[0] == "6":	td = td6
+	if  cresttol[0] == "8":	td = 1.6 * td6
+	return fd + td
+
+def legacyIntCrestDev(pitch, cresttol):
+	fd = 0.0
+	td = 0.0
+	if  cresttol[1] == "G":	fd = (15 + 11 * pitch) / 1000
+	if  cresttol[1] == "H":	fd = 0
+	if pitch >= 1.0: 	td6 = 230 * pitch**0.7 / 1000
+	else: 			td6 = (433 * pitch - 190 * pitch**1.22) / 1000
+	if  cresttol[0] == "4":	td = 0.63 * td6
+	if  cresttol[0] == "5":	td = 0.8 * td6
+	if  cresttol[0] == "6":	td = td6
+	if  cresttol[0] == "7":	td = 1.25 * td6
+	if  cresttol[0] == "8":	td = 1.6 * td6
+	return fd + td
+# end 1.1 formulas ##########################################################
+
+ROWS = [(float(size[1:]), float(p)) for size, pitches in TMStandards.standard("ISO 261 Metric").items() for p in pitches]
+
+def test_grid_covers_iso261():
+	assert len(ROWS) > 300 and len({d for d, p in ROWS}) == 106
+
+@pytest.mark.parametrize("internal", [False, True])
+def test_scalar_pitch_dev(internal):
+	new, old, classes = (iso965IntPitchDev, legacyIntPitchDev, ISO965INTPITCHTOL) if internal else \
+			(iso965ExtPitchDev, legacyExtPitchDev, ISO965EXTPITCHTOL)
+	diff = max(abs(new(d, p, tol) - old(d, p, tol)) for d, p in ROWS for tol in classes)
+	assert diff < TOL
+
+@pytest.mark.parametrize("internal", [False, True])
+def test_scalar_crest_dev(internal):
+	new, old, classes = (iso965IntCrestDev, legacyIntCrestDev, ISO965INTCRESTTOL) if internal else \
+			(iso965ExtCrestDev, legacyExtCrestDev, ISO965EXTCRESTTOL)
+	diff = max(abs(new(p, tol) - old(p, tol)) for d, p in ROWS for tol in classes)
+	assert diff < TOL
+
+@pytest.mark.parametrize("internal", [False, True])
+def test_arrays_match_legacy(internal):
+	pitchtols, cresttols = (ISO965INTPITCHTOL, ISO965INTCRESTTOL) if internal else (ISO965EXTPITCHTOL, ISO965EXTCRESTTOL)
+	oldpitch, oldcrest = (legacyIntPitchDev, legacyIntCrestDev) if internal else (legacyExtPitchDev, legacyExtCrestDev)
+	d = numpy.array([d for d, p in ROWS])[:, None]
+	p = numpy.array([p for d, p in ROWS])[:, None]
+	pitchdev = pitchDevArray(internal, d, p, numpy.array(pitchtols)[None, :])
+	crestdev = crestDevArray(internal, p, numpy.array(cresttols)[None, :])
+	expectpitch = numpy.array([[oldpitch(dd, pp, tol) for tol in pitchtols] for dd, pp in ROWS])
+	expectcrest = numpy.array([[oldcrest(pp, tol) for tol in cresttols] for dd, pp in ROWS])
+	assert numpy.abs(pitchdev - expectpitch).max() < TOL
+	assert numpy.abs(crestdev - expectcrest).max() < TOL
+
+def test_scalar_string_tolerance_in_array_api():
+	assert pitchDevArray(False, 8.0, 1.25, "6g") == pytest.approx(legacyExtPitchDev(8.0, 1.25, "6g"), abs=TOL)
+	assert crestDevArray(True, 0.5, "6H") == pytest.approx(legacyIntCrestDev(0.5, "6H"), abs=TOL)
+
+@pytest.mark.parametrize("internal", [False, True])
+def test_fit_table_deviations(internal):
+	fits = fitTable(internal)
+	oldpitch, oldcrest = (legacyIntPitchDev, legacyIntCrestDev) if internal else (legacyExtPitchDev, legacyExtCrestDev)
+	for i in (0, len(fits["pitch"]) // 2, len(fits["pitch"]) - 1):
+		d, p = float(fits["size"][i][1:]), float(fits["pitch"][i])
+		for j, pitchtol in enumerate(fits["pitchtol"]):
+			for k, cresttol in enumerate(fits["cresttol"]):
+				assert fits["pitchdev"][i, j, k] == pytest.approx(oldpitch(d, p, pitchtol), abs=TOL)
+				assert fits["crestdev"][i, j, k] == pytest.approx(oldcrest(p, cresttol), abs=TOL)
+
+def test_external_limits_order():
+	limits = limitsArrays(False, 8.0, 1.25, "6g", "6g")
+	assert limits["majormin"] < limits["majormax"] <= 8.0
+	assert limits["pitchmin"] < limits["pitchmax"] < limits["majormin"]
+	assert limits["minormin"] < limits["minormax"] < limits["pitchmin"]
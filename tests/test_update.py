@@ -0,0 +1,60 @@
+# TMThreadVP.updateData: assignments made while validating one prop are queued and handled once each, in order, with
+# a single label update, and an assignment loop stops after UPDATELIMIT props.  updateProp/updateLabel are replaced by
+# recorders, so no document is needed; importing TMClasses needs FreeCAD.
+
+import pytest
+
+FreeCAD = pytest.importorskip("FreeCAD")
+pytest.importorskip("Part")
+from ThreadMaker.TMClasses import TMThreadVP, UPDATELIMIT
+
+def viewProvider(monkeypatch, cascade):
+	""" TMThreadVP whose updateProp(prop) 'assigns' each prop of cascade[prop] (re-entering updateData) """
+	vp = TMThreadVP.__new__(TMThreadVP)
+	vp.handled, vp.labels = [], 0
+	def updateProp(fp, prop):
+		vp.handled.append(prop)
+		for assigned in cascade.get(prop, ()):	vp.updateData(fp, assigned)
+	def updateLabel(fp):
+		vp.labels += 1
+	monkeypatch.setattr(vp, "updateProp", updateProp, raising=False)
+	monkeypatch.setattr(vp, "updateLabel", updateLabel, raising=False)
+	return vp
+
+def test_cascade_settles_once(monkeypatch):
+	vp = viewProvider(monkeypatch, {"StdSize": ["Pitch", "Diameter"], "Pitch": ["Diameter"], "Diameter": ["TolPitch"]})
+	vp.updateData(None, "StdSize")
+	assert vp.handled == ["StdSize", "Pitch", "Diameter", "TolPitch"]
+	assert vp.labels == 1
+	assert vp.edits == 1		# the user's edit, not the assignments it caused
+	assert vp.pending is None
+
+def test_no_label_update(monkeypatch):
+	vp = viewProvider(monkeypatch, {})
+	vp.updateData(None, "Taper")
+	vp.updateData(None, "Label")
+	assert vp.handled == ["Taper", "Label"]
+	assert vp.labels == 0
+	assert vp.edits == 1		# Label is not a geometry prop
+
+def test_assignment_loop_stops(monkeypatch):
+	vp = viewProvider(monkeypatch, {})
+	def updateProp(fp, prop):		# every prop assigns a new one
+		vp.handled.append(prop)
+		vp.updateData(fp, "P%d" % len(vp.handled))
+	monkeypatch.setattr(vp, "updateProp", updateProp, raising=False)
+	vp.updateData(None, "Length")
+	assert len(vp.handled) == UPDATELIMIT
+	assert vp.pending is None
+
+def test_error_clears_queue(monkeypatch):
+	vp = viewProvider(monkeypatch, {})
+	def updateProp(fp, prop):
+		raise ValueError(prop)
+	monkeypatch.setattr(vp, "updateProp", updateProp, raising=False)
+	with pytest.raises(ValueError):
+		vp.updateData(None, "Pitch")
+	assert vp.pending is None		# next updateData() is handled, not just queued
+	vp.updateProp = lambda fp, prop: vp.handled.append(prop)
+	vp.updateData(None, "Length")
+	assert vp.handled == ["Length"]
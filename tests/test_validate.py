@@ -0,0 +1,86 @@
+# TMValidate: each rule accepts and rejects the specs it should, and the feasibleRanges() limits the dialog and
+# updateData() clamp to are accepted exactly at the limit and rejected just past it.
+
+import numpy
+import pytest
+from ThreadMaker.TMSpec import ThreadSpec, ThreadSpecArray, specFromInitProps
+from ThreadMaker.TMValidate import RULES, RULEPARAMS, MINPITCH, PITCHRATIO, MAXTAPER, SMALLDIAMETER, COARSEPITCH, \
+		checkArrays, checkSpec, feasibleRanges, rangeArrays, validSpecs
+
+STEP = 1e-6		# past a limit by this much breaks the rule
+
+def rules(spec):
+	return [rule for rule, severity, parameter, message in checkSpec(spec)]
+
+def custom(**fields):
+	return ThreadSpec(**dict(dict(diameter=8.0, pitch=1.25, length=10.0), **fields))
+
+def standard(internal, size, pitch, pitchtol, cresttol):
+	return specFromInitProps(internal, ["ISO 261 Metric", size, 0, pitch, 10.0, 0.0, 0.0, False, False, False, True,
+			pitchtol, cresttol])
+
+def test_good_spec_breaks_nothing():
+	assert rules(custom()) == []
+	assert rules(standard(False, "M8", 1.25, "6g", "6g")) == []
+	assert rules(standard(True, "M8", 1.25, "6H", "6H")) == []
+
+def test_rule_tables_agree():
+	assert [r[0] for r in RULES] == list(RULEPARAMS)
+	assert set(checkArrays(ThreadSpecArray.fromSpecs([custom()]))) == set(RULEPARAMS)
+
+@pytest.mark.parametrize("rule, bad, good", [
+	("pitchmax", dict(diameter=2.0, pitch=1.0), dict(diameter=2.3, pitch=1.0)),
+	("pitchmax", dict(diameter=8.0, pitch=3.0, clearance=1.2), dict(diameter=8.0, pitch=3.0, clearance=1.1)),
+	("pitchmin", dict(pitch=0.05), dict(pitch=0.1)),
+	("length", dict(pitch=1.25, length=1.0), dict(pitch=1.25, length=1.25)),
+	("taper", dict(taper=5.5), dict(taper=5.0)),
+	("taper", dict(taper=-5.5), dict(taper=-5.0)),
+	("smallcoarse", dict(diameter=3.4, pitch=1.25, length=10.0), dict(diameter=3.5, pitch=1.25)),
+	("smallcoarse", dict(diameter=3.0, pitch=1.2, clearance=0.0), dict(diameter=3.0, pitch=1.0))])
+def test_rule_rejects_and_accepts(rule, bad, good):
+	assert rule in rules(custom(**bad))
+	assert rule not in rules(custom(**good))
+
+def test_tolerance_rule():
+	assert "tolerance" in rules(standard(False, "M8", 1.25, "9e", "4h"))		# coarse pitch class, fine crest class
+	assert "tolerance" not in rules(standard(False, "M8", 1.25, "3h", "4h"))		# tightest pitch class always fits
+	assert "tolerance" in rules(standard(True, "M8", 1.25, "8G", "4H"))
+	assert "tolerance" not in rules(standard(True, "M8", 1.25, "4H", "4H"))
+	assert "tolerance" not in rules(custom(tolpitch="", tolcrest=""))		# Custom threads have no classes
+
+def test_severities():
+	severity = {rule: level for rule, level, parameter, message in RULES}
+	assert [r for r in RULES if r[1] == "error"] == [r for r in RULES if r[0] in ("pitchmax", "pitchmin", "length", "tolerance")]
+	assert severity["taper"] == severity["smallcoarse"] == "warning"
+	assert validSpecs(ThreadSpecArray.fromSpecs([custom(taper=6.0), custom(pitch=0.05)])).tolist() == [True, False]
+
+@pytest.mark.parametrize("fields", [dict(), dict(diameter=20.0, pitch=2.5, length=3.0, clearance=0.2),
+		dict(diameter=5.0, pitch=0.8, length=30.0, clearance=-0.1), dict(internal=True, diameter=12.0, pitch=1.75)])
+def test_live_range_boundaries(fields):
+	spec = custom(**fields)
+	ranges = feasibleRanges(spec)
+	errors = [rule for rule, severity, parameter, message in RULES if severity == "error" and rule != "tolerance"]
+	for key, (low, high) in ranges.items():
+		if key == "taper":	continue		# warning range, checked below
+		for limit, outside in ((low, low - STEP), (high, high + STEP)):
+			if not numpy.isfinite(limit): continue
+			at = spec.asDict()
+			at[key] = limit
+			assert not set(rules(at)) & set(errors), (key, limit)
+			past = dict(at)
+			past[key] = outside
+			assert set(rules(past)) & {rule for rule in errors if key in RULEPARAMS[rule]}, (key, outside)
+	low, high = ranges["taper"]
+	assert (low, high) == (-MAXTAPER, MAXTAPER)
+	assert "taper" not in rules(dict(spec.asDict(), taper=high)) and "taper" in rules(dict(spec.asDict(), taper=high + STEP))
+
+def test_range_arrays_match_single_specs():
+	specs = [custom(), custom(diameter=20.0, pitch=2.5, length=3.0), custom(internal=True, clearance=0.3)]
+	ranges = rangeArrays(ThreadSpecArray.fromSpecs(specs))
+	for i, spec in enumerate(specs):
+		for key, (low, high) in feasibleRanges(spec).items():
+			assert (ranges[key][0][i], ranges[key][1][i]) == (low, high)
+
+def test_constants_in_messages():
+	assert str(PITCHRATIO) in RULES[0][3] and str(MINPITCH) in RULES[1][3]
+	assert str(MAXTAPER) in RULES[4][3] and str(SMALLDIAMETER) in RULES[5][3] and str(COARSEPITCH) in RULES[5][3]